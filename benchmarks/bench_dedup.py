@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Бенчмарк способов дедупликации: скорость, память и ложные срабатывания"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.dedup import BloomDedup, ExactDedup, HashedDedup
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк дедупликации юзернеймов')
+    parser.add_argument('--count', type=int, default=1_000_000, help='количество уникальных ключей')
+    parser.add_argument('--fp-rate', type=float, default=0.001, help='вероятность ложного срабатывания Блума')
+    parser.add_argument('--probes', type=int, default=100_000, help='проверок отсутствующих ключей')
+    args = parser.parse_args()
+    
+    backends = {
+        'exact': ExactDedup,
+        'hashed': HashedDedup,
+        'bloom': lambda: BloomDedup(args.count, args.fp_rate),
+    }
+    
+    for name, factory in backends.items():
+        tracemalloc.start()
+        dedup = factory()
+        
+        start = time.perf_counter()
+        for i in range(args.count):
+            dedup.add(f"telegram:user{i}uz")
+        elapsed = time.perf_counter() - start
+        
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        
+        false_positives = sum(f"instagram:user{i}uz" in dedup for i in range(args.probes))
+        print(f"{name:<7} {args.count / elapsed:>12,.0f} ключей/с  "
+              f"{memory / 2 ** 20:>8.1f} МБ  "
+              f"ложных срабатываний: {false_positives / args.probes:.4%}")
+
+
+if __name__ == '__main__':
+    main()
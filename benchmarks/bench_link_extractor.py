@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Бенчмарк извлечения ссылок из страниц выдачи: BeautifulSoup против LinkExtractor"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from urllib.parse import unquote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+from mock_servers import MockSerpServer
+from src.link_extractor import LinkExtractor
+from src.page_cache import PageCache
+
+# Разметка вокруг результатов: реальные страницы выдачи весят сотни килобайт
+FILLER = '<div class="x"><span>Описание результата</span><script>var a = "<b>" > 1;</script></div>'
+
+# Разметка, на которой разбор ссылок уже ошибался: (HTML, ожидаемые ссылки)
+EDGE_CASES = [
+    ('<a data-href="https://t.me/x" href="https://example.com">', []),
+    ('<a xhref="https://t.me/x">', []),
+    ('<a data-href="https://example.com" href="https://t.me/y">', ['https://t.me/y']),
+    ('<a class="r"href="https://t.me/z">', ['https://t.me/z']),
+    ('<a title="a > b" href="/url?q=https://t.me/w&amp;sa=U">', ['https://t.me/w']),
+]
+
+
+def stored_pages(path: str) -> list:
+    """Страницы из кэша выдачи"""
+    cache = PageCache(path)
+    pages = [page for _, _, page in cache.iter_pages()]
+    cache.close()
+    return pages
+
+
+def synthetic_pages(count: int, filler: int) -> list:
+    """Страницы MockSerpServer, дополненные разметкой до размера настоящих"""
+    serp = MockSerpServer(pages=count)
+    padding = FILLER * filler
+    return [
+        serp.render('site:t.me uz' if i % 2 else 'site:instagram.com uz', i * 10)
+        .replace('<div id="search">', padding + '<div id="search">')
+        for i in range(count)
+    ]
+
+
+def parse_soup(page: str) -> list:
+    """Прежний разбор: дерево html.parser и регулярное выражение по каждой ссылке"""
+    urls = []
+    for link in BeautifulSoup(page, 'html.parser').find_all('a'):
+        href = link.get('href', '')
+        if '/url?q=' in href:
+            match = re.search(r'/url\?q=(.*?)&', href)
+            if match:
+                url = match.group(1)
+                if ('t.me/' in url or 'instagram.com/' in url) and url.startswith('http'):
+                    # Прежний разбор не раскодировал адрес — для сравнения результатов
+                    urls.append(unquote(url))
+    return urls
+
+
+def check_edge_cases() -> bool:
+    """Проверка обоих способов разбора на EDGE_CASES"""
+    ok = True
+    for parser in LinkExtractor.PARSERS:
+        extractor = LinkExtractor(parser)
+        for page, expected in EDGE_CASES:
+            urls = extractor.extract(page)
+            if urls != expected:
+                print(f"{parser}: {page!r} -> {urls}, ожидалось {expected}")
+                ok = False
+    return ok
+
+
+def measure(name: str, pages: list, parse) -> list:
+    start = time.perf_counter()
+    results = list(parse(pages))
+    elapsed = time.perf_counter() - start
+    size = sum(len(page) for page in pages)
+    print(f"{name:<22} {len(pages) / elapsed:>10,.0f} страниц/с  {size / elapsed / 2 ** 20:>8.1f} МБ/с")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк извлечения ссылок из выдачи')
+    parser.add_argument('--cache', metavar='FILE', help='страницы из кэша выдачи (по умолчанию синтетические)')
+    parser.add_argument('--pages', type=int, default=2000, help='синтетических страниц')
+    parser.add_argument('--filler', type=int, default=1500, help='блоков разметки на синтетической странице')
+    parser.add_argument('--soup-sample', type=int, default=200, help='страниц для разбора BeautifulSoup')
+    parser.add_argument('--processes', type=int, default=os.cpu_count(), help='процессов для пула')
+    args = parser.parse_args()
+    
+    if not check_edge_cases():
+        print("Краевые случаи: НЕТ")
+        sys.exit(1)
+    print("Краевые случаи: да")
+    
+    pages = stored_pages(args.cache) if args.cache else synthetic_pages(args.pages, args.filler)
+    if not pages:
+        print("Нет страниц для разбора")
+        sys.exit(1)
+    size = sum(len(page) for page in pages) / len(pages)
+    print(f"Страниц: {len(pages):,}, средний размер {size / 1024:.0f} КБ")
+    
+    sample = pages[:args.soup_sample]
+    soup = measure('BeautifulSoup', sample, lambda items: map(parse_soup, items))
+    
+    lxml = LinkExtractor('lxml')
+    tokenizer = LinkExtractor('tokenizer')
+    lxml_results = measure('lxml', pages, lambda items: map(lxml.extract, items))
+    token_results = measure('токенизатор', pages, lambda items: map(tokenizer.extract, items))
+    pool_results = measure(f"токенизатор, {args.processes} проц.", pages,
+                           lambda items: tokenizer.extract_many(items, args.processes))
+    
+    identical = soup == token_results[:len(sample)] and lxml_results == token_results == pool_results
+    print(f"Ссылок: {sum(len(urls) for urls in token_results):,}")
+    print(f"Результаты совпадают: {'да' if identical else 'НЕТ'}")
+    
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Бенчмарк записей конвейера: память на запись и соединение для экспорта"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from src.excel_exporter import ExcelExporter
+from src.records import UsernameRecord, WhoisRecord, index_by_domain
+
+
+def make_dicts(count: int) -> tuple:
+    """Юзернеймы и результаты WHOIS в прежнем виде: словари"""
+    usernames = []
+    results = []
+    for i in range(count):
+        username = f"user{i}uz"
+        usernames.append({'source': 'Telegram', 'username': username, 'original_username': username,
+                          'url': f"https://t.me/{username}", 'tld': 'uz'})
+        results.append({'domain': f"{username}.uz", 'status': 'Registered' if i % 3 else 'Available',
+                        'expiry_date': '2027-01-02', 'registrar': 'Mock Registrar LLC',
+                        'created_date': '2020-01-02'})
+    return usernames, results
+
+
+def make_records(count: int) -> tuple:
+    """Те же данные в виде UsernameRecord и WhoisRecord"""
+    usernames = []
+    results = []
+    for i in range(count):
+        username = f"user{i}uz"
+        usernames.append(UsernameRecord('Telegram', username, f"https://t.me/{username}", 'uz'))
+        results.append(WhoisRecord(f"{username}.uz", 'Registered' if i % 3 else 'Available',
+                                   '2027-01-02', '2020-01-02', 'Mock Registrar LLC'))
+    return usernames, results
+
+
+def container_bytes(items: list) -> int:
+    """Память самих записей без общих строк (полей)"""
+    tracemalloc.start()
+    copies = [dict(item) if isinstance(item, dict) else type(item)(*[getattr(item, name) for name in item.__slots__])
+              for item in items]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del copies
+    return size
+
+
+def merge_join(usernames: list, results: list) -> pd.DataFrame:
+    """Прежнее соединение: две таблицы, столбец домена и pd.merge"""
+    exporter = ExcelExporter()
+    df_users = pd.DataFrame(usernames)
+    df_whois = pd.DataFrame(results)
+    df_users['domain'] = df_users['username'].str.lower() + '.' + df_users['tld']
+    df_merged = pd.merge(df_users, df_whois, on='domain', how='left')
+    df_final = df_merged[exporter.COLUMNS].copy()
+    df_final.columns = [exporter.COLUMN_TITLES[column] for column in exporter.COLUMNS]
+    df_final['Статус'] = df_final['Статус'].map(exporter.STATUS_MAP).fillna(df_final['Статус'])
+    return df_final
+
+
+def index_join(usernames: list, results: list) -> pd.DataFrame:
+    """Соединение через словарь по домену: один проход со сбором значений по колонкам"""
+    exporter = ExcelExporter()
+    whois_by_domain = index_by_domain(results)
+    columns = {column: [] for column in exporter.COLUMNS}
+    missing = (None,) * 4
+    
+    for username_data in usernames:
+        domain = username_data.domain
+        result = whois_by_domain.get(domain)
+        status, expiry_date, created_date, registrar = (
+            missing if result is None
+            else (result.status, result.expiry_date, result.created_date, result.registrar)
+        )
+        
+        columns['source'].append(username_data.source)
+        columns['username'].append(username_data.username)
+        columns['url'].append(username_data.url)
+        columns['domain'].append(domain)
+        columns['status'].append(exporter.STATUS_MAP.get(status, status))
+        columns['expiry_date'].append(expiry_date)
+        columns['created_date'].append(created_date)
+        columns['registrar'].append(registrar)
+    
+    return pd.DataFrame({exporter.COLUMN_TITLES[column]: values for column, values in columns.items()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк записей конвейера')
+    parser.add_argument('--count', type=int, default=1_000_000, help='количество юзернеймов')
+    args = parser.parse_args()
+    
+    print(f"Генерация {args.count:,} записей...")
+    user_dicts, whois_dicts = make_dicts(args.count)
+    user_records, whois_records = make_records(args.count)
+    
+    for name, dicts, records in (('юзернейм', user_dicts, user_records),
+                                 ('WHOIS', whois_dicts, whois_records)):
+        dict_size = container_bytes(dicts) / args.count
+        record_size = container_bytes(records) / args.count
+        print(f"{name:<9} словарь {dict_size:>6.0f} Б  запись {record_size:>6.0f} Б  "
+              f"(в {dict_size / record_size:.1f} раза меньше)")
+    
+    start = time.perf_counter()
+    merged = merge_join(user_dicts, whois_dicts)
+    merge_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    joined = index_join(user_records, whois_records)
+    index_time = time.perf_counter() - start
+    
+    identical = merged.equals(joined)
+    print(f"pd.merge       {args.count / merge_time:>12,.0f} строк/с")
+    print(f"индекс домена  {args.count / index_time:>12,.0f} строк/с")
+    print(f"Результаты совпадают: {'да' if identical else 'НЕТ'}")
+    
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
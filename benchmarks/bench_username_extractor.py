@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Бенчмарк извлечения юзернеймов: построчный путь против пакетного"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.username_extractor import UsernameExtractor
+
+HOSTS = {
+    'telegram': ['https://t.me/{}', 'https://t.me/s/{}', 't.me/{}', 'https://t.me/{}?start=1'],
+    'instagram': ['https://instagram.com/{}/', 'https://www.instagram.com/{}', 'https://instagram.com/{}/p/abc'],
+}
+SUFFIXES = ['uz', '_uz', 'UZ', '', 'shop', '.uz', 'bek', 'Uz']
+
+
+def generate(count: int, seed: int = 42) -> tuple:
+    """Синтетические URL профилей: (список источников, список URL)"""
+    rng = random.Random(seed)
+    sources = []
+    urls = []
+    for i in range(count):
+        source = 'telegram' if i % 2 else 'instagram'
+        name = f"user{rng.randrange(count // 4 + 1)}{rng.choice(SUFFIXES)}"
+        sources.append(source)
+        urls.append(rng.choice(HOSTS[source]).format(name))
+    return sources, urls
+
+
+def run_scalar(sources: list, urls: list) -> list:
+    extractor = UsernameExtractor()
+    with contextlib.redirect_stdout(io.StringIO()):
+        records = [extractor.process_url(url, source) for source, url in zip(sources, urls)]
+    return [record for record in records if record is not None]
+
+
+def run_batch(sources: list, urls: list, chunk: int) -> list:
+    extractor = UsernameExtractor()
+    records = []
+    for start in range(0, len(urls), chunk):
+        records.extend(extractor.extract_batch(urls[start:start + chunk], sources[start:start + chunk]))
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк UsernameExtractor')
+    parser.add_argument('--count', type=int, default=10_000_000, help='количество URL')
+    parser.add_argument('--scalar-sample', type=int, default=1_000_000,
+                        help='сколько URL обработать построчно для сравнения')
+    parser.add_argument('--chunk', type=int, default=1_000_000, help='размер пачки для extract_batch')
+    args = parser.parse_args()
+    
+    print(f"Генерация {args.count:,} URL...")
+    sources, urls = generate(args.count)
+    
+    sample = min(args.scalar_sample, args.count)
+    start = time.perf_counter()
+    scalar_records = run_scalar(sources[:sample], urls[:sample])
+    scalar_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    batch_sample = run_batch(sources[:sample], urls[:sample], args.chunk)
+    batch_sample_time = time.perf_counter() - start
+    
+    identical = scalar_records == batch_sample
+    print(f"Построчно ({sample:,} URL):  {sample / scalar_time:>12,.0f} URL/s")
+    print(f"Пачками   ({sample:,} URL):  {sample / batch_sample_time:>12,.0f} URL/s")
+    print(f"Результаты совпадают: {'да' if identical else 'НЕТ'}")
+    
+    start = time.perf_counter()
+    batch_records = run_batch(sources, urls, args.chunk)
+    batch_time = time.perf_counter() - start
+    print(f"Пачками   ({args.count:,} URL): {args.count / batch_time:>12,.0f} URL/s, "
+          f"{batch_time:.1f} с, юзернеймов: {len(batch_records):,}")
+    
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Микробенчмарк разбора ответов WHOIS на записанном корпусе"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.whois_parser import WhoisParser
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'whois_corpus')
+
+
+def load_corpus(corpus_dir: str) -> dict:
+    """Загрузка записанных ответов: {имя файла: текст}"""
+    corpus = {}
+    for path in sorted(glob.glob(os.path.join(corpus_dir, '*.txt'))):
+        with open(path, encoding='utf-8') as f:
+            corpus[os.path.basename(path)] = f.read()
+    return corpus
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк WhoisParser')
+    parser.add_argument('--corpus', default=CORPUS_DIR, help='каталог с ответами WHOIS')
+    parser.add_argument('--iterations', type=int, default=20000, help='повторов на каждый ответ')
+    args = parser.parse_args()
+    
+    corpus = load_corpus(args.corpus)
+    whois_parser = WhoisParser()
+    total_parses = 0
+    total_time = 0.0
+    
+    for name, response in corpus.items():
+        result = whois_parser.parse(response, name)
+        
+        start = time.perf_counter()
+        for _ in range(args.iterations):
+            whois_parser.parse(response, name)
+        elapsed = time.perf_counter() - start
+        
+        total_parses += args.iterations
+        total_time += elapsed
+        print(f"{name:<24} {args.iterations / elapsed:>12,.0f} parses/s  "
+              f"{result['status']:<10} exp={result['expiry_date']} "
+              f"created={result['created_date']} registrar={result['registrar']}")
+    
+    if total_time:
+        print(f"{'ИТОГО':<24} {total_parses / total_time:>12,.0f} parses/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,416 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Локальные заглушки WHOIS, DNS и поисковой выдачи для бенчмарков
+
+Запуск отдельно (например, для ручного прогона main.py):
+    python benchmarks/mock_servers.py whois --port 4343 --latency 0.05
+    python benchmarks/mock_servers.py serp --port 8088 --pages 20
+    python benchmarks/mock_servers.py dns --port 5353
+"""
+
+import argparse
+import http.server
+import random
+import socket
+import socketserver
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+from urllib.parse import parse_qs, urlsplit
+
+# Ответы WHOIS по умолчанию ({domain} подставляется)
+WHOIS_TEMPLATES = {
+    'registered': (
+        "Domain Name: {domain}\n"
+        "Sponsoring Registrar: Mock Registrar LLC\n"
+        "Creation Date: 2020-01-02\n"
+        "Expiration Date: 2027-01-02\n"
+        "Status: ACTIVE\n"
+    ),
+    'available': "% Domain {domain} not found\n",
+    'throttled': "% Query rate limit exceeded, try again later\n",
+}
+
+
+def _fraction(value: str) -> float:
+    """Детерминированное число от 0 до 1 для строки"""
+    return zlib.crc32(value.encode('utf-8')) / 0xFFFFFFFF
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class _ThreadingUDPServer(socketserver.ThreadingUDPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class _ThreadingHTTPServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class _MockServer:
+    """Запуск сервера в фоновом потоке"""
+    
+    def __init__(self):
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+        self.requests = 0
+        self._lock = threading.Lock()
+    
+    def _create_server(self):
+        raise NotImplementedError
+    
+    def _count(self):
+        with self._lock:
+            self.requests += 1
+    
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+    
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+    
+    def start(self):
+        """Запуск в фоновом потоке"""
+        self._server = self._create_server()
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+    
+    def serve_forever(self):
+        """Запуск в текущем потоке"""
+        self._server = self._create_server()
+        print(f"Слушаю {self.host}:{self.port}")
+        self._server.serve_forever()
+    
+    def stop(self):
+        """Остановка сервера"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class MockWhoisServer(_MockServer):
+    """WHOIS-сервер по протоколу порта 43: строка запроса -> ответ -> закрытие"""
+    
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 jitter: float = 0.0, error_rate: float = 0.0, available_rate: float = 0.3,
+                 templates: Optional[Dict[str, str]] = None, rate_limit: float = 0.0):
+        """
+        Args:
+            host: Адрес для прослушивания
+            port: Порт (0 — любой свободный)
+            latency: Задержка ответа (секунды)
+            jitter: Случайная добавка к задержке (секунды, от 0 до jitter)
+            error_rate: Доля соединений, сбрасываемых без ответа
+            available_rate: Доля свободных доменов (определяется по имени домена)
+            templates: Ответы {'registered': ..., 'available': ..., 'throttled': ...} с {domain}
+            rate_limit: Запросов в секунду, сверх которых сервер отвечает отказом
+                (0 — без ограничения)
+        """
+        super().__init__()
+        self.address = (host, port)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.available_rate = available_rate
+        self.templates = dict(WHOIS_TEMPLATES, **(templates or {}))
+        self.rate_limit = rate_limit
+        self.throttled = 0
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+    
+    def _throttle(self) -> bool:
+        """Превышен ли лимит частоты (token bucket без накопления)"""
+        if not self.rate_limit:
+            return False
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(1.0, self._tokens + (now - self._updated) * self.rate_limit)
+            self._updated = now
+            if self._tokens < 1.0:
+                self.throttled += 1
+                return True
+            self._tokens -= 1.0
+            return False
+    
+    @property
+    def server(self) -> str:
+        """Адрес в формате host:port для TLD_WHOIS_SERVERS"""
+        return f"{self.host}:{self.port}"
+    
+    def respond(self, domain: str) -> Optional[str]:
+        """
+        Ответ на запрос
+        
+        Args:
+            domain: Запрошенный домен
+        
+        Returns:
+            Текст ответа или None для сброса соединения
+        """
+        if self.error_rate and random.random() < self.error_rate:
+            return None
+        
+        if self._throttle():
+            return self.templates['throttled'].format(domain=domain)
+        
+        if _fraction(domain) < self.available_rate:
+            return self.templates['available'].format(domain=domain)
+        return self.templates['registered'].format(domain=domain)
+    
+    def _create_server(self):
+        mock = self
+        
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                mock._count()
+                domain = self.request.recv(1024).decode('utf-8', errors='ignore').strip()
+                
+                delay = mock.latency + random.random() * mock.jitter
+                if delay:
+                    time.sleep(delay)
+                
+                response = mock.respond(domain)
+                if response is None:
+                    # Сброс соединения (RST) вместо ответа
+                    self.request.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+                    self.request.close()
+                    return
+                self.request.sendall(response.encode('utf-8'))
+        
+        return _ThreadingTCPServer(self.address, Handler)
+
+
+class MockDnsServer(_MockServer):
+    """DNS-сервер (UDP), отвечающий на NS-запросы
+    
+    Свободные домены (та же доля и то же правило, что в MockWhoisServer) —
+    NXDOMAIN, занятые — две NS-записи, кроме доли занятых без делегирования
+    (NOERROR без записей).
+    """
+    
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0,
+                 available_rate: float = 0.3, undelegated_rate: float = 0.1, drop_rate: float = 0.0):
+        """
+        Args:
+            host: Адрес для прослушивания
+            port: Порт (0 — любой свободный)
+            latency: Задержка ответа (секунды)
+            available_rate: Доля свободных доменов (определяется по имени домена)
+            undelegated_rate: Доля занятых доменов без NS-записей
+            drop_rate: Доля запросов, оставленных без ответа
+        """
+        super().__init__()
+        self.address = (host, port)
+        self.latency = latency
+        self.available_rate = available_rate
+        self.undelegated_rate = undelegated_rate
+        self.drop_rate = drop_rate
+    
+    @property
+    def resolver(self) -> str:
+        """Адрес в формате host:port для config.DNS_RESOLVER"""
+        return f"{self.host}:{self.port}"
+    
+    def respond(self, query: bytes) -> Optional[bytes]:
+        """
+        Ответ на DNS-запрос
+        
+        Args:
+            query: DNS-сообщение с одним вопросом
+        
+        Returns:
+            DNS-сообщение или None, если ответа не будет
+        """
+        if len(query) < 12 or (self.drop_rate and random.random() < self.drop_rate):
+            return None
+        
+        offset = 12
+        labels = []
+        while query[offset]:
+            length = query[offset]
+            labels.append(query[offset + 1:offset + 1 + length].decode('ascii').lower())
+            offset += length + 1
+        question = query[12:offset + 5]
+        domain = '.'.join(labels)
+        
+        answers = []
+        if _fraction(domain) < self.available_rate:
+            rcode = 3
+        else:
+            rcode = 0
+            if _fraction(f"dns:{domain}") >= self.undelegated_rate:
+                for n in (1, 2):
+                    rdata = b''.join(bytes([len(label)]) + label.encode('ascii')
+                                     for label in f"ns{n}.mockdns.uz".split('.')) + b'\x00'
+                    # Имя владельца — указатель на имя в вопросе (смещение 12)
+                    answers.append(b'\xc0\x0c' + struct.pack('!HHIH', 2, 1, 3600, len(rdata)) + rdata)
+        
+        header = struct.pack('!HHHHHH', struct.unpack('!H', query[:2])[0],
+                             0x8180 | rcode, 1, len(answers), 0, 0)
+        return header + question + b''.join(answers)
+    
+    def _create_server(self):
+        mock = self
+        
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                mock._count()
+                data, sock = self.request
+                if mock.latency:
+                    time.sleep(mock.latency)
+                response = mock.respond(data)
+                if response is not None:
+                    sock.sendto(response, self.client_address)
+        
+        return _ThreadingUDPServer(self.address, Handler)
+
+
+class MockSerpServer(_MockServer):
+    """HTTP-сервер с синтетическими страницами выдачи Google"""
+    
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, pages: int = 5,
+                 results_per_page: int = 10, latency: float = 0.0, error_rate: float = 0.0,
+                 uz_rate: float = 0.5):
+        """
+        Args:
+            host: Адрес для прослушивания
+            port: Порт (0 — любой свободный)
+            pages: Страниц с результатами на запрос (дальше — пустые страницы)
+            results_per_page: Ссылок на профили на странице
+            latency: Задержка ответа (секунды)
+            error_rate: Доля ответов HTTP 503
+            uz_rate: Доля юзернеймов, заканчивающихся на uz
+        """
+        super().__init__()
+        self.address = (host, port)
+        self.pages = pages
+        self.results_per_page = results_per_page
+        self.latency = latency
+        self.error_rate = error_rate
+        self.uz_rate = uz_rate
+    
+    @property
+    def url(self) -> str:
+        """Адрес поиска для config.SEARCH_URL"""
+        return f"http://{self.host}:{self.port}/search"
+    
+    def render(self, query: str, start: int) -> str:
+        """
+        HTML страницы выдачи
+        
+        Args:
+            query: Поисковый запрос
+            start: Смещение первого результата
+        
+        Returns:
+            HTML с результатами в виде ссылок /url?q=...
+        """
+        host = 'instagram.com' if 'instagram' in query else 't.me'
+        links = []
+        
+        if start < self.pages * self.results_per_page:
+            for n in range(start, start + self.results_per_page):
+                name = f"user{n}"
+                name += 'uz' if _fraction(f"{query}:{n}") < self.uz_rate else 'bek'
+                links.append(
+                    f'<div class="g"><a href="/url?q=https://{host}/{name}&amp;sa=U&amp;ved=x">'
+                    f'<h3>{name}</h3></a><a href="/search?q=related:{name}">Похожие</a></div>'
+                )
+        
+        return f"<html><body><div id=\"search\">{''.join(links)}</div></body></html>"
+    
+    def _create_server(self):
+        mock = self
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Заголовки и тело пишутся отдельно: без этого ответ ждет delayed ACK
+            disable_nagle_algorithm = True
+            
+            def do_GET(self):
+                mock._count()
+                if mock.latency:
+                    time.sleep(mock.latency)
+                
+                if mock.error_rate and random.random() < mock.error_rate:
+                    self.send_response(503)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                
+                params = parse_qs(urlsplit(self.path).query)
+                query = params.get('q', [''])[0]
+                start = int(params.get('start', ['0'])[0])
+                
+                body = mock.render(query, start).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        return _ThreadingHTTPServer(self.address, Handler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Заглушки WHOIS и поисковой выдачи')
+    subparsers = parser.add_subparsers(dest='server', required=True)
+    
+    whois = subparsers.add_parser('whois', help='WHOIS-сервер')
+    whois.add_argument('--port', type=int, default=4343)
+    whois.add_argument('--latency', type=float, default=0.0, help='задержка ответа, с')
+    whois.add_argument('--jitter', type=float, default=0.0, help='случайная добавка к задержке, с')
+    whois.add_argument('--error-rate', type=float, default=0.0, help='доля сброшенных соединений')
+    whois.add_argument('--available-rate', type=float, default=0.3, help='доля свободных доменов')
+    whois.add_argument('--rate-limit', type=float, default=0.0, help='запросов в секунду до отказов')
+    
+    serp = subparsers.add_parser('serp', help='страницы выдачи')
+    serp.add_argument('--port', type=int, default=8088)
+    serp.add_argument('--pages', type=int, default=5, help='страниц с результатами на запрос')
+    serp.add_argument('--latency', type=float, default=0.0, help='задержка ответа, с')
+    serp.add_argument('--error-rate', type=float, default=0.0, help='доля ответов 503')
+    
+    dns = subparsers.add_parser('dns', help='DNS-сервер для NS-запросов')
+    dns.add_argument('--port', type=int, default=5353)
+    dns.add_argument('--latency', type=float, default=0.0, help='задержка ответа, с')
+    dns.add_argument('--available-rate', type=float, default=0.3, help='доля свободных доменов')
+    dns.add_argument('--undelegated-rate', type=float, default=0.1, help='доля занятых без NS-записей')
+    dns.add_argument('--drop-rate', type=float, default=0.0, help='доля запросов без ответа')
+    
+    args = parser.parse_args()
+    
+    if args.server == 'dns':
+        MockDnsServer(port=args.port, latency=args.latency, available_rate=args.available_rate,
+                      undelegated_rate=args.undelegated_rate, drop_rate=args.drop_rate).serve_forever()
+    elif args.server == 'whois':
+        MockWhoisServer(port=args.port, latency=args.latency, jitter=args.jitter,
+                        error_rate=args.error_rate, available_rate=args.available_rate,
+                        rate_limit=args.rate_limit).serve_forever()
+    else:
+        MockSerpServer(port=args.port, pages=args.pages, latency=args.latency,
+                       error_rate=args.error_rate).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""Бенчмарки компонентов и всего конвейера на локальных заглушках
+
+Каждый бенчмарк выполняется в отдельном процессе, чтобы пиковая память
+относилась только к нему. Результаты сохраняются в JSON с хэшем коммита
+и сравниваются с прошлым прогоном через --compare.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import multiprocessing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import config
+from mock_servers import MockSerpServer, MockWhoisServer
+
+BENCHMARKS = ['search', 'extract', 'whois', 'export', 'e2e']
+
+# Показатели для сравнения прогонов: (ключ, больше — лучше)
+COMPARE_KEYS = [
+    ('rate', True),
+    ('p50_ms', False),
+    ('p99_ms', False),
+    ('peak_rss_mb', False),
+]
+
+
+def percentile(values: list, q: float) -> float:
+    """Перцентиль по ближайшему рангу"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def summarize(items: int, unit: str, seconds: float, latencies: list) -> dict:
+    """Итог бенчмарка: скорость и перцентили задержки (мс)"""
+    return {
+        'items': items,
+        'unit': unit,
+        'seconds': round(seconds, 3),
+        'rate': round(items / seconds, 1) if seconds else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+def timed(func, latencies: list):
+    """Обертка функции с записью длительности каждого вызова"""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+    return wrapper
+
+
+def timed_async(func, latencies: list):
+    """Обертка корутины с записью длительности каждого вызова"""
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            latencies.append(time.perf_counter() - start)
+    return wrapper
+
+
+def bench_search(params: dict) -> dict:
+    """GoogleSearcher: URL/с, задержка загрузки страницы"""
+    from src.google_search import GoogleSearcher
+    
+    latencies = []
+    searcher = GoogleSearcher()
+    searcher.fetch_page = timed(searcher.fetch_page, latencies)
+    
+    start = time.perf_counter()
+    urls = list(searcher.iter_all_sources())
+    return summarize(len(urls), 'urls', time.perf_counter() - start, latencies)
+
+
+def bench_extract(params: dict) -> dict:
+    """UsernameExtractor: URL/с, задержка пачки"""
+    from bench_username_extractor import generate
+    from src.username_extractor import UsernameExtractor
+    
+    sources, urls = generate(params['urls'])
+    chunk = config.INPUT_BATCH_SIZE
+    latencies = []
+    extractor = UsernameExtractor()
+    extract_batch = timed(extractor.extract_batch, latencies)
+    
+    start = time.perf_counter()
+    for offset in range(0, len(urls), chunk):
+        extract_batch(urls[offset:offset + chunk], sources[offset:offset + chunk])
+    return summarize(len(urls), 'urls', time.perf_counter() - start, latencies)
+
+
+def bench_whois(params: dict) -> dict:
+    """WhoisChecker: доменов/с, задержка проверки домена"""
+    from src.whois_checker import WhoisChecker
+    
+    latencies = []
+    checker = WhoisChecker()
+    checker.check_domain_async = timed_async(checker.check_domain_async, latencies)
+    usernames = [f"bench{i}uz" for i in range(params['domains'])]
+    
+    start = time.perf_counter()
+    results = asyncio.run(checker.check_multiple_domains_async(usernames))
+    return summarize(len(results), 'domains', time.perf_counter() - start, latencies)
+
+
+def bench_export(params: dict) -> dict:
+    """ExcelExporter: строк/с, задержка записи строки"""
+    from src.excel_exporter import ExcelExporter
+    from src.records import UsernameRecord, WhoisRecord
+    
+    latencies = []
+    exporter = ExcelExporter()
+    write = timed(exporter.write, latencies)
+    
+    start = time.perf_counter()
+    exporter.open()
+    for i in range(params['rows']):
+        username = f"user{i}uz"
+        write(
+            UsernameRecord('Telegram', username, f"https://t.me/{username}", 'uz'),
+            WhoisRecord(f"{username}.uz", 'Registered' if i % 3 else 'Available',
+                        '2027-01-02', '2020-01-02', 'Mock Registrar LLC')
+        )
+    exporter.close()
+    return summarize(params['rows'], 'rows', time.perf_counter() - start, latencies)
+
+
+def bench_e2e(params: dict) -> dict:
+    """Конвейер поиск -> извлечение -> WHOIS -> Excel: доменов/с, задержка проверки"""
+    from src.excel_exporter import ExcelExporter
+    from src.google_search import GoogleSearcher
+    from src.pipeline import Pipeline
+    from src.username_extractor import UsernameExtractor
+    from src.whois_checker import WhoisChecker
+    
+    latencies = []
+    checker = WhoisChecker()
+    checker.check_domain_async = timed_async(checker.check_domain_async, latencies)
+    pipeline = Pipeline(GoogleSearcher(), UsernameExtractor(), checker, ExcelExporter())
+    
+    start = time.perf_counter()
+    stats = asyncio.run(pipeline.run())
+    result = summarize(stats['checked'], 'domains', time.perf_counter() - start, latencies)
+    result['urls'] = stats['urls']
+    result['first_result_s'] = round(pipeline.first_result_time or 0.0, 3)
+    return result
+
+
+def run_in_child(name: str, settings: dict, params: dict) -> dict:
+    """Запуск бенчмарка в отдельном процессе с заданными настройками"""
+    for key, value in settings.items():
+        setattr(config, key, value)
+    
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        result = globals()[f"bench_{name}"](params)
+    
+    # ru_maxrss в Linux — в килобайтах
+    result['peak_rss_mb'] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    return result
+
+
+def git_revision() -> str:
+    """Хэш текущего коммита (с пометкой о незакоммиченных изменениях)"""
+    try:
+        return subprocess.run(
+            ['git', 'describe', '--always', '--dirty'], cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(previous: dict, current: dict):
+    """Вывод изменений относительно прошлого прогона"""
+    print(f"\nСравнение с {previous.get('revision')}:")
+    for name, result in current['results'].items():
+        old = previous.get('results', {}).get(name)
+        if old is None:
+            continue
+        changes = []
+        for key, higher_is_better in COMPARE_KEYS:
+            if not old.get(key):
+                continue
+            delta = (result[key] - old[key]) / old[key] * 100
+            better = delta > 0 if higher_is_better else delta < 0
+            mark = '✅' if better or abs(delta) < 5 else '⚠️'
+            changes.append(f"{key} {delta:+.1f}% {mark}")
+        print(f"  {name:<8} " + ', '.join(changes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарки на локальных заглушках WHOIS и выдачи')
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, default=BENCHMARKS,
+                        help='какие бенчмарки запускать')
+    parser.add_argument('--urls', type=int, default=1_000_000, help='URL для бенчмарка extract')
+    parser.add_argument('--domains', type=int, default=2000, help='доменов для бенчмарка whois')
+    parser.add_argument('--rows', type=int, default=100_000, help='строк для бенчмарка export')
+    parser.add_argument('--pages', type=int, default=50, help='страниц выдачи на запрос')
+    parser.add_argument('--whois-latency', type=float, default=0.02, help='задержка WHOIS, с')
+    parser.add_argument('--whois-jitter', type=float, default=0.01, help='разброс задержки WHOIS, с')
+    parser.add_argument('--whois-error-rate', type=float, default=0.0, help='доля сброшенных соединений')
+    parser.add_argument('--whois-concurrency', type=int, default=16, help='одновременных WHOIS-запросов')
+    parser.add_argument('--serp-latency', type=float, default=0.01, help='задержка выдачи, с')
+    parser.add_argument('--serp-error-rate', type=float, default=0.0, help='доля ответов 503')
+    parser.add_argument('--output', help='файл результатов (по умолчанию benchmarks/results/<коммит>.json)')
+    parser.add_argument('--compare', metavar='FILE', help='сравнить с результатами прошлого прогона')
+    args = parser.parse_args()
+    
+    revision = git_revision()
+    output = args.output or os.path.join(ROOT, 'benchmarks', 'results', f"{revision}.json")
+    params = {'urls': args.urls, 'domains': args.domains, 'rows': args.rows}
+    
+    whois = MockWhoisServer(latency=args.whois_latency, jitter=args.whois_jitter,
+                            error_rate=args.whois_error_rate)
+    serp = MockSerpServer(pages=args.pages, latency=args.serp_latency, error_rate=args.serp_error_rate)
+    
+    with whois, serp, tempfile.TemporaryDirectory() as tmpdir:
+        # Лимиты частоты сняты: измеряется код, а не паузы
+        settings = {
+            'SEARCH_URL': serp.url,
+            'SEARCH_RATE_LIMIT': 10_000,
+            'SEARCH_BURST': 100,
+            'SEARCH_BACKOFF_BASE': 0.01,
+            'MAX_RESULTS_PER_SOURCE': args.pages * serp.results_per_page,
+            'WHOIS_SERVER': whois.server,
+            'TLD_WHOIS_SERVERS': {'uz': whois.server},
+            'TARGET_TLDS': ['uz'],
+            'WHOIS_CONCURRENCY': args.whois_concurrency,
+            'WHOIS_RATE_LIMIT': 100_000,
+            'WHOIS_BURST': 1000,
+            'WHOIS_RETRY_DELAY': 0,
+            'WHOIS_CACHE_ENABLED': False,
+            'OUTPUT_DIR': tmpdir,
+            'JOURNAL_FILE': os.path.join(tmpdir, 'journal.jsonl'),
+        }
+        
+        results = {}
+        context = multiprocessing.get_context('spawn')
+        for name in args.only:
+            print(f"▶ {name}...", end=' ', flush=True)
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(run_in_child, name, settings, params).result()
+            results[name] = result
+            print(f"{result['rate']:,.0f} {result['unit']}/с, p50 {result['p50_ms']} мс, "
+                  f"p99 {result['p99_ms']} мс, RSS {result['peak_rss_mb']} МБ")
+    
+    report = {
+        'revision': revision,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'params': dict(params, **{key: value for key, value in vars(args).items()
+                                  if key.startswith(('whois_', 'serp_', 'pages'))}),
+        'results': results,
+    }
+    
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Результаты: {output}")
+    
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
@@ -14,12 +14,174 @@ WHOIS_SERVER = 'whois.cctld.uz'
 WHOIS_PORT = 43
 WHOIS_TIMEOUT = 10
 
+# Доменные зоны: юзернеймы с таким окончанием проверяются в соответствующей зоне
+# (адрес сервера можно указать как host:port)
+TARGET_TLDS = ['uz']  # Например, ['uz', 'kz', 'kg', 'tj']
+TLD_WHOIS_SERVERS = {
+    'uz': WHOIS_SERVER,
+    'kz': 'whois.nic.kz',
+    'kg': 'whois.kg',
+    'tj': 'whois.nic.tj',
+}
+
+# Домены-кандидаты для юзернейма (shop_uz): stem — shop.uz, joined — shopuz.uz,
+# hyphen — shop-uz.uz. Метки, недопустимые в домене, не проверяются.
+# Каждый способ добавляет по строке отчета и WHOIS-запросу на юзернейм:
+# ['stem', 'joined'] примерно удваивает число проверок
+DOMAIN_CANDIDATES = ['joined']
+DOMAIN_LABEL_MAX_LENGTH = 63
+
+# Лимиты отдельных WHOIS-серверов (остальные используют общие значения ниже)
+WHOIS_SERVER_LIMITS = {
+    # 'whois.nic.kz': {'concurrency': 2, 'rate_limit': 1, 'burst': 1},
+}
+WHOIS_LANE_QUEUE_SIZE = 1000  # Ожидающих проверок на один сервер
+WHOIS_BACKLOG_SIZE = 100000  # Проверок сверх очередей всех серверов, после которых постановка ждет
+
+# Асинхронная проверка WHOIS
+WHOIS_CONCURRENCY = 4  # Одновременных запросов к одному серверу
+WHOIS_RATE_LIMIT = 2  # Запросов в секунду на один сервер
+WHOIS_BURST = 2  # Запросов подряд без ожидания
+
+# Подстройка частоты WHOIS по ошибкам (AIMD): WHOIS_RATE_LIMIT — начальная частота
+WHOIS_ADAPTIVE_RATE = True
+WHOIS_MIN_RATE = 0.1  # Запросов в секунду, ниже которых частота не снижается
+WHOIS_MAX_RATE = 20  # Запросов в секунду, выше которых частота не растет
+WHOIS_AIMD_INCREASE = 0.1  # Прибавка частоты за секунду успешных запросов
+WHOIS_AIMD_DECREASE = 0.5  # Множитель частоты при ошибке или таймауте
+WHOIS_AIMD_COOLDOWN = 2.0  # Не снижать частоту повторно раньше (секунды)
+
+# Пауза после серии ошибок подряд с пробным запросом
+WHOIS_BREAKER_THRESHOLD = 5  # Ошибок подряд до паузы
+WHOIS_BREAKER_TIMEOUT = 10  # Начальная пауза (секунды), удваивается при неудачной пробе
+WHOIS_BREAKER_MAX_TIMEOUT = 300  # Максимальная пауза (секунды)
+WHOIS_BREAKER_PROBE_TIMEOUT = 60  # Срок пробного запроса (секунды): без результата пауза возобновляется
+
+# Повторная проверка доменов с ошибкой в конце запуска
+WHOIS_RETRY_ROUNDS = 2
+WHOIS_RETRY_DELAY = 5  # Пауза перед повтором (секунды)
+
+# Архив полных ответов WHOIS для повторного разбора (--reparse)
+WHOIS_ARCHIVE_ENABLED = True
+WHOIS_ARCHIVE_DIR = 'cache/whois_archive'
+WHOIS_ARCHIVE_SEGMENT_SIZE = 64 * 1024 * 1024  # Размер сегмента (байт)
+WHOIS_ARCHIVE_COMMIT_EVERY = 100  # Записей между сбросами индекса на диск
+
+# Дисковый кэш страниц выдачи (HTML сжат, разбор ссылок выполняется заново)
+PAGE_CACHE_ENABLED = True
+PAGE_CACHE_FILE = 'cache/page_cache.sqlite3'
+PAGE_CACHE_TTL = 24 * 3600  # Время жизни страницы (секунды)
+PAGE_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Суммарный размер сжатых страниц
+PAGE_CACHE_COMPRESS_LEVEL = 6  # Уровень сжатия zlib
+PAGE_CACHE_COMMIT_EVERY = 100  # Попаданий между сбросами времени обращения на диск
+PAGE_CACHE_COMMIT_INTERVAL = 5  # Максимальная пауза между сбросами (секунды)
+
+# Кэш результатов WHOIS
+WHOIS_CACHE_ENABLED = True
+WHOIS_CACHE_FILE = 'cache/whois_cache.sqlite3'
+WHOIS_CACHE_TTL_AVAILABLE = 6 * 3600  # Свободные домены (секунды)
+WHOIS_CACHE_TTL_REGISTERED = 7 * 24 * 3600  # Занятые домены без даты истечения
+WHOIS_CACHE_EXPIRY_MARGIN = 14 * 24 * 3600  # Перепроверка до даты истечения
+WHOIS_CACHE_COMMIT_EVERY = 100  # Записей между сбросами на диск
+WHOIS_CACHE_COMMIT_INTERVAL = 5  # Максимальная пауза между сбросами (секунды)
+
+# Предварительная проверка делегирования через DNS (--dns-triage):
+# домены с NS-записями заведомо заняты, в WHOIS идут только остальные
+DNS_TRIAGE_ENABLED = False
+DNS_TRIAGE_MODE = 'skip'  # skip — делегированные сразу Registered; enrich — WHOIS для них в последнюю очередь
+DNS_RESOLVER = None  # DNS-сервер host или host:port (None — первый nameserver из /etc/resolv.conf)
+DNS_TIMEOUT = 2  # Таймаут одного запроса (секунды)
+DNS_RETRIES = 1  # Повторов при таймауте
+DNS_CONCURRENCY = 100  # Одновременных DNS-запросов
+DNS_CACHE_SIZE = 100_000  # Результатов NS-запросов в памяти для повторов домена из других источников
+
+# Режим наблюдения (--watch): перепроверка доменов из кэша WHOIS по сроку истечения
+WATCH_STATE_FILE = 'cache/watch.sqlite3'
+WATCH_EVENTS_FILE = 'results/watch_events.jsonl'  # Изменения статуса доменов
+WATCH_CONCURRENCY = 2  # Одновременных проверок
+WATCH_EXPIRY_MARGIN = 14 * 24 * 3600  # За сколько до истечения начинать проверки
+WATCH_NEAR_EXPIRY_INTERVAL = 24 * 3600  # Интервал проверок перед истечением
+WATCH_DROP_WINDOW = 75 * 24 * 3600  # Удержание после истечения до освобождения домена
+WATCH_DROP_INTERVAL = 6 * 3600  # Интервал проверок после истечения
+WATCH_REGISTERED_INTERVAL = 30 * 24 * 3600  # Занятые домены без даты истечения
+WATCH_AVAILABLE_INTERVAL = 7 * 24 * 3600  # Свободные домены
+WATCH_ERROR_INTERVAL = 3600  # Повтор после ошибки
+WATCH_BACKGROUND_RATE = 0.05  # Проверок свободных доменов в секунду
+WATCH_POLL_INTERVAL = 60  # Максимальная пауза между просмотрами очереди (секунды)
+
+# HTTP/JSON-сервис проверки доменов (--serve)
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8053
+SERVICE_CACHE_SIZE = 100_000  # Результатов в LRU-кэше в памяти
+SERVICE_BATCH_WINDOW = 0.005  # Ожидание пополнения пачки новых доменов (секунды)
+SERVICE_BATCH_SIZE = 100  # Максимум доменов в пачке
+SERVICE_QUEUE_SIZE = 10_000  # Новых доменов, ожидающих отправки в очереди серверов
+SERVICE_MAX_BATCH = 1000  # Доменов в одном POST-запросе
+SERVICE_MAX_BODY = 1024 * 1024  # Максимальный размер тела запроса (байт)
+
+# Размер очередей между этапами конвейера
+PIPELINE_QUEUE_SIZE = 100
+PIPELINE_DOMAIN_CACHE_SIZE = 100_000  # Результатов WHOIS в памяти для повторов домена из других источников
+
+# Чтение URL и юзернеймов из файлов (--input)
+INPUT_CSV_COLUMN = 0  # Номер колонки с URL в CSV
+INPUT_BATCH_SIZE = 1000  # Строк, передаваемых в конвейер за раз
+INPUT_PROGRESS_EVERY = 100000  # Вывод скорости чтения каждые N строк
+
+# Дедупликация юзернеймов
+DEDUP_BACKEND = 'exact'  # exact (множество строк), hashed (64-битные хэши) или bloom
+DEDUP_CAPACITY = 10_000_000  # Ожидаемое количество юзернеймов (размер фильтра Блума)
+DEDUP_FP_RATE = 0.001  # Вероятность ложного срабатывания фильтра Блума
+DEDUP_STATE_FILE = None  # Файл для пропуска юзернеймов из прошлых запусков, например 'cache/dedup.state'
+
+# Журнал выполнения для продолжения прерванного запуска (--resume)
+JOURNAL_FILE = 'cache/run_journal.jsonl'
+
+# Метрики запуска (формат Prometheus и JSON-сводка)
+METRICS_FILE = 'results/metrics.prom'
+METRICS_SUMMARY_FILE = 'results/metrics_summary.json'
+METRICS_PORT = None  # Порт HTTP-эндпоинта /metrics во время работы (None — выключен)
+
 # Настройки экспорта
 OUTPUT_FILENAME = 'uz_domains_report.xlsx'
 OUTPUT_DIR = 'results'
+EXPORT_FORMAT = 'xlsx'  # xlsx, csv, jsonl или sqlite
+EXPORT_COMMIT_EVERY = 1000  # Строк на одну транзакцию при экспорте в SQLite
+
+# Промежуточные файлы отдельных этапов (main.py search/extract/check/export),
+# .gz в конце имени — со сжатием
+STAGE_URLS_FILE = 'results/stages/urls.jsonl'
+STAGE_USERNAMES_FILE = 'results/stages/usernames.jsonl'
+STAGE_RESULTS_FILE = 'results/stages/whois.jsonl'
 
 # User-Agent для запросов
 USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
 
 # Задержка между запросами (секунды)
 REQUEST_DELAY = 2
+
+# Параллельная загрузка страниц выдачи
+SEARCH_URL = 'https://www.google.com/search'
+
+# Разбиение запросов на шарды (--shard): поисковик отдает по одному запросу
+# лишь несколько сотен результатов, дополненные запросы находят остальные
+SEARCH_SHARDING = False
+SEARCH_SHARD_TEMPLATES = {
+    'stem': '{query} {term}',
+    'inurl': '{query} inurl:{term}',
+}
+SEARCH_SHARD_TERMS = {
+    'stem': ['shop', 'market', 'store', 'news', 'kanal', 'biznes', 'toshkent', 'samarqand',
+             'official', 'group', 'blog', 'moda', 'avto', 'taom', 'bot'],
+    'inurl': list('abcdefghijklmnopqrstuvwxyz'),
+}
+SEARCH_CONCURRENCY = 4  # Одновременных загрузок страниц
+SEARCH_PAGES_AHEAD = 2  # Страниц одного запроса, загружаемых одновременно
+SEARCH_RATE_LIMIT = 1 / REQUEST_DELAY  # Страниц в секунду на все запросы
+SEARCH_BURST = 2  # Страниц подряд без ожидания
+SEARCH_MAX_RETRIES = 3  # Повторов при 429/5xx и сетевых ошибках
+SEARCH_BACKOFF_BASE = 2  # Начальная пауза перед повтором (секунды)
+SEARCH_LINK_PARSER = 'tokenizer'  # Разбор ссылок выдачи: tokenizer (только теги <a>) или lxml
+SEARCH_LINK_PROCESSES = None  # Процессов для разбора множества страниц (None — по числу ядер)
+SEARCH_LINK_CHUNK_SIZE = 16  # Страниц на одну передачу в процесс разбора
+SEARCH_LINK_FEED_SIZE = 65536  # Символов HTML на одну порцию потокового разбора lxml
@@ -1,61 +1,22 @@
-Отлично! Продолжаю:
-
-📄 3. .gitignore
-# Python
-__pycache__/
-*.py[cod]
-*$py.class
-*.so
-.Python
-build/
-develop-eggs/
-dist/
-downloads/
-eggs/
-.eggs/
-lib/
-lib64/
-parts/
-sdist/
-var/
-wheels/
-*.egg-info/
-.installed.cfg
-*.egg
-
-# Virtual environments
-venv/
-ENV/
-env/
-
-# Results
-results/
-*.xlsx
-*.xls
-
-# IDE
-.vscode/
-.idea/
-*.swp
-*.swo
-*~
-
-# OS
-.DS_Store
-Thumbs.db
-
-# Logs
-*.log
-📄 4. main.py
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """Парсер uz-доменов из Telegram и Instagram"""
 
+import argparse
+import asyncio
+import os
 import sys
-from src.google_search import GoogleSearcher
-from src.username_extractor import UsernameExtractor
-from src.whois_checker import WhoisChecker
-from src.excel_exporter import ExcelExporter
+import time
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+import config
+from src.dedup import DEDUP_BACKENDS
+from src.exporters import EXPORT_FORMATS
+from src.input_reader import InputReader
+
+# Остальные модули импортируются внутри команд: check не загружает requests,
+# lxml и openpyxl, нужные только поиску и отчету Excel
+COMMANDS = ('search', 'extract', 'check', 'export', 'run')
 
 
 def print_banner():
@@ -66,79 +27,549 @@ def print_banner():
     print("=" * 60)
 
 
-def main():
-    """Главная функция"""
+def parse_args(argv: Optional[List[str]] = None):
+    """Разбор аргументов командной строки (без команды — run)"""
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or (argv[0] not in COMMANDS and argv[0] not in ('-h', '--help')):
+        argv.insert(0, 'run')
+    
+    # Общие аргументы этапов (run принимает аргументы всех этапов)
+    search_options = argparse.ArgumentParser(add_help=False)
+    search_options.add_argument('--no-page-cache', action='store_true',
+                                help='не использовать кэш страниц выдачи')
+    search_options.add_argument('--shard', action='store_true', default=config.SEARCH_SHARDING,
+                                help='дополнять поисковые запросы шардами (SEARCH_SHARD_TERMS)')
+    
+    input_options = argparse.ArgumentParser(add_help=False)
+    input_options.add_argument('--input', nargs='+', metavar='FILE',
+                               help='читать URL или юзернеймы из файлов (.txt, .csv, .gz) вместо поиска')
+    input_options.add_argument('--input-source', choices=sorted(InputReader.PROFILE_URLS),
+                               help='источник для строк с юзернеймами без ссылки')
+    input_options.add_argument('--mmap', action='store_true',
+                               help='читать несжатые текстовые файлы через mmap')
+    input_options.add_argument('--dedup', choices=list(DEDUP_BACKENDS), default=config.DEDUP_BACKEND,
+                               help='способ дедупликации юзернеймов (по умолчанию %(default)s)')
+    input_options.add_argument('--dedup-state', metavar='FILE', default=config.DEDUP_STATE_FILE,
+                               help='файл состояния дедупликации: юзернеймы из прошлых запусков пропускаются')
+    
+    check_options = argparse.ArgumentParser(add_help=False)
+    check_options.add_argument('--no-cache', action='store_true',
+                               help='не использовать кэш результатов WHOIS')
+    
+    export_options = argparse.ArgumentParser(add_help=False)
+    export_options.add_argument('--format', choices=EXPORT_FORMATS, default=config.EXPORT_FORMAT,
+                                help='формат отчета (по умолчанию %(default)s)')
+    
+    parser = argparse.ArgumentParser(description='Парсер uz-доменов из Telegram и Instagram')
+    commands = parser.add_subparsers(dest='command', metavar='КОМАНДА')
+    
+    search = commands.add_parser('search', parents=[search_options],
+                                 help='поиск URL профилей -> файл URL')
+    search.add_argument('-o', '--output', default=config.STAGE_URLS_FILE,
+                        help='файл URL (по умолчанию %(default)s)')
+    search.add_argument('--from-cache', action='store_true',
+                        help='разобрать заново страницы из кэша выдачи, без запросов к поисковику')
+    search.add_argument('--processes', type=int, default=config.SEARCH_LINK_PROCESSES,
+                        help='процессов для разбора страниц кэша (по умолчанию по числу ядер)')
+    
+    extract = commands.add_parser('extract', parents=[input_options],
+                                  help='URL -> юзернеймы и домены-кандидаты')
+    extract.add_argument('--urls', default=config.STAGE_URLS_FILE,
+                         help='файл URL этапа search (по умолчанию %(default)s)')
+    extract.add_argument('-o', '--output', default=config.STAGE_USERNAMES_FILE,
+                         help='файл юзернеймов (по умолчанию %(default)s)')
+    
+    check = commands.add_parser('check', parents=[check_options],
+                                help='WHOIS-проверка доменов -> файл результатов')
+    check.add_argument('domains', nargs='*', metavar='DOMAIN',
+                       help='домены для проверки (без них — из файла юзернеймов)')
+    check.add_argument('--usernames', default=config.STAGE_USERNAMES_FILE,
+                       help='файл юзернеймов этапа extract (по умолчанию %(default)s)')
+    check.add_argument('-o', '--output', default=config.STAGE_RESULTS_FILE,
+                       help='файл результатов WHOIS (по умолчанию %(default)s)')
+    
+    export = commands.add_parser('export', parents=[export_options],
+                                 help='юзернеймы + результаты WHOIS -> отчет')
+    export.add_argument('--usernames', default=config.STAGE_USERNAMES_FILE,
+                        help='файл юзернеймов этапа extract (по умолчанию %(default)s)')
+    export.add_argument('--results', default=config.STAGE_RESULTS_FILE,
+                        help='файл результатов этапа check (по умолчанию %(default)s)')
+    
+    run = commands.add_parser('run', parents=[search_options, input_options, check_options, export_options],
+                              help='все этапы одним потоковым конвейером (по умолчанию)')
+    run.add_argument('--cache-compact', action='store_true',
+                     help='удалить устаревшие записи кэшей WHOIS и страниц выдачи и выйти')
+    run.add_argument('--resume', action='store_true',
+                     help='продолжить прерванный запуск по журналу выполнения')
+    run.add_argument('--dns-triage', action='store_true', default=config.DNS_TRIAGE_ENABLED,
+                     help='проверять делегирование (NS) через DNS до WHOIS')
+    run.add_argument('--dns-mode', choices=['skip', 'enrich'], default=config.DNS_TRIAGE_MODE,
+                     help='делегированные домены: skip — сразу занятые, '
+                          'enrich — WHOIS в последнюю очередь (по умолчанию %(default)s)')
+    run.add_argument('--dns-resolver', metavar='HOST[:PORT]', default=config.DNS_RESOLVER,
+                     help='DNS-сервер для проверки делегирования')
+    run.add_argument('--reparse', action='store_true',
+                     help='заново разобрать ответы из архива WHOIS (без запросов к серверам) и выйти')
+    run.add_argument('--watch', action='store_true',
+                     help='наблюдать за доменами из кэша WHOIS: перепроверка по сроку истечения')
+    run.add_argument('--serve', action='store_true',
+                     help='запустить HTTP/JSON-сервис проверки доменов')
+    run.add_argument('--port', type=int, default=config.SERVICE_PORT,
+                     help='порт сервиса (по умолчанию %(default)s)')
+    run.add_argument('--metrics-port', type=int, default=config.METRICS_PORT,
+                     help='отдавать метрики Prometheus на http://0.0.0.0:PORT/metrics во время работы')
+    
+    return parser.parse_args(argv)
+
+
+def compact_cache():
+    """Очистка кэша WHOIS от устаревших записей"""
+    from src.page_cache import PageCache
+    from src.whois_cache import WhoisCache
+    
+    cache = WhoisCache()
+    removed = cache.compact()
+    stats = cache.stats()
+    cache.close()
+    
+    print(f"🧹 Удалено устаревших записей: {removed}")
+    print(f"   Записей в кэше: {stats['entries']}")
+    
+    page_cache = PageCache()
+    removed = page_cache.compact()
+    stats = page_cache.stats()
+    page_cache.close()
+    
+    print(f"🧹 Удалено устаревших страниц выдачи: {removed}")
+    print(f"   Страниц в кэше: {stats['entries']} ({stats['bytes'] / 1024 / 1024:.1f} МБ)")
+
+
+def open_archive():
+    """Архив полных ответов WHOIS (если включен в config)"""
+    if not config.WHOIS_ARCHIVE_ENABLED:
+        return None
+    from src.whois_archive import WhoisArchive
+    archive = WhoisArchive()
+    if archive.recovered:
+        print(f"📦 Архив WHOIS: в индекс добавлено {archive.recovered} записей после аварийного завершения")
+    return archive
+
+
+def reparse_archive(export_format: str):
+    """Повторный разбор архива WHOIS и отчет по результатам"""
+    from src.exporters import create_exporter
+    from src.records import UsernameRecord
+    from src.whois_archive import WhoisArchive
+    from src.whois_cache import WhoisCache
+    
+    archive = WhoisArchive()
+    stats = archive.stats()
+    print(f"📦 Архив WHOIS: {stats['records']} ответов, {stats['domains']} доменов, "
+          f"{stats['bytes'] / 1024 / 1024:.1f} МБ в {stats['segments']} сегментах")
+    
+    started = time.perf_counter()
+    results = archive.reparse()
+    elapsed = time.perf_counter() - started
+    archive.close()
+    print(f"   Разобрано за {elapsed:.1f} с ({stats['records'] / max(elapsed, 1e-9):,.0f} ответов/с)")
+    
+    # Сравнение с результатами, сохраненными в кэше
+    changed = 0
+    if config.WHOIS_CACHE_ENABLED and os.path.exists(config.WHOIS_CACHE_FILE):
+        cache = WhoisCache()
+        fields = ('status', 'expiry_date', 'created_date', 'registrar')
+        for domain, cached, _ in cache.entries():
+            if domain in results and any(cached.get(key) != results[domain][1].get(key) for key in fields):
+                changed += 1
+        cache.close()
+    
+    counts: Dict[str, int] = {}
+    output_file = None
+    if results:
+        exporter = create_exporter(export_format)
+        exporter.open()
+        try:
+            for domain, (_, result) in sorted(results.items()):
+                username, _, tld = domain.partition('.')
+                exporter.write(UsernameRecord('archive', username, '', tld), result)
+                counts[result['status']] = counts.get(result['status'], 0) + 1
+        finally:
+            output_file = exporter.close()
+    
+    print(f"   Статусы: " + ', '.join(f"{status} {count}" for status, count in sorted(counts.items())))
+    print(f"   Отличается от кэша WHOIS: {changed}")
+    if output_file:
+        print(f"   Отчет: {output_file}")
+
+
+def watch_domains():
+    """Режим наблюдения: перепроверка доменов до прерывания"""
+    from src.watcher import DomainWatcher
+    from src.whois_cache import WhoisCache
+    from src.whois_checker import WhoisChecker
+    
+    archive = open_archive()
+    watcher = DomainWatcher(WhoisChecker(archive=archive))
+    
+    cache = WhoisCache()
+    added = watcher.add_many(cache.entries())
+    cache.close()
+    
+    stats = watcher.due_stats()
+    print(f"👁  Под наблюдением: {stats['domains']} доменов (новых из кэша: {added})")
+    print(f"   Занятых: {stats.get('Registered', 0)}, свободных: {stats.get('Available', 0)}, "
+          f"проверок в ближайшие сутки: {stats['due_24h']}")
+    print(f"   Изменения статуса: {watcher.events_file}")
+    
+    try:
+        asyncio.run(watcher.run())
+    except KeyboardInterrupt:
+        print("\n\nНаблюдение остановлено")
+    finally:
+        print(f"   Проверено: {watcher.stats['checked']}, изменений: {watcher.stats['changed']}, "
+              f"ошибок: {watcher.stats['errors']}")
+        watcher.close()
+        if archive is not None:
+            archive.close()
+
+
+def serve(port: int, use_cache: bool):
+    """Режим сервиса: проверка доменов по HTTP до прерывания"""
+    from src.service import DomainService
+    from src.whois_cache import WhoisCache
+    from src.whois_checker import WhoisChecker
+    
+    cache = WhoisCache() if config.WHOIS_CACHE_ENABLED and use_cache else None
+    archive = open_archive()
+    service = DomainService(WhoisChecker(cache=cache, archive=archive))
+    
+    try:
+        asyncio.run(service.serve_forever(port=port))
+    except KeyboardInterrupt:
+        print("\n\nСервис остановлен")
+    finally:
+        stats = service.stats
+        print(f"   Запросов: {stats['requests']}, доменов: {stats['lookups']}, "
+              f"из кэша: {stats['cache_hits']}, объединено: {stats['coalesced']}, "
+              f"WHOIS-запросов: {stats['queries']}")
+        if cache is not None:
+            cache.close()
+        if archive is not None:
+            archive.close()
+
+
+def save_metrics():
+    """Сохранение метрик и вывод разбивки времени по этапам"""
+    from src.metrics import (
+        METRICS, RATE_LIMIT_WAIT_SECONDS, SEARCH_BACKOFF_SECONDS,
+        SEARCH_PAGE_SECONDS, WHOIS_QUERY_SECONDS
+    )
+    
+    METRICS.write_prometheus(config.METRICS_FILE)
+    METRICS.write_summary(config.METRICS_SUMMARY_FILE)
+    
+    pages, page_time = SEARCH_PAGE_SECONDS.totals()
+    queries, whois_time = WHOIS_QUERY_SECONDS.totals()
+    
+    # Время суммируется по всем параллельным запросам
+    print(f"\n⏱  Суммарное время по этапам:")
+    print(f"   Загрузка выдачи: {page_time:.1f} с ({pages} запросов)")
+    print(f"   Паузы перед повтором: {SEARCH_BACKOFF_SECONDS.total():.1f} с")
+    print(f"   WHOIS-запросы: {whois_time:.1f} с ({queries} запросов)")
+    print(f"   Ожидание лимитов частоты: {RATE_LIMIT_WAIT_SECONDS.total():.1f} с")
+    print(f"   Метрики: {config.METRICS_FILE}, {config.METRICS_SUMMARY_FILE}")
+
+
+def search_stage(args):
+    """Этап search: поиск URL профилей и запись в файл"""
+    from src.artifacts import write_jsonl
+    from src.google_search import GoogleSearcher
+    from src.page_cache import PageCache
+    
+    page_cache = None
+    if args.from_cache or (config.PAGE_CACHE_ENABLED and not args.no_page_cache):
+        page_cache = PageCache()
+    
+    try:
+        searcher = GoogleSearcher(page_cache=page_cache, shard=args.shard)
+        if args.from_cache:
+            urls = searcher.iter_cached_sources(args.processes)
+        else:
+            urls = searcher.iter_all_sources()
+        count = write_jsonl(args.output, ({'source': source, 'url': url} for source, url in urls))
+    finally:
+        if page_cache is not None:
+            page_cache.close()
+    
+    print(f"\n✅ Найдено URL: {count} -> {args.output}")
+
+
+def extract_stage(args):
+    """Этап extract: юзернеймы и домены-кандидаты из файла URL (или входных файлов)"""
+    from src.artifacts import read_jsonl, write_jsonl
+    from src.dedup import create_dedup
+    from src.domain_planner import DomainPlanner
+    from src.username_extractor import UsernameExtractor
+    
+    if args.input:
+        items = InputReader(args.input, source=args.input_source, use_mmap=args.mmap).iter_all_sources()
+    else:
+        items = ((entry['source'], entry['url']) for entry in read_jsonl(args.urls))
+    
+    dedup = create_dedup(args.dedup, args.dedup_state)
+    extractor = UsernameExtractor(dedup=dedup)
+    planner = DomainPlanner()
+    
+    def rows() -> Iterator[dict]:
+        while True:
+            batch = list(islice(items, config.INPUT_BATCH_SIZE))
+            if not batch:
+                return
+            for record in extractor.process_batch(batch):
+                for candidate in planner.plan(record):
+                    yield candidate.as_dict()
+    
+    count = write_jsonl(args.output, rows())
+    if args.dedup_state:
+        dedup.save(args.dedup_state)
+    
+    stats = planner.stats
+    print(f"✅ Юзернеймов: {stats['usernames']}, доменов-кандидатов: {count} "
+          f"(недопустимых юзернеймов: {stats['invalid']}) -> {args.output}")
+
+
+def check_stage(args):
+    """Этап check: WHOIS-проверка доменов из аргументов или файла юзернеймов"""
+    from src.artifacts import read_jsonl, write_jsonl
+    from src.domain_planner import DomainPlanner
+    from src.records import UsernameRecord
+    from src.whois_cache import WhoisCache
+    from src.whois_checker import WhoisChecker
+    
+    if args.domains:
+        domains = []
+        for domain in args.domains:
+            name, _, tld = domain.strip().lower().rstrip('.').partition('.')
+            if tld not in config.TLD_WHOIS_SERVERS or not DomainPlanner.is_valid_label(name):
+                print(f"⚠️  Пропущен недопустимый домен: {domain}")
+                continue
+            domains.append(f"{name}.{tld}")
+    else:
+        domains = [UsernameRecord(**entry).domain for entry in read_jsonl(args.usernames)]
+    
+    # Домен из нескольких строк проверяется один раз
+    domains = list(dict.fromkeys(domains))
+    if not domains:
+        write_jsonl(args.output, [])
+        print(f"Нет доменов для проверки -> {args.output}")
+        return
+    
+    cache = WhoisCache() if config.WHOIS_CACHE_ENABLED and not args.no_cache else None
+    archive = open_archive()
+    try:
+        checker = WhoisChecker(cache=cache, archive=archive)
+        names, tlds = zip(*(domain.split('.', 1) for domain in domains))
+        results = asyncio.run(checker.check_multiple_domains_async(list(names), tlds=list(tlds)))
+    finally:
+        if cache is not None:
+            cache.close()
+        if archive is not None:
+            archive.close()
+    
+    write_jsonl(args.output, results)
+    
+    counts: Dict[str, int] = {}
+    for result in results:
+        counts[result['status']] = counts.get(result['status'], 0) + 1
+    print(f"\n✅ Проверено доменов: {len(results)} ("
+          + ', '.join(f"{status} {count}" for status, count in sorted(counts.items()))
+          + f") -> {args.output}")
+
+
+def export_stage(args):
+    """Этап export: отчет из файлов юзернеймов и результатов WHOIS"""
+    from src.artifacts import read_jsonl
+    from src.exporters import create_exporter
+    from src.records import UsernameRecord
+    
+    exporter = create_exporter(args.format)
+    exporter.export(
+        (UsernameRecord(**entry) for entry in read_jsonl(args.usernames)),
+        read_jsonl(args.results)
+    )
+
+
+def run_pipeline(args):
+    """Команда run: все этапы одновременно в потоковом конвейере"""
+    if args.cache_compact:
+        compact_cache()
+        return
+    
+    if args.reparse:
+        reparse_archive(args.format)
+        return
+    
+    if args.watch:
+        watch_domains()
+        return
+    
+    if args.serve:
+        serve(args.port, not args.no_cache)
+        return
+    
+    from src.dedup import create_dedup
+    from src.dns_triage import DnsTriage
+    from src.exporters import create_exporter
+    from src.metrics import METRICS
+    from src.page_cache import PageCache
+    from src.pipeline import Pipeline
+    from src.run_journal import RunJournal
+    from src.username_extractor import UsernameExtractor
+    from src.whois_cache import WhoisCache
+    from src.whois_checker import WhoisChecker
+    
     print_banner()
     
+    cache = None
+    if config.WHOIS_CACHE_ENABLED and not args.no_cache:
+        cache = WhoisCache()
+    
+    journal = RunJournal(resume=args.resume)
+    archive = open_archive()
+    
+    page_cache = None
+    if config.PAGE_CACHE_ENABLED and not args.no_page_cache and not args.input:
+        page_cache = PageCache()
+    
+    metrics_server = None
+    if args.metrics_port:
+        metrics_server = METRICS.serve(args.metrics_port)
+        print(f"📈 Метрики: http://0.0.0.0:{args.metrics_port}/metrics")
+    dedup = create_dedup(args.dedup, args.dedup_state)
+    
+    triage = None
+    if args.dns_triage:
+        triage = DnsTriage(resolver=args.dns_resolver, mode=args.dns_mode)
+        print(f"🌐 Проверка делегирования через DNS {triage.address[0]}:{triage.address[1]} "
+              f"(режим {triage.mode})")
+    
     try:
-        # Шаг 1: Поиск профилей через Google
+        # Этапы работают одновременно: результаты WHOIS появляются,
+        # пока поиск еще продолжается
         print("\n" + "=" * 60)
-        print("ЭТАП 1: Поиск профилей через Google")
+        if args.input:
+            print("Файлы -> извлечение uz-юзернеймов -> WHOIS -> экспорт")
+            searcher = InputReader(args.input, source=args.input_source, use_mmap=args.mmap)
+            input_batch_size = config.INPUT_BATCH_SIZE
+        else:
+            print("Поиск -> извлечение uz-юзернеймов -> WHOIS -> экспорт")
+            from src.google_search import GoogleSearcher
+            searcher = GoogleSearcher(journal=journal, page_cache=page_cache, shard=args.shard)
+            input_batch_size = 1
         print("=" * 60)
         
-        searcher = GoogleSearcher()
-        urls_dict = searcher.search_all_sources()
+        pipeline = Pipeline(
+            searcher=searcher,
+            extractor=UsernameExtractor(dedup=dedup),
+            checker=WhoisChecker(cache=cache, archive=archive),
+            exporter=create_exporter(args.format),
+            journal=journal,
+            input_batch_size=input_batch_size,
+            triage=triage
+        )
+        stats = asyncio.run(pipeline.run())
         
-        total_urls = sum(len(urls) for urls in urls_dict.values())
-        print(f"\nВсего найдено URL: {total_urls}")
+        # Состояние сохраняется только после успешного запуска, чтобы
+        # непроверенные юзернеймы не пропускались при следующем
+        if args.dedup_state:
+            dedup.save(args.dedup_state)
         
-        if total_urls == 0:
-            print("Не найдено ни одного URL. Завершение работы.")
-            return
-        
-        # Шаг 2: Извлечение юзернеймов
-        print("\n" + "=" * 60)
-        print("ЭТАП 2: Извлечение uz-юзернеймов")
-        print("=" * 60)
+        print(f"\nВсего найдено URL: {stats['urls']}")
+        print(f"Всего uz-юзернеймов: {stats['usernames']}")
+        print(f"Доменов-кандидатов: {stats['domains']} (повторов из других источников: "
+              f"{stats['domains'] - stats['checked']}, "
+              f"недопустимых юзернеймов: {pipeline.planner.stats['invalid']})")
         
-        extractor = UsernameExtractor()
-        usernames_data = extractor.process_urls(urls_dict)
-        
-        print(f"\nВсего uz-юзернеймов: {len(usernames_data)}")
-        
-        if len(usernames_data) == 0:
+        if stats['usernames'] == 0:
             print("Не найдено юзернеймов, заканчивающихся на 'uz'. Завершение работы.")
             return
         
-        # Шаг 3: Проверка доменов через WHOIS
-        print("\n" + "=" * 60)
-        print("ЭТАП 3: Проверка доменов через WHOIS")
-        print("=" * 60)
-        
-        checker = WhoisChecker()
-        usernames_list = [item['username'] for item in usernames_data]
-        whois_results = checker.check_multiple_domains(usernames_list)
-        
-        # Подсчет статистики
-        available = len([r for r in whois_results if r['status'] == 'Available'])
-        registered = len([r for r in whois_results if r['status'] == 'Registered'])
-        
         print(f"\nПроверка завершена:")
-        print(f"   Свободных доменов: {available}")
-        print(f"   Занятых доменов: {registered}")
-        
-        # Шаг 4: Экспорт в Excel
-        print("\n" + "=" * 60)
-        print("ЭТАП 4: Экспорт результатов")
-        print("=" * 60)
+        print(f"   Свободных доменов: {stats['available']}")
+        print(f"   Занятых доменов: {stats['registered']}")
+        if stats['errors']:
+            print(f"   С ошибкой после повторов: {stats['errors']}")
+        for server, rate in pipeline.checker.rates().items():
+            print(f"   Частота WHOIS {server}: {rate:.2f} запросов/с")
+        if triage is not None:
+            print(f"   Без WHOIS по NS-записям: {stats['dns_delegated']} "
+                  f"(DNS: делегировано {triage.stats['delegated']}, "
+                  f"нет делегирования {triage.stats['undelegated']}, "
+                  f"без ответа {triage.stats['unknown']})")
         
-        exporter = ExcelExporter()
-        output_file = exporter.export(usernames_data, whois_results)
+        if cache is not None:
+            cache_stats = cache.stats()
+            print(f"   Кэш WHOIS: попаданий {cache_stats['hits']}, промахов {cache_stats['misses']}")
+        if page_cache is not None:
+            page_stats = page_cache.stats()
+            print(f"   Кэш страниц выдачи: попаданий {page_stats['hits']}, промахов {page_stats['misses']}, "
+                  f"устаревших {page_stats['expired']} ({page_stats['hit_ratio']:.0%} из кэша)")
         
         print("\n" + "=" * 60)
         print("ГОТОВО!")
         print("=" * 60)
-        print(f"\nОтчет доступен: {output_file}")
-        print("\nОткройте файл в Excel для просмотра результатов.")
-        
+        if pipeline.output_file:
+            print(f"\nОтчет доступен: {pipeline.output_file}")
+            if args.format == 'xlsx':
+                print("\nОткройте файл в Excel для просмотра результатов.")
+        else:
+            print("\nРезультатов нет, отчет не создан")
+    
     except KeyboardInterrupt:
         print("\n\nПрервано пользователем")
+        print("Для продолжения запустите с параметром --resume")
         sys.exit(1)
     except Exception as e:
         print(f"\n\nКритическая ошибка: {e}")
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        save_metrics()
+        if metrics_server is not None:
+            metrics_server.shutdown()
+        journal.close()
+        if cache is not None:
+            cache.close()
+        if archive is not None:
+            archive.close()
+        if page_cache is not None:
+            page_cache.close()
+
+
+def main():
+    """Главная функция"""
+    args = parse_args()
+    
+    if args.command == 'run':
+        run_pipeline(args)
+        return
+    
+    stages = {
+        'search': search_stage,
+        'extract': extract_stage,
+        'check': check_stage,
+        'export': export_stage,
+    }
+    
+    try:
+        stages[args.command](args)
+    except KeyboardInterrupt:
+        print("\n\nПрервано пользователем")
+        sys.exit(1)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,65 @@
+"""Модуль промежуточных файлов этапов (JSON Lines, по записи на строку)"""
+
+import gzip
+import json
+import os
+from typing import Iterable, Iterator
+
+
+def _open(path: str, mode: str, compress: bool):
+    """Открытие файла этапа (со сжатием — через gzip)"""
+    if compress:
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def write_jsonl(path: str, items: Iterable[dict]) -> int:
+    """
+    Запись результатов этапа
+    
+    Файл пишется во временный и заменяет прежний только после успешного
+    завершения: прерванный этап не оставляет обрезанного файла.
+    
+    Args:
+        path: Путь к файлу (.jsonl или .jsonl.gz)
+        items: Записи (могут поступать из генератора по мере готовности)
+    
+    Returns:
+        Количество записанных записей
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    
+    temp_path = f"{path}.tmp"
+    count = 0
+    try:
+        with _open(temp_path, 'w', path.endswith('.gz')) as f:
+            for item in items:
+                f.write(json.dumps(item, ensure_ascii=False, separators=(',', ':')) + '\n')
+                count += 1
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    
+    os.replace(temp_path, path)
+    return count
+
+
+def read_jsonl(path: str) -> Iterator[dict]:
+    """
+    Чтение результатов предыдущего этапа
+    
+    Args:
+        path: Путь к файлу (.jsonl или .jsonl.gz)
+    
+    Yields:
+        Записи в порядке файла
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Нет файла {path}: сначала запустите предыдущий этап")
+    
+    with _open(path, 'r', path.endswith('.gz')) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -0,0 +1,286 @@
+"""Модуль дедупликации юзернеймов с ограничением по памяти"""
+
+import hashlib
+import json
+import math
+import os
+from array import array
+from typing import Optional
+import config
+
+
+def _hash64(key: str) -> int:
+    """64-битный хэш строки"""
+    digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class ExactDedup:
+    """Точная дедупликация через множество строк (как раньше в process_urls)"""
+    
+    kind = 'exact'
+    
+    def __init__(self):
+        self.keys = set()
+    
+    def add(self, key: str) -> bool:
+        """
+        Добавление ключа
+        
+        Args:
+            key: Ключ вида "source:username"
+        
+        Returns:
+            True, если ключ встретился впервые
+        """
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        return True
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self.keys
+    
+    def __len__(self) -> int:
+        return len(self.keys)
+    
+    def _params(self) -> dict:
+        return {}
+    
+    def _dump(self, f):
+        for key in self.keys:
+            f.write(key.encode('utf-8') + b'\n')
+    
+    def _load(self, f):
+        self.keys = {line.decode('utf-8').rstrip('\n') for line in f}
+    
+    def save(self, path: str):
+        """
+        Сохранение состояния в файл
+        
+        Args:
+            path: Путь к файлу состояния
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        header = dict(self._params(), kind=self.kind, count=len(self))
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(json.dumps(header).encode('utf-8') + b'\n')
+            self._dump(f)
+        os.replace(tmp_path, path)
+
+
+class HashedDedup(ExactDedup):
+    """Компактное множество 64-битных хэшей в массиве с открытой адресацией
+    
+    Около 16 байт на ключ вместо сотен байт для строки в set. Вероятность
+    ложного совпадения двух разных ключей пренебрежимо мала (~n²/2⁶⁵).
+    """
+    
+    kind = 'hashed'
+    
+    def __init__(self, capacity: int = 1024):
+        """
+        Args:
+            capacity: Ожидаемое количество ключей (таблица растет сама)
+        """
+        size = 1024
+        while size < capacity * 2:
+            size *= 2
+        self.table = array('Q', bytes(8 * size))
+        self.count = 0
+    
+    def _find(self, h: int) -> int:
+        """Позиция хэша в таблице или первой свободной ячейки"""
+        table = self.table
+        mask = len(table) - 1
+        i = h & mask
+        while True:
+            value = table[i]
+            if value == 0 or value == h:
+                return i
+            i = (i + 1) & mask
+    
+    def _grow(self):
+        old = self.table
+        self.table = array('Q', bytes(16 * len(old)))
+        for value in old:
+            if value:
+                self.table[self._find(value)] = value
+    
+    @staticmethod
+    def _key_hash(key: str) -> int:
+        # 0 обозначает пустую ячейку
+        return _hash64(key) or 1
+    
+    def add(self, key: str) -> bool:
+        h = self._key_hash(key)
+        i = self._find(h)
+        if self.table[i] == h:
+            return False
+        
+        self.table[i] = h
+        self.count += 1
+        if self.count * 2 > len(self.table):
+            self._grow()
+        return True
+    
+    def __contains__(self, key: str) -> bool:
+        h = self._key_hash(key)
+        return self.table[self._find(h)] == h
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def _dump(self, f):
+        self.table.tofile(f)
+    
+    def _load(self, f):
+        self.table = array('Q')
+        self.table.frombytes(f.read())
+
+
+class BloomDedup(ExactDedup):
+    """Фильтр Блума с заданной вероятностью ложного срабатывания
+    
+    Ложное срабатывание означает, что новый юзернейм будет принят за
+    уже встреченный и пропущен.
+    """
+    
+    kind = 'bloom'
+    
+    def __init__(self, capacity: int = 1_000_000, fp_rate: float = 0.001):
+        """
+        Args:
+            capacity: Ожидаемое количество ключей
+            fp_rate: Допустимая вероятность ложного срабатывания
+        """
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.num_bits = max(8, int(-capacity * math.log(fp_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, key: str):
+        # Двойное хэширование: h1 + i * h2
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        num_bits = self.num_bits
+        return [(h1 + i * h2) % num_bits for i in range(self.num_hashes)]
+    
+    def add(self, key: str) -> bool:
+        bits = self.bits
+        is_new = False
+        for position in self._positions(key):
+            byte, bit = divmod(position, 8)
+            mask = 1 << bit
+            if not bits[byte] & mask:
+                bits[byte] |= mask
+                is_new = True
+        
+        if is_new:
+            self.count += 1
+        return is_new
+    
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+    
+    def __len__(self) -> int:
+        return self.count
+    
+    def _params(self) -> dict:
+        return {'capacity': self.capacity, 'fp_rate': self.fp_rate}
+    
+    def _dump(self, f):
+        f.write(self.bits)
+    
+    def _load(self, f):
+        self.bits = bytearray(f.read())
+
+
+# Доступные способы дедупликации
+DEDUP_BACKENDS = {
+    'exact': ExactDedup,
+    'hashed': HashedDedup,
+    'bloom': BloomDedup,
+}
+
+
+def load_dedup(path: str) -> ExactDedup:
+    """
+    Загрузка сохраненного состояния
+    
+    Args:
+        path: Путь к файлу состояния
+    
+    Returns:
+        Объект дедупликации того типа, с которым он был сохранен
+    """
+    with open(path, 'rb') as f:
+        header = json.loads(f.readline())
+        kind = header.pop('kind')
+        count = header.pop('count')
+        
+        if kind == 'bloom':
+            dedup = BloomDedup(**header)
+        else:
+            dedup = DEDUP_BACKENDS[kind]()
+        
+        dedup._load(f)
+    
+    if kind != 'exact':
+        dedup.count = count
+    return dedup
+
+
+def create_dedup(kind: Optional[str] = None, state_file: Optional[str] = None) -> ExactDedup:
+    """
+    Создание объекта дедупликации
+    
+    Состояние другого типа переносится, только если оно точное (exact):
+    из хэшей и фильтра Блума исходные ключи не восстановить.
+    
+    Args:
+        kind: exact, hashed или bloom (по умолчанию из config)
+        state_file: Файл состояния прошлых запусков (загружается, если существует)
+    
+    Returns:
+        Объект дедупликации
+    
+    Raises:
+        ValueError: Неизвестный способ или состояние несовместимого типа
+    """
+    kind = kind or config.DEDUP_BACKEND
+    
+    if state_file and os.path.exists(state_file):
+        dedup = load_dedup(state_file)
+        print(f"♻️  Загружено ранее найденных юзернеймов: {len(dedup):,} ({dedup.kind})")
+        if dedup.kind == kind:
+            return dedup
+        if dedup.kind != 'exact':
+            raise ValueError(
+                f"Состояние {state_file} сохранено способом {dedup.kind}, запрошен {kind}: "
+                f"укажите --dedup {dedup.kind} или другой файл состояния"
+            )
+        
+        converted = create_dedup(kind)
+        for key in dedup.keys:
+            converted.add(key)
+        print(f"⚠️  Состояние exact перенесено в {kind}")
+        return converted
+    
+    if kind == 'hashed':
+        # Таблица растет по мере заполнения, заранее память не резервируется
+        return HashedDedup()
+    if kind == 'bloom':
+        return BloomDedup(config.DEDUP_CAPACITY, config.DEDUP_FP_RATE)
+    if kind == 'exact':
+        return ExactDedup()
+    
+    raise ValueError(f"Неизвестный способ дедупликации: {kind}")
@@ -0,0 +1,270 @@
+"""Модуль предварительной проверки делегирования доменов через DNS"""
+
+import asyncio
+import random
+import struct
+import time
+from typing import Dict, List, Optional, Tuple
+import config
+from src.metrics import DNS_LOOKUP_SECONDS, DNS_LOOKUPS
+
+# Типы и коды DNS
+QTYPE_NS = 2
+QCLASS_IN = 1
+RCODE_NOERROR = 0
+RCODE_NXDOMAIN = 3
+
+# Результаты проверки
+DELEGATED = 'delegated'
+UNDELEGATED = 'undelegated'
+UNKNOWN = 'unknown'
+
+
+def read_name(data: bytes, offset: int) -> Tuple[str, int]:
+    """
+    Чтение доменного имени с учетом сжатия (RFC 1035, 4.1.4)
+    
+    Args:
+        data: DNS-сообщение
+        offset: Смещение начала имени
+    
+    Returns:
+        Имя в нижнем регистре и смещение сразу после него
+    """
+    labels = []
+    end = None
+    jumps = 0
+    
+    while True:
+        length = data[offset]
+        if length & 0xC0 == 0xC0:
+            if end is None:
+                end = offset + 2
+            jumps += 1
+            if jumps > 32:
+                raise ValueError('Зацикленные указатели в имени')
+            offset = ((length & 0x3F) << 8) | data[offset + 1]
+            continue
+        
+        offset += 1
+        if length == 0:
+            break
+        labels.append(data[offset:offset + length].decode('ascii', errors='replace').lower())
+        offset += length
+    
+    return '.'.join(labels), end if end is not None else offset
+
+
+class _DnsProtocol(asyncio.DatagramProtocol):
+    """Прием ответов: сопоставление с ожидающими запросами по ID"""
+    
+    def __init__(self, pending: Dict[int, asyncio.Future]):
+        self.pending = pending
+    
+    def datagram_received(self, data: bytes, addr):
+        if len(data) < 12:
+            return
+        future = self.pending.get(struct.unpack('!H', data[:2])[0])
+        if future is not None and not future.done():
+            future.set_result(data)
+    
+    def error_received(self, exc):
+        # ICMP port unreachable и подобные — запросы завершатся по таймауту
+        pass
+
+
+class DnsTriage:
+    """Параллельные NS-запросы по UDP для отсева заведомо занятых доменов
+    
+    Домен с делегированием (NS-записями) зарегистрирован — WHOIS для него
+    не нужен или может подождать. Домены без делегирования и с неясным
+    результатом проверяются через WHOIS.
+    """
+    
+    def __init__(self, resolver: Optional[str] = None, mode: Optional[str] = None,
+                 timeout: Optional[float] = None, concurrency: Optional[int] = None):
+        """
+        Args:
+            resolver: DNS-сервер в виде host или host:port
+                (по умолчанию DNS_RESOLVER или первый nameserver из /etc/resolv.conf)
+            mode: skip — делегированные домены сразу Registered;
+                enrich — проверяются через WHOIS в последнюю очередь
+            timeout: Таймаут одного запроса (секунды)
+            concurrency: Максимум одновременных запросов
+        """
+        host, _, port = (resolver or config.DNS_RESOLVER or self.system_resolver()).partition(':')
+        self.address = (host, int(port) if port else 53)
+        self.mode = mode or config.DNS_TRIAGE_MODE
+        self.timeout = timeout or config.DNS_TIMEOUT
+        self.retries = config.DNS_RETRIES
+        self.concurrency = concurrency or config.DNS_CONCURRENCY
+        
+        self.stats: Dict[str, int] = {DELEGATED: 0, UNDELEGATED: 0, UNKNOWN: 0}
+        
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        # Одновременные первые запросы открывают один сокет
+        self._lock = asyncio.Lock()
+    
+    @staticmethod
+    def system_resolver() -> str:
+        """Первый nameserver из /etc/resolv.conf"""
+        try:
+            with open('/etc/resolv.conf', encoding='utf-8') as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) >= 2 and parts[0] == 'nameserver':
+                        return parts[1]
+        except OSError:
+            pass
+        return '127.0.0.1'
+    
+    @staticmethod
+    def build_query(query_id: int, domain: str) -> bytes:
+        """
+        NS-запрос с рекурсией
+        
+        Args:
+            query_id: Идентификатор запроса
+            domain: Доменное имя
+        
+        Returns:
+            DNS-сообщение
+        """
+        header = struct.pack('!HHHHHH', query_id, 0x0100, 1, 0, 0, 0)
+        qname = b''.join(
+            bytes([len(label)]) + label
+            for label in domain.encode('idna').split(b'.') if label
+        ) + b'\x00'
+        return header + qname + struct.pack('!HH', QTYPE_NS, QCLASS_IN)
+    
+    @staticmethod
+    def parse_response(data: bytes, domain: str) -> Tuple[str, List[str]]:
+        """
+        Разбор ответа на NS-запрос
+        
+        Args:
+            data: DNS-сообщение
+            domain: Запрошенный домен
+        
+        Returns:
+            Результат (delegated, undelegated или unknown) и список NS
+        """
+        _, flags, qdcount, ancount, nscount, _ = struct.unpack('!HHHHHH', data[:12])
+        rcode = flags & 0x000F
+        
+        if rcode == RCODE_NXDOMAIN:
+            return UNDELEGATED, []
+        if rcode != RCODE_NOERROR:
+            return UNKNOWN, []
+        
+        offset = 12
+        for _ in range(qdcount):
+            name, offset = read_name(data, offset)
+            if name != domain:
+                return UNKNOWN, []
+            offset += 4
+        
+        # NS домена ищутся в ответе (рекурсивный сервер) и в authority (referral)
+        nameservers = []
+        for _ in range(ancount + nscount):
+            owner, offset = read_name(data, offset)
+            rtype, _, _, rdlength = struct.unpack('!HHIH', data[offset:offset + 10])
+            offset += 10
+            if rtype == QTYPE_NS and owner == domain:
+                nameservers.append(read_name(data, offset)[0])
+            offset += rdlength
+        
+        # NOERROR без NS: имя есть в зоне, но не делегировано
+        return (DELEGATED if nameservers else UNDELEGATED), nameservers
+    
+    async def start(self):
+        """Открытие UDP-сокета (повторные вызовы до close() ничего не делают)"""
+        async with self._lock:
+            if self._transport is None:
+                loop = asyncio.get_running_loop()
+                self._transport, _ = await loop.create_datagram_endpoint(
+                    lambda: _DnsProtocol(self._pending), remote_addr=self.address
+                )
+                self._semaphore = asyncio.Semaphore(self.concurrency)
+    
+    async def _query(self, domain: str) -> Optional[bytes]:
+        """Отправка запроса с повторами; None при таймауте"""
+        loop = asyncio.get_running_loop()
+        
+        for _ in range(self.retries + 1):
+            query_id = random.getrandbits(16)
+            while query_id in self._pending:
+                query_id = random.getrandbits(16)
+            
+            future = loop.create_future()
+            self._pending[query_id] = future
+            try:
+                self._transport.sendto(self.build_query(query_id, domain))
+                return await asyncio.wait_for(future, timeout=self.timeout)
+            except asyncio.TimeoutError:
+                continue
+            finally:
+                self._pending.pop(query_id, None)
+        
+        return None
+    
+    async def lookup(self, domain: str) -> Tuple[str, List[str]]:
+        """
+        Проверка делегирования домена
+        
+        Args:
+            domain: Доменное имя (например, username.uz)
+        
+        Returns:
+            Результат (delegated, undelegated или unknown) и список NS
+        """
+        if self._transport is None:
+            await self.start()
+        domain = domain.lower().rstrip('.')
+        
+        started = time.perf_counter()
+        async with self._semaphore:
+            data = await self._query(domain)
+        
+        if data is None:
+            status, nameservers = UNKNOWN, []
+        else:
+            try:
+                status, nameservers = self.parse_response(data, domain)
+            except (ValueError, IndexError, struct.error):
+                status, nameservers = UNKNOWN, []
+        
+        DNS_LOOKUP_SECONDS.observe(time.perf_counter() - started)
+        DNS_LOOKUPS.inc(outcome=status)
+        self.stats[status] += 1
+        return status, nameservers
+    
+    @staticmethod
+    def registered_result(domain: str) -> Dict[str, Optional[str]]:
+        """
+        Результат в формате WhoisParser для делегированного домена
+        
+        Args:
+            domain: Доменное имя
+        
+        Returns:
+            Словарь с данными: {status, expiry_date, registrar, created_date}
+        """
+        return {
+            'domain': domain,
+            'status': 'Registered',
+            'expiry_date': None,
+            'registrar': None,
+            'created_date': None,
+        }
+    
+    def close(self):
+        """Закрытие UDP-сокета"""
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        # Следующий запуск может идти в другом цикле событий
+        self._semaphore = None
+        self._lock = asyncio.Lock()
@@ -0,0 +1,108 @@
+"""Модуль планирования WHOIS-проверок: домены-кандидаты для юзернеймов"""
+
+import re
+from dataclasses import replace
+from typing import Iterable, List, Optional
+import config
+from src.records import UsernameRecord
+
+# Метка домена по правилу LDH: буквы, цифры и дефис, не с дефиса в начале или конце
+LDH_LABEL = re.compile(r'[a-z0-9](?:[a-z0-9-]*[a-z0-9])?')
+
+# Символы юзернеймов, недопустимые в метке домена
+SEPARATORS = re.compile(r'[_.]+')
+
+
+class DomainPlanner:
+    """Преобразование юзернеймов в домены-кандидаты перед WHOIS-проверкой
+    
+    Юзернейм приводится к меткам домена способами из DOMAIN_CANDIDATES
+    (shop_uz -> shop.uz и shopuz.uz). Метки, недопустимые по правилу LDH
+    и длине, отбрасываются: такие домены не могут быть зарегистрированы.
+    Повторы домена из разных источников объединяет Pipeline: планировщик
+    не хранит домены и не растет с объемом входных данных.
+    """
+    
+    # Способы получения метки из юзернейма
+    KINDS = ('stem', 'joined', 'hyphen')
+    
+    def __init__(self, kinds: Optional[Iterable[str]] = None):
+        """
+        Args:
+            kinds: Способы получения метки (по умолчанию DOMAIN_CANDIDATES из config):
+                stem — без окончания-зоны (shop_uz -> shop),
+                joined — без разделителей (shop_uz -> shopuz),
+                hyphen — разделители заменены дефисом (shop_uz -> shop-uz)
+        """
+        self.kinds = tuple(kinds or config.DOMAIN_CANDIDATES)
+        for kind in self.kinds:
+            if kind not in self.KINDS:
+                raise ValueError(f"Неизвестный способ получения домена: {kind}")
+        
+        self.stats = {'usernames': 0, 'candidates': 0, 'invalid': 0}
+    
+    @staticmethod
+    def is_valid_label(label: str) -> bool:
+        """
+        Проверка метки домена по правилу LDH и длине
+        
+        Args:
+            label: Метка (часть домена до зоны)
+        
+        Returns:
+            True, если домен с такой меткой может существовать
+        """
+        if not 0 < len(label) <= config.DOMAIN_LABEL_MAX_LENGTH:
+            return False
+        if LDH_LABEL.fullmatch(label) is None:
+            return False
+        # Дефисы в 3-4 позиции зарезервированы для IDN (xn--)
+        return label[2:4] != '--' or label.startswith('xn--')
+    
+    def labels(self, username: str, tld: str) -> List[str]:
+        """
+        Допустимые метки домена для юзернейма
+        
+        Args:
+            username: Юзернейм
+            tld: Доменная зона, на которую он заканчивается
+        
+        Returns:
+            Метки без повторов в порядке self.kinds
+        """
+        lowered = username.lower()
+        labels = []
+        
+        for kind in self.kinds:
+            if kind == 'stem':
+                # Окончание-зона и разделители перед ней: shop_uz -> shop
+                stem = lowered[:-len(tld)] if lowered.endswith(tld) else lowered
+                label = SEPARATORS.sub('', stem.rstrip('_.-'))
+            elif kind == 'joined':
+                label = SEPARATORS.sub('', lowered)
+            else:
+                label = SEPARATORS.sub('-', lowered).strip('-')
+            
+            if label not in labels and self.is_valid_label(label):
+                labels.append(label)
+        
+        return labels
+    
+    def plan(self, record: UsernameRecord) -> List[UsernameRecord]:
+        """
+        Строки отчета для юзернейма: по одной на каждый домен-кандидат
+        
+        Args:
+            record: Найденный юзернейм
+        
+        Returns:
+            Копии записи с меткой домена (пустой список, если допустимых меток нет)
+        """
+        self.stats['usernames'] += 1
+        labels = self.labels(record.username, record.tld)
+        if not labels:
+            self.stats['invalid'] += 1
+            return []
+        
+        self.stats['candidates'] += len(labels)
+        return [replace(record, label=label) for label in labels]
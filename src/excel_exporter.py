@@ -1,102 +1,63 @@
 """Модуль для экспорта результатов в Excel"""
 
-import pandas as pd
-from openpyxl import load_workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from datetime import datetime
-import os
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
 import config
+from src.exporters import BaseExporter
 
 
-class ExcelExporter:
+class ExcelExporter(BaseExporter):
     """Экспорт результатов в Excel с форматированием"""
     
+    extension = 'xlsx'
+    
+    # Заголовки колонок на русском
+    COLUMN_TITLES = {
+        'source': 'Источник',
+        'username': 'Username',
+        'url': 'URL профиля',
+        'domain': 'Домен',
+        'status': 'Статус',
+        'expiry_date': 'Дата истечения',
+        'created_date': 'Дата регистрации',
+        'registrar': 'Регистратор',
+    }
+    
+    # Значения статуса на русском
+    STATUS_MAP = {
+        'Available': '✅ Свободен',
+        'Registered': '❌ Занят',
+        'Unknown': '❓ Неизвестно',
+        'Error': '⚠️ Ошибка'
+    }
+    
+    # Ширина колонок
+    COLUMN_WIDTHS = {
+        'A': 12,  # Источник
+        'B': 20,  # Username
+        'C': 40,  # URL профиля
+        'D': 20,  # Домен
+        'E': 15,  # Статус
+        'F': 15,  # Дата истечения
+        'G': 15,  # Дата регистрации
+        'H': 25   # Регистратор
+    }
+    
     def __init__(self):
-        self.output_dir = config.OUTPUT_DIR
+        super().__init__()
         self.filename = config.OUTPUT_FILENAME
+        self._workbook = None
+        self._sheet = None
     
-    def prepare_data(self, usernames_data: list, whois_results: list) -> pd.DataFrame:
+    def _add_styles(self, wb: Workbook):
         """
-        Подготовка данных для экспорта
+        Регистрация общих именованных стилей книги
         
         Args:
-            usernames_data: Данные о юзернеймах
-            whois_results: Результаты WHOIS-проверки
-            
-        Returns:
-            DataFrame с объединенными данными
+            wb: Книга Excel
         """
-        # Создаем DataFrame из юзернеймов
-        df_users = pd.DataFrame(usernames_data)
-        
-        # Создаем DataFrame из WHOIS результатов
-        df_whois = pd.DataFrame(whois_results)
-        
-        # Объединяем данные
-        # Создаем ключ для объединения
-        df_users['domain'] = df_users['username'].str.lower() + '.uz'
-        
-        # Объединяем по домену
-        df_merged = pd.merge(
-            df_users,
-            df_whois,
-            on='domain',
-            how='left'
-        )
-        
-        # Отбираем нужные колонки и переименовываем
-        df_final = df_merged[[
-            'source',
-            'username',
-            'url',
-            'domain',
-            'status',
-            'expiry_date',
-            'created_date',
-            'registrar'
-        ]].copy()
-        
-        # Переименовываем колонки на русский
-        df_final.columns = [
-            'Источник',
-            'Username',
-            'URL профиля',
-            'Домен .uz',
-            'Статус',
-            'Дата истечения',
-            'Дата регистрации',
-            'Регистратор'
-        ]
-        
-        # Заменяем значения статуса на русский
-        status_map = {
-            'Available': '✅ Свободен',
-            'Registered': '❌ Занят',
-            'Unknown': '❓ Неизвестно',
-            'Error': '⚠️ Ошибка'
-        }
-        
-        df_final['Статус'] = df_final['Статус'].map(status_map).fillna(df_final['Статус'])
-        
-        return df_final
-    
-    def apply_formatting(self, filepath: str):
-        """
-        Применение форматирования к Excel-файлу
-        
-        Args:
-            filepath: Путь к файлу Excel
-        """
-        wb = load_workbook(filepath)
-        ws = wb.active
-        
-        # Стили
-        header_fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
-        header_font = Font(bold=True, color='FFFFFF', size=12)
-        
-        available_fill = PatternFill(start_color='C6EFCE', end_color='C6EFCE', fill_type='solid')
-        registered_fill = PatternFill(start_color='FFC7CE', end_color='FFC7CE', fill_type='solid')
-        
         border = Border(
             left=Side(style='thin'),
             right=Side(style='thin'),
@@ -104,82 +65,74 @@ class ExcelExporter:
             bottom=Side(style='thin')
         )
         
-        # Форматируем заголовки
-        for cell in ws[1]:
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            cell.border = border
-        
-        # Форматируем данные
-        for row in ws.iter_rows(min_row=2, max_row=ws.max_row):
-            for cell in row:
-                cell.border = border
-                cell.alignment = Alignment(vertical='center', wrap_text=True)
-                
-                # Подсвечиваем статус
-                if cell.column == 5:  # Колонка "Статус"
-                    if '✅ Свободен' in str(cell.value):
-                        cell.fill = available_fill
-                    elif '❌ Занят' in str(cell.value):
-                        cell.fill = registered_fill
-        
-        # Автоширина колонок
-        column_widths = {
-            'A': 12,  # Источник
-            'B': 20,  # Username
-            'C': 40,  # URL профиля
-            'D': 20,  # Домен
-            'E': 15,  # Статус
-            'F': 15,  # Дата истечения
-            'G': 15,  # Дата регистрации
-            'H': 25   # Регистратор
-        }
-        
-        for col, width in column_widths.items():
-            ws.column_dimensions[col].width = width
-        
-        # Устанавливаем высоту строк
-        ws.row_dimensions[1].height = 30
-        
-        # Закрепляем первую строку
-        ws.freeze_panes = 'A2'
-        
-        wb.save(filepath)
+        header_style = NamedStyle(name='uz_header')
+        header_style.fill = PatternFill(start_color='366092', end_color='366092', fill_type='solid')
+        header_style.font = Font(bold=True, color='FFFFFF', size=12)
+        header_style.alignment = Alignment(horizontal='center', vertical='center')
+        header_style.border = border
+        wb.add_named_style(header_style)
+        
+        cell_style = NamedStyle(name='uz_cell')
+        cell_style.alignment = Alignment(vertical='center', wrap_text=True)
+        cell_style.border = border
+        wb.add_named_style(cell_style)
     
-    def export(self, usernames_data: list, whois_results: list) -> str:
+    def _add_status_highlight(self, last_row: int):
         """
-        Экспорт данных в Excel
+        Подсветка статуса условным форматированием вместо заливки каждой ячейки
         
         Args:
-            usernames_data: Данные о юзернеймах
-            whois_results: Результаты WHOIS-проверки
-            
-        Returns:
-            Путь к созданному файлу
+            last_row: Номер последней строки с данными
         """
-        # Создаем директорию если не существует
-        os.makedirs(self.output_dir, exist_ok=True)
-        
-        # Генерируем имя файла с датой
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"uz_domains_{timestamp}.xlsx"
-        filepath = os.path.join(self.output_dir, filename)
-        
-        print(f"\n📊 Создание отчета...")
-        
-        # Подготавливаем данные
-        df = self.prepare_data(usernames_data, whois_results)
-        
-        # Экспортируем в Excel
-        df.to_excel(filepath, index=False, engine='openpyxl')
-        
-        # Применяем форматирование
-        self.apply_formatting(filepath)
-        
-        print(f"✅ Отчет сохранен: {filepath}")
-        print(f"📈 Всего записей: {len(df)}")
-        print(f"   ✅ Свободных доменов: {len(df[df['Статус'] == '✅ Свободен'])}")
-        print(f"   ❌ Занятых доменов: {len(df[df['Статус'] == '❌ Занят'])}")
+        available_fill = PatternFill(start_color='C6EFCE', end_color='C6EFCE', fill_type='solid')
+        registered_fill = PatternFill(start_color='FFC7CE', end_color='FFC7CE', fill_type='solid')
         
-        return filepath
+        cell_range = f'E2:E{last_row}'
+        self._sheet.conditional_formatting.add(
+            cell_range, FormulaRule(formula=['ISNUMBER(SEARCH("Свободен",E2))'], fill=available_fill)
+        )
+        self._sheet.conditional_formatting.add(
+            cell_range, FormulaRule(formula=['ISNUMBER(SEARCH("Занят",E2))'], fill=registered_fill)
+        )
+    
+    def _open(self):
+        """Создание книги: она пишется за один проход в режиме write-only"""
+        self._workbook = Workbook(write_only=True)
+        self._add_styles(self._workbook)
+        self._sheet = self._workbook.create_sheet('Sheet1')
+        
+        # Ширина колонок, высота заголовка и закрепление первой строки
+        # задаются до записи строк
+        for col, width in self.COLUMN_WIDTHS.items():
+            self._sheet.column_dimensions[col].width = width
+        self._sheet.row_dimensions[1].height = 30
+        self._sheet.freeze_panes = 'A2'
+        
+        header = []
+        for column in self.COLUMNS:
+            cell = WriteOnlyCell(self._sheet, value=self.COLUMN_TITLES[column])
+            cell.style = 'uz_header'
+            header.append(cell)
+        self._sheet.append(header)
+    
+    def _write(self, record: dict):
+        """Запись строки отчета со статусом на русском"""
+        row = []
+        for column in self.COLUMNS:
+            value = record[column]
+            if column == 'status':
+                value = self.STATUS_MAP.get(value, value)
+            
+            cell = WriteOnlyCell(self._sheet, value=value)
+            cell.style = 'uz_cell'
+            row.append(cell)
+        self._sheet.append(row)
+    
+    def _close(self):
+        """Подсветка статуса и сохранение книги"""
+        if self._rows:
+            self._add_status_highlight(self._rows + 1)
+        
+        self._workbook.save(self.filepath)
+        self._workbook = None
+        self._sheet = None
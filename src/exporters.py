@@ -0,0 +1,237 @@
+"""Модуль потоковых экспортеров результатов"""
+
+import csv
+import json
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, Optional
+import config
+from src.metrics import EXPORT_ROWS
+from src.records import UsernameRecord, WhoisRecord, index_by_domain
+
+
+class BaseExporter:
+    """Базовый потоковый экспортер: open -> write (по одной строке) -> close"""
+    
+    # Колонки отчета (заголовки Excel — ExcelExporter.COLUMN_TITLES)
+    COLUMNS = [
+        'source',
+        'username',
+        'url',
+        'domain',
+        'status',
+        'expiry_date',
+        'created_date',
+        'registrar',
+    ]
+    
+    # Расширение файла отчета
+    extension = ''
+    
+    def __init__(self):
+        self.output_dir = config.OUTPUT_DIR
+        self.filepath = None
+        self._rows = 0
+        self._available = 0
+        self._registered = 0
+    
+    def make_filepath(self) -> str:
+        """Путь к новому файлу отчета с датой в имени"""
+        # Создаем директорию если не существует
+        os.makedirs(self.output_dir, exist_ok=True)
+        
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return os.path.join(self.output_dir, f"uz_domains_{timestamp}.{self.extension}")
+    
+    def build_record(self, username_data: UsernameRecord,
+                     whois_result: Optional[WhoisRecord]) -> Dict[str, Optional[str]]:
+        """
+        Формирование строки отчета
+        
+        Args:
+            username_data: Данные о юзернейме
+            whois_result: Результат WHOIS-проверки (WhoisRecord, словарь WhoisParser или None)
+        
+        Returns:
+            Словарь с ключами из COLUMNS
+        """
+        whois_result = whois_result or {}
+        
+        return {
+            'source': username_data.source,
+            'username': username_data.username,
+            'url': username_data.url,
+            'domain': username_data.domain,
+            'status': whois_result.get('status'),
+            'expiry_date': whois_result.get('expiry_date'),
+            'created_date': whois_result.get('created_date'),
+            'registrar': whois_result.get('registrar'),
+        }
+    
+    def open(self):
+        """Начало потоковой записи"""
+        self.filepath = self.make_filepath()
+        self._rows = 0
+        self._available = 0
+        self._registered = 0
+        
+        print(f"\n📊 Создание отчета...")
+        self._open()
+    
+    def write(self, username_data: UsernameRecord, whois_result: Optional[WhoisRecord]):
+        """
+        Запись одного результата по мере поступления
+        
+        Args:
+            username_data: Данные о юзернейме
+            whois_result: Результат WHOIS-проверки для его домена
+        """
+        record = self.build_record(username_data, whois_result)
+        self._write(record)
+        
+        self._rows += 1
+        EXPORT_ROWS.inc(format=self.extension)
+        if record['status'] == 'Available':
+            self._available += 1
+        elif record['status'] == 'Registered':
+            self._registered += 1
+    
+    def close(self) -> str:
+        """
+        Завершение записи
+        
+        Returns:
+            Путь к созданному файлу
+        """
+        self._close()
+        
+        print(f"✅ Отчет сохранен: {self.filepath}")
+        print(f"📈 Всего записей: {self._rows}")
+        print(f"   ✅ Свободных доменов: {self._available}")
+        print(f"   ❌ Занятых доменов: {self._registered}")
+        
+        return self.filepath
+    
+    def export(self, usernames_data: list, whois_results: list) -> str:
+        """
+        Экспорт готовых списков (без потоковой обработки)
+        
+        Args:
+            usernames_data: Записи UsernameRecord
+            whois_results: Результаты WHOIS-проверки (WhoisRecord или словари)
+        
+        Returns:
+            Путь к созданному файлу
+        """
+        whois_by_domain = index_by_domain(whois_results)
+        
+        self.open()
+        for username_data in usernames_data:
+            self.write(username_data, whois_by_domain.get(username_data.domain))
+        
+        return self.close()
+    
+    def _open(self):
+        """Открытие файла отчета (реализуется наследниками)"""
+        raise NotImplementedError
+    
+    def _write(self, record: Dict[str, Optional[str]]):
+        """Запись строки отчета (реализуется наследниками)"""
+        raise NotImplementedError
+    
+    def _close(self):
+        """Закрытие файла отчета (реализуется наследниками)"""
+        raise NotImplementedError
+
+
+class CsvExporter(BaseExporter):
+    """Экспорт в CSV"""
+    
+    extension = 'csv'
+    
+    def _open(self):
+        self._file = open(self.filepath, 'w', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=self.COLUMNS)
+        self._writer.writeheader()
+    
+    def _write(self, record: Dict[str, Optional[str]]):
+        self._writer.writerow(record)
+    
+    def _close(self):
+        self._file.close()
+
+
+class JsonlExporter(BaseExporter):
+    """Экспорт в JSON Lines (одна запись на строку)"""
+    
+    extension = 'jsonl'
+    
+    def _open(self):
+        self._file = open(self.filepath, 'w', encoding='utf-8')
+    
+    def _write(self, record: Dict[str, Optional[str]]):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+    
+    def _close(self):
+        self._file.close()
+
+
+class SqliteExporter(BaseExporter):
+    """Экспорт в базу SQLite (таблица results)"""
+    
+    extension = 'sqlite3'
+    
+    def _open(self):
+        self._conn = sqlite3.connect(self.filepath)
+        columns = ', '.join(f'{column} TEXT' for column in self.COLUMNS)
+        self._conn.execute(f'CREATE TABLE IF NOT EXISTS results ({columns})')
+        self._insert = (
+            f"INSERT INTO results ({', '.join(self.COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in self.COLUMNS)})"
+        )
+    
+    def _write(self, record: Dict[str, Optional[str]]):
+        self._conn.execute(self._insert, [record[column] for column in self.COLUMNS])
+        
+        # Фиксируем транзакцию пачками, чтобы не держать строки в памяти
+        # (_rows увеличивается после записи, текущая строка еще не учтена)
+        if (self._rows + 1) % config.EXPORT_COMMIT_EVERY == 0:
+            self._conn.commit()
+    
+    def _close(self):
+        self._conn.commit()
+        self._conn.close()
+
+
+# Доступные форматы экспорта
+EXPORTERS = {
+    'csv': CsvExporter,
+    'jsonl': JsonlExporter,
+    'sqlite': SqliteExporter,
+}
+
+EXPORT_FORMATS = ['xlsx'] + list(EXPORTERS)
+
+
+def create_exporter(export_format: Optional[str] = None) -> BaseExporter:
+    """
+    Создание экспортера по названию формата
+    
+    Args:
+        export_format: xlsx, csv, jsonl или sqlite (по умолчанию из config)
+    
+    Returns:
+        Экспортер
+    """
+    export_format = export_format or config.EXPORT_FORMAT
+    
+    if export_format == 'xlsx':
+        # openpyxl нужен только для Excel
+        from src.excel_exporter import ExcelExporter
+        return ExcelExporter()
+    
+    if export_format not in EXPORTERS:
+        raise ValueError(f"Неизвестный формат экспорта: {export_format}")
+    
+    return EXPORTERS[export_format]()
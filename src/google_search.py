@@ -1,75 +1,230 @@
 """Модуль для поиска профилей через Google"""
 
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import random
 import time
-import re
-from typing import List, Dict
+from collections import deque
+from typing import List, Dict, Iterator, Optional, Tuple
 import config
+from src.metrics import (
+    RATE_LIMIT_WAIT_SECONDS, SEARCH_BACKOFF_SECONDS, SEARCH_BYTES,
+    SEARCH_PAGE_SECONDS, SEARCH_PAGES, SEARCH_URLS
+)
+from src.link_extractor import LinkExtractor
+from src.query_planner import QueryPlanner
+from src.rate_limiter import TokenBucket
 
 
 class GoogleSearcher:
     """Поиск профилей Telegram и Instagram через Google"""
     
-    def __init__(self):
+    # Коды ответа, после которых запрос повторяется
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+    
+    RESULTS_PER_PAGE = 10  # Google показывает ~10 результатов на страницу
+    
+    def __init__(self, journal=None, page_cache=None, shard: Optional[bool] = None):
+        """
+        Args:
+            journal: RunJournal для пропуска страниц, загруженных в прошлом запуске
+            page_cache: PageCache с HTML страниц из прошлых запусков
+            shard: Дополнять запросы шардами (по умолчанию SEARCH_SHARDING)
+        """
+        self.journal = journal
+        self.page_cache = page_cache
+        self.shard = config.SEARCH_SHARDING if shard is None else shard
+        self.planner: Optional[QueryPlanner] = None
+        self.link_extractor = LinkExtractor()
         self.headers = {'User-Agent': config.USER_AGENT}
+        self.concurrency = config.SEARCH_CONCURRENCY
+        
+        # Пул соединений под параллельную загрузку страниц
         self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Общий лимит частоты для всех запросов и страниц
+        self.rate_limiter = TokenBucket(config.SEARCH_RATE_LIMIT, config.SEARCH_BURST)
     
-    def search(self, query: str, max_results: int = 50) -> List[str]:
+    def fetch_page(self, query: str, start: int) -> Optional[str]:
         """
-        Поиск по запросу через Google
+        Загрузка одной страницы выдачи с повторами
         
         Args:
             query: Поисковый запрос
-            max_results: Максимальное количество результатов
-            
+            start: Смещение первого результата
+        
         Returns:
-            Список найденных URL
+            HTML страницы или None, если загрузить не удалось
         """
-        urls = []
-        num_pages = (max_results // 10) + 1  # Google показывает ~10 результатов на страницу
-        
-        for page in range(num_pages):
+        for attempt in range(config.SEARCH_MAX_RETRIES + 1):
+            RATE_LIMIT_WAIT_SECONDS.inc(self.rate_limiter.acquire(), limiter='search')
+            
+            delay = config.SEARCH_BACKOFF_BASE * (2 ** attempt) * (1 + random.random())
+            
+            started = time.perf_counter()
             try:
-                start = page * 10
-                search_url = f"https://www.google.com/search?q={query}&start={start}"
-                
-                print(f"  Поиск: {query} (страница {page + 1})")
-                
-                response = self.session.get(search_url, headers=self.headers, timeout=10)
-                response.raise_for_status()
+                response = self.session.get(
+                    config.SEARCH_URL,
+                    params={'q': query, 'start': start},
+                    timeout=10
+                )
+            except requests.RequestException as e:
+                SEARCH_PAGES.inc(outcome='network_error')
+                print(f"  Ошибка при поиске: {e}")
+            else:
+                SEARCH_PAGE_SECONDS.observe(time.perf_counter() - started)
+                SEARCH_BYTES.inc(len(response.content))
                 
-                soup = BeautifulSoup(response.text, 'html.parser')
+                if response.status_code not in self.RETRY_STATUSES:
+                    try:
+                        response.raise_for_status()
+                    except requests.HTTPError as e:
+                        SEARCH_PAGES.inc(outcome='http_error')
+                        print(f"  Ошибка при поиске: {e}")
+                        return None
+                    SEARCH_PAGES.inc(outcome='ok')
+                    return response.text
                 
-                # Извлекаем ссылки из результатов поиска
-                for link in soup.find_all('a'):
-                    href = link.get('href', '')
+                SEARCH_PAGES.inc(outcome='retry')
+                print(f"  {query} (start={start}): HTTP {response.status_code}")
+                retry_after = response.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+            
+            if attempt < config.SEARCH_MAX_RETRIES:
+                SEARCH_BACKOFF_SECONDS.inc(delay)
+                time.sleep(delay)
+        
+        return None
+    
+    def parse_links(self, html: str) -> List[str]:
+        """
+        Извлечение ссылок на профили из страницы выдачи
+        
+        Args:
+            html: HTML страницы
+        
+        Returns:
+            Список URL профилей
+        """
+        urls = self.link_extractor.extract(html)
+        SEARCH_URLS.inc(len(urls))
+        return urls
+    
+    def load_page(self, query: str, start: int) -> Optional[List[str]]:
+        """
+        Загрузка страницы выдачи и извлечение ссылок с учетом журнала и кэша страниц
+        
+        Args:
+            query: Поисковый запрос
+            start: Смещение первого результата
+            
+        Returns:
+            Список URL или None, если страницу загрузить не удалось
+        """
+        if self.journal is not None:
+            urls = self.journal.get_page(query, start)
+            if urls is not None:
+                return urls
+        
+        html = self.page_cache.get(query, start) if self.page_cache is not None else None
+        if html is None:
+            html = self.fetch_page(query, start)
+            if html is None:
+                return None
+            if self.page_cache is not None:
+                self.page_cache.set(query, start, html)
+        
+        urls = self.parse_links(html)
+        
+        if self.journal is not None:
+            self.journal.add_page(query, start, urls)
+        
+        return urls
+    
+    def iter_search_many(self, queries: Dict[str, str],
+                         max_results: int = 50) -> Iterator[Tuple[str, str]]:
+        """
+        Параллельный поиск по нескольким запросам
+        
+        Страницы всех запросов (и их шардов, если включено разбиение)
+        загружаются одновременно в пределах общего лимита частоты. URL
+        объединяются по источнику; запрос перестает листаться, как только
+        страница не приносит новых URL.
+        
+        Args:
+            queries: Словарь {источник: поисковый запрос}
+            max_results: Максимальное количество результатов на запрос
+        
+        Yields:
+            Пары (источник, URL) по мере загрузки страниц
+        """
+        planner = QueryPlanner(queries, max_results, self.RESULTS_PER_PAGE, shard=self.shard)
+        self.planner = planner
+        
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            pending = {}
+            
+            while True:
+                # Заполняем пул страницами запросов с наибольшей отдачей
+                while len(pending) < self.concurrency:
+                    shard = planner.next_shard(config.SEARCH_PAGES_AHEAD)
+                    if shard is None:
+                        break
                     
-                    # Фильтруем ссылки Google
-                    if '/url?q=' in href:
-                        # Извлекаем реальный URL
-                        match = re.search(r'/url\?q=(.*?)&', href)
-                        if match:
-                            url = match.group(1)
-                            if self._is_valid_url(url):
-                                urls.append(url)
-                
-                # Задержка между запросами
-                time.sleep(config.REQUEST_DELAY)
+                    start = planner.take_page(shard)
+                    print(f"  Поиск: {shard.query} (страница {start // self.RESULTS_PER_PAGE + 1})")
+                    pending[executor.submit(self.load_page, shard.query, start)] = shard
                 
-                if len(urls) >= max_results:
+                if not pending:
                     break
-                    
-            except Exception as e:
-                print(f"  Ошибка при поиске: {e}")
-                continue
+                
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                
+                for future in finished:
+                    shard = pending.pop(future)
+                    for url in planner.record(shard, future.result()):
+                        yield shard.source, url
+        
+        if self.shard:
+            print(planner.report())
+    
+    def iter_search(self, query: str, max_results: int = 50) -> Iterator[str]:
+        """
+        Поиск по запросу через Google с выдачей URL по мере загрузки страниц
+        
+        Args:
+            query: Поисковый запрос
+            max_results: Максимальное количество результатов
+        
+        Yields:
+            Найденные URL
+        """
+        for _, url in self.iter_search_many({query: query}, max_results):
+            yield url
+    
+    def search(self, query: str, max_results: int = 50) -> List[str]:
+        """
+        Поиск по запросу через Google
+        
+        Args:
+            query: Поисковый запрос
+            max_results: Максимальное количество результатов
         
-        return urls[:max_results]
+        Returns:
+            Список найденных URL
+        """
+        return list(self.iter_search(query, max_results))
     
     def _is_valid_url(self, url: str) -> bool:
         """Проверка валидности URL"""
         # Проверяем, что это Telegram или Instagram
-        return ('t.me/' in url or 'instagram.com/' in url) and url.startswith('http')
+        return self.link_extractor.is_valid_url(url)
     
     def search_all_sources(self) -> Dict[str, List[str]]:
         """
@@ -78,12 +233,56 @@ class GoogleSearcher:
         Returns:
             Словарь с результатами: {'telegram': [...], 'instagram': [...]}
         """
-        results = {}
+        results = {source: [] for source in config.SEARCH_QUERIES}
+        
+        print(f"\n🔍 Поиск: {', '.join(config.SEARCH_QUERIES)}...")
+        for source, url in self.iter_all_sources():
+            results[source].append(url)
         
-        for source, query in config.SEARCH_QUERIES.items():
-            print(f"\n🔍 Поиск {source}...")
-            urls = self.search(query, config.MAX_RESULTS_PER_SOURCE)
-            results[source] = urls
-            print(f"  Найдено: {len(urls)} URL")
+        for source, urls in results.items():
+            print(f"  {source}: найдено {len(urls)} URL")
         
         return results
+    
+    def iter_all_sources(self) -> Iterator[Tuple[str, str]]:
+        """
+        Поиск по всем источникам с выдачей результатов по мере поступления
+        
+        Yields:
+            Пары (источник, URL)
+        """
+        return self.iter_search_many(config.SEARCH_QUERIES, config.MAX_RESULTS_PER_SOURCE)
+    
+    def iter_cached_sources(self, processes: Optional[int] = None) -> Iterator[Tuple[str, str]]:
+        """
+        Повторный разбор страниц из кэша выдачи без запросов к поисковику
+        
+        Страницы разбираются пулом процессов (LinkExtractor.extract_many):
+        после изменения разбора ссылок весь кэш переразбирается за секунды.
+        
+        Args:
+            processes: Процессов разбора (по умолчанию SEARCH_LINK_PROCESSES)
+        
+        Yields:
+            Пары (источник, URL) без повторов внутри источника
+        """
+        # Источник страницы — по запросу, включая запросы всех шардов
+        planner = QueryPlanner(config.SEARCH_QUERIES, shard=True)
+        sources = {shard.query: shard.source for shard in planner.shards}
+        order = deque()
+        
+        def pages() -> Iterator[str]:
+            for query, _, page in self.page_cache.iter_pages():
+                source = sources.get(query)
+                if source is not None:
+                    order.append(source)
+                    yield page
+        
+        for urls in self.link_extractor.extract_many(pages(), processes):
+            source = order.popleft()
+            SEARCH_URLS.inc(len(urls))
+            seen = planner.seen[source]
+            for url in urls:
+                if url not in seen:
+                    seen.add(url)
+                    yield source, url
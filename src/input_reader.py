@@ -0,0 +1,156 @@
+"""Модуль потокового чтения URL и юзернеймов из файлов"""
+
+import csv
+import gzip
+import io
+import mmap
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+import config
+
+
+class InputReader:
+    """Чтение URL профилей или юзернеймов из текстовых, CSV и gzip-файлов"""
+    
+    # Хост -> источник
+    HOST_SOURCES = {
+        't.me': 'telegram',
+        'telegram.me': 'telegram',
+        'www.t.me': 'telegram',
+        'instagram.com': 'instagram',
+        'www.instagram.com': 'instagram',
+    }
+    
+    # Шаблоны URL для юзернеймов без ссылки
+    PROFILE_URLS = {
+        'telegram': 'https://t.me/{}',
+        'instagram': 'https://instagram.com/{}',
+    }
+    
+    def __init__(self, paths: List[str], source: Optional[str] = None, use_mmap: bool = False):
+        """
+        Args:
+            paths: Пути к входным файлам (.txt, .csv, в том числе .gz)
+            source: Источник для строк без ссылки (telegram или instagram)
+            use_mmap: Читать несжатые текстовые файлы через mmap
+        """
+        self.paths = paths
+        self.source = source
+        self.use_mmap = use_mmap
+        self.stats: Dict[str, int] = {'lines': 0, 'items': 0, 'skipped': 0}
+        self._started = 0.0
+    
+    def _iter_mmap_lines(self, path: str) -> Iterator[str]:
+        """Строки файла через mmap без буферизации в Python"""
+        with open(path, 'rb') as f:
+            if f.seek(0, io.SEEK_END) == 0:
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for line in iter(mm.readline, b''):
+                    yield line.decode('utf-8', errors='ignore')
+    
+    def iter_values(self, path: str) -> Iterator[str]:
+        """
+        Значения из одного файла
+        
+        Args:
+            path: Путь к файлу
+        
+        Yields:
+            Строки (для CSV — значение колонки INPUT_CSV_COLUMN)
+        """
+        is_gzip = path.endswith('.gz')
+        is_csv = path[:-3].endswith('.csv') if is_gzip else path.endswith('.csv')
+        
+        if is_gzip:
+            lines = gzip.open(path, 'rt', encoding='utf-8', errors='ignore')
+        elif self.use_mmap and not is_csv:
+            lines = self._iter_mmap_lines(path)
+        else:
+            lines = open(path, encoding='utf-8', errors='ignore')
+        
+        try:
+            if is_csv:
+                column = config.INPUT_CSV_COLUMN
+                for row in csv.reader(lines):
+                    if len(row) > column:
+                        yield row[column]
+            else:
+                yield from lines
+        finally:
+            if hasattr(lines, 'close'):
+                lines.close()
+    
+    def parse_value(self, value: str) -> Optional[Tuple[str, str]]:
+        """
+        Определение источника и URL профиля для строки
+        
+        Args:
+            value: URL профиля или юзернейм
+        
+        Returns:
+            Пара (источник, URL) или None, если строку не удалось распознать
+        """
+        value = value.strip()
+        if not value or value.startswith('#'):
+            return None
+        
+        if '/' in value:
+            # Ссылка, возможно без схемы; схема и хост — в любом регистре
+            normalize = False
+            if value.startswith(('https://', 'http://')):
+                url = value
+            elif value[:8].lower().startswith(('https://', 'http://')):
+                url = value
+                normalize = True
+            else:
+                url = f"https://{value}"
+            parts = urlsplit(url)
+            source = self.HOST_SOURCES.get(parts.hostname or '')
+            if source is None:
+                return None
+            if normalize or not parts.netloc.islower():
+                # Извлечение юзернейма ожидает схему и хост в нижнем регистре
+                url = parts._replace(netloc=parts.netloc.lower()).geturl()
+            return source, url
+        
+        if self.source is None:
+            return None
+        
+        return self.source, self.PROFILE_URLS[self.source].format(value.lstrip('@'))
+    
+    def _report(self):
+        """Вывод скорости чтения"""
+        elapsed = time.monotonic() - self._started
+        rate = self.stats['lines'] / elapsed if elapsed else 0
+        print(f"  📥 Прочитано строк: {self.stats['lines']:,} ({rate:,.0f} строк/с), "
+              f"URL: {self.stats['items']:,}, пропущено: {self.stats['skipped']:,}")
+    
+    def iter_all_sources(self) -> Iterator[Tuple[str, str]]:
+        """
+        Чтение всех файлов (тот же интерфейс, что у GoogleSearcher)
+        
+        Yields:
+            Пары (источник, URL)
+        """
+        self._started = time.monotonic()
+        progress_every = config.INPUT_PROGRESS_EVERY
+        
+        for path in self.paths:
+            print(f"\n📂 Чтение {path}...")
+            
+            for value in self.iter_values(path):
+                self.stats['lines'] += 1
+                item = self.parse_value(value)
+                
+                if item is None:
+                    self.stats['skipped'] += 1
+                else:
+                    self.stats['items'] += 1
+                    yield item
+                
+                if self.stats['lines'] % progress_every == 0:
+                    self._report()
+        
+        self._report()
@@ -0,0 +1,175 @@
+"""Модуль потокового извлечения ссылок на профили из страниц выдачи"""
+
+import html
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from lxml import etree
+import config
+
+# Тег <a> и значение его атрибута href; значения других атрибутов в кавычках
+# пропускаются целиком, поэтому '>' внутри них не обрывает тег. Перед href —
+# пробел или закрывающая кавычка, иначе совпали бы data-href, xhref и т.п.
+A_HREF = re.compile(
+    r'<a\s(?:[^>"\']|"[^"]*"|\'[^\']*\')*?(?<=[\s"\'])href\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>"\']+))',
+    re.IGNORECASE
+)
+
+
+class LinkExtractor:
+    """Извлечение ссылок на профили из HTML выдачи без построения дерева документа
+    
+    Ссылки читаются по одной: целевым токенизатором (регулярное выражение
+    только по тегам <a>) или потоковым разбором lxml (страница подается
+    порциями SEARCH_LINK_FEED_SIZE, ссылки читаются между порциями). Переходы Google
+    (/url?q=...) раскодируются по правилам query-строки, результат
+    фильтруется по хосту (HOSTS).
+    """
+    
+    # Хосты профилей (и их поддомены)
+    HOSTS = ('t.me', 'instagram.com')
+    
+    # Способы чтения ссылок
+    PARSERS = ('tokenizer', 'lxml')
+    
+    def __init__(self, parser: Optional[str] = None, hosts: Optional[Iterable[str]] = None):
+        """
+        Args:
+            parser: tokenizer или lxml (по умолчанию SEARCH_LINK_PARSER из config)
+            hosts: Хосты профилей (по умолчанию HOSTS)
+        """
+        self.parser = parser or config.SEARCH_LINK_PARSER
+        if self.parser not in self.PARSERS:
+            raise ValueError(f"Неизвестный способ разбора ссылок: {self.parser}")
+        self.hosts = tuple(hosts or self.HOSTS)
+    
+    def iter_hrefs(self, page: str) -> Iterator[str]:
+        """
+        Значения href всех тегов <a> страницы
+        
+        Args:
+            page: HTML страницы
+        
+        Yields:
+            href с раскрытыми HTML-сущностями в порядке страницы
+        """
+        if self.parser == 'lxml':
+            parser = etree.HTMLPullParser(events=('start',), tag='a')
+            step = config.SEARCH_LINK_FEED_SIZE
+            for offset in range(0, len(page), step):
+                parser.feed(page[offset:offset + step])
+                yield from self._read_hrefs(parser)
+            parser.close()
+            yield from self._read_hrefs(parser)
+            return
+        
+        for match in A_HREF.finditer(page):
+            href = match.group(1) or match.group(2) or match.group(3)
+            if href:
+                yield html.unescape(href) if '&' in href else href
+    
+    @staticmethod
+    def _read_hrefs(parser: etree.HTMLPullParser) -> Iterator[str]:
+        """Значения href тегов <a>, разобранных lxml с прошлого чтения"""
+        for _, element in parser.read_events():
+            href = element.get('href')
+            if href:
+                yield href
+    
+    @staticmethod
+    def decode_redirect(href: str) -> Optional[str]:
+        """
+        Адрес назначения ссылки выдачи
+        
+        Args:
+            href: Значение href (переход /url?q=... или прямая ссылка)
+        
+        Returns:
+            Раскодированный URL или None для внутренних ссылок поисковика
+        """
+        try:
+            parts = urlsplit(href)
+        except ValueError:
+            return None
+        if parts.path == '/url' and (not parts.netloc or 'google.' in parts.netloc):
+            params = parse_qs(parts.query)
+            targets = params.get('q') or params.get('url')
+            return targets[0] if targets else None
+        if parts.scheme in ('http', 'https'):
+            return href
+        return None
+    
+    def is_valid_url(self, url: str) -> bool:
+        """
+        Ссылка на профиль в одном из источников
+        
+        Args:
+            url: Абсолютный URL
+        
+        Returns:
+            True, если хост (или его поддомен) из self.hosts и путь не пустой
+        """
+        try:
+            parts = urlsplit(url)
+            host = parts.hostname or ''
+        except ValueError:
+            return False
+        if parts.scheme not in ('http', 'https') or parts.path in ('', '/'):
+            return False
+        return any(host == allowed or host.endswith('.' + allowed) for allowed in self.hosts)
+    
+    def extract(self, page: str) -> List[str]:
+        """
+        Ссылки на профили со страницы выдачи
+        
+        Args:
+            page: HTML страницы
+        
+        Returns:
+            Список URL профилей в порядке страницы
+        """
+        urls = []
+        for href in self.iter_hrefs(page):
+            url = self.decode_redirect(href)
+            if url is not None and self.is_valid_url(url):
+                urls.append(url)
+        return urls
+    
+    def extract_many(self, pages: Iterable[str], processes: Optional[int] = None) -> Iterator[List[str]]:
+        """
+        Разбор множества страниц (повторный разбор кэша выдачи: main.py search --from-cache)
+        
+        Страницы передаются в пул окнами, поэтому в памяти находится лишь
+        несколько пачек страниц, а не весь кэш.
+        
+        Args:
+            pages: HTML страниц
+            processes: Процессов разбора (по умолчанию SEARCH_LINK_PROCESSES,
+                None — по числу ядер, 1 — в текущем процессе)
+        
+        Yields:
+            Списки URL профилей в порядке страниц
+        """
+        processes = processes or config.SEARCH_LINK_PROCESSES or os.cpu_count() or 1
+        if processes <= 1:
+            for page in pages:
+                yield self.extract(page)
+            return
+        
+        tasks = ((self.parser, self.hosts, page) for page in pages)
+        window = processes * config.SEARCH_LINK_CHUNK_SIZE * 2
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            while True:
+                batch = list(islice(tasks, window))
+                if not batch:
+                    break
+                yield from executor.map(_extract_page, batch, chunksize=config.SEARCH_LINK_CHUNK_SIZE)
+
+
+def _extract_page(task: Tuple[str, Tuple[str, ...], str]) -> List[str]:
+    """Разбор страницы в процессе пула"""
+    parser, hosts, page = task
+    return LinkExtractor(parser, hosts).extract(page)
@@ -0,0 +1,358 @@
+"""Модуль метрик: счетчики и гистограммы этапов в формате Prometheus и JSON"""
+
+import bisect
+import http.server
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Границы гистограмм задержки (секунды)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_labels(labelnames: Tuple[str, ...], key: Tuple[str, ...], extra: str = '') -> str:
+    """Метки в виде {a="1",b="2"}"""
+    parts = [
+        '{}="{}"'.format(name, value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in zip(labelnames, key)
+    ]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value))
+
+
+class _Metric:
+    """Общая часть метрик: имя, описание и набор меток"""
+    
+    kind = ''
+    
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+    
+    def _labels_dict(self, key: Tuple[str, ...]) -> Dict[str, str]:
+        return dict(zip(self.labelnames, key))
+
+
+class Counter(_Metric):
+    """Монотонно растущий счетчик"""
+    
+    kind = 'counter'
+    
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self.values: Dict[Tuple[str, ...], float] = {}
+    
+    def inc(self, amount: float = 1, **labels):
+        """
+        Увеличение счетчика
+        
+        Args:
+            amount: Приращение
+            **labels: Значения меток
+        """
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+    
+    def total(self) -> float:
+        """Сумма по всем меткам"""
+        with self._lock:
+            return sum(self.values.values())
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self.values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in items]
+    
+    def summary(self) -> list:
+        with self._lock:
+            items = sorted(self.values.items())
+        return [dict(self._labels_dict(key), value=round(value, 6)) for key, value in items]
+
+
+class Histogram(_Metric):
+    """Распределение значений по корзинам (для задержек)"""
+    
+    kind = 'histogram'
+    
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Метки -> [счетчики корзин (последняя — +Inf), сумма, количество]
+        self.values: Dict[Tuple[str, ...], list] = {}
+    
+    def observe(self, value: float, **labels):
+        """
+        Учет одного значения
+        
+        Args:
+            value: Значение (для задержек — секунды)
+            **labels: Значения меток
+        """
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self.values.get(key)
+            if state is None:
+                state = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self.values[key] = state
+            state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+    
+    def time(self, **labels) -> '_Timer':
+        """Контекстный менеджер, измеряющий длительность блока"""
+        return _Timer(self, labels)
+    
+    def quantile(self, q: float, counts: List[int]) -> float:
+        """
+        Оценка квантиля по корзинам (линейная интерполяция, как histogram_quantile)
+        
+        Args:
+            q: Квантиль от 0 до 1
+            counts: Счетчики корзин
+        
+        Returns:
+            Оценка значения
+        """
+        total = sum(counts)
+        if not total:
+            return 0.0
+        
+        rank = q * total
+        cumulative = 0
+        lower = 0.0
+        for bound, count in zip(self.buckets, counts):
+            if cumulative + count >= rank and count:
+                return lower + (bound - lower) * (rank - cumulative) / count
+            cumulative += count
+            lower = bound
+        
+        # Значение в корзине +Inf: оценкой служит последняя граница
+        return self.buckets[-1]
+    
+    def totals(self) -> Tuple[int, float]:
+        """Количество и сумма значений по всем меткам"""
+        with self._lock:
+            return (sum(state[2] for state in self.values.values()),
+                    sum(state[1] for state in self.values.values()))
+    
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, [list(state[0]), state[1], state[2]]) for key, state in self.values.items())
+        
+        lines = []
+        for key, (counts, total_sum, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total_sum)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+    
+    def summary(self) -> list:
+        with self._lock:
+            items = sorted((key, [list(state[0]), state[1], state[2]]) for key, state in self.values.items())
+        
+        return [
+            dict(
+                self._labels_dict(key),
+                count=count,
+                sum=round(total_sum, 6),
+                mean=round(total_sum / count, 6) if count else 0.0,
+                p50=round(self.quantile(0.5, counts), 6),
+                p90=round(self.quantile(0.9, counts), 6),
+                p99=round(self.quantile(0.99, counts), 6),
+            )
+            for key, (counts, total_sum, count) in items
+        ]
+
+
+class _Timer:
+    """Измерение длительности блока with"""
+    
+    def __init__(self, histogram: Histogram, labels: Dict[str, str]):
+        self.histogram = histogram
+        self.labels = labels
+        self.started = 0.0
+    
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+
+class MetricsRegistry:
+    """Набор метрик запуска"""
+    
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self.started = time.time()
+        self._lock = threading.Lock()
+    
+    def _register(self, metric_class, name: str, help_text: str, labelnames: Iterable[str], **kwargs):
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = metric_class(name, help_text, labelnames, **kwargs)
+                self.metrics[name] = metric
+            return metric
+    
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Counter:
+        """Счетчик (создается при первом обращении)"""
+        return self._register(Counter, name, help_text, labelnames)
+    
+    def histogram(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        """Гистограмма (создается при первом обращении)"""
+        return self._register(Histogram, name, help_text, labelnames, buckets=buckets)
+    
+    def reset(self):
+        """Обнуление всех значений (метрики остаются зарегистрированными)"""
+        with self._lock:
+            for metric in self.metrics.values():
+                with metric._lock:
+                    metric.values.clear()
+            self.started = time.time()
+    
+    def render_prometheus(self) -> str:
+        """Текстовый формат Prometheus"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+    
+    def summary(self) -> dict:
+        """Сводка для JSON: значения счетчиков и квантили гистограмм"""
+        return {
+            'started': self.started,
+            'elapsed_seconds': round(time.time() - self.started, 3),
+            'metrics': {
+                name: {'type': metric.kind, 'help': metric.help, 'values': metric.summary()}
+                for name, metric in self.metrics.items()
+            },
+        }
+    
+    @staticmethod
+    def _write(path: str, text: str):
+        """Атомарная запись файла (чтобы сборщик не прочитал его наполовину)"""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    
+    def write_prometheus(self, path: str):
+        """Запись файла для textfile collector node_exporter"""
+        self._write(path, self.render_prometheus())
+    
+    def write_summary(self, path: str):
+        """Запись JSON-сводки"""
+        self._write(path, json.dumps(self.summary(), ensure_ascii=False, indent=2))
+    
+    def serve(self, port: int, host: str = '0.0.0.0') -> http.server.ThreadingHTTPServer:
+        """
+        HTTP-эндпоинт /metrics (Prometheus) и /summary (JSON) в фоновом потоке
+        
+        Args:
+            port: Порт
+            host: Адрес для прослушивания
+        
+        Returns:
+            Сервер (остановка через shutdown())
+        """
+        registry = self
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.startswith('/metrics'):
+                    body = registry.render_prometheus().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                elif self.path.startswith('/summary'):
+                    body = json.dumps(registry.summary(), ensure_ascii=False).encode('utf-8')
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, *args):
+                pass
+        
+        server = http.server.ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+# Общий набор метрик процесса
+METRICS = MetricsRegistry()
+
+# Поиск
+SEARCH_PAGES = METRICS.counter('uz_search_pages_total', 'Загруженные страницы выдачи по результату', ['outcome'])
+SEARCH_PAGE_SECONDS = METRICS.histogram('uz_search_page_seconds', 'Длительность HTTP-запроса страницы выдачи')
+SEARCH_BYTES = METRICS.counter('uz_search_bytes_total', 'Получено байт страниц выдачи')
+PAGE_CACHE = METRICS.counter('uz_page_cache_total', 'Обращения к кэшу страниц выдачи', ['result'])
+SEARCH_SHARD_URLS = METRICS.counter('uz_search_shard_new_urls_total', 'Новые URL по видам шардов запросов', ['kind'])
+SEARCH_URLS = METRICS.counter('uz_search_urls_total', 'URL профилей, извлеченных из выдачи')
+SEARCH_BACKOFF_SECONDS = METRICS.counter('uz_search_backoff_seconds_total', 'Пауза перед повтором запроса выдачи')
+
+# Извлечение
+EXTRACT_URLS = METRICS.counter('uz_extract_urls_total', 'URL, переданные на извлечение юзернеймов')
+EXTRACT_USERNAMES = METRICS.counter('uz_extract_usernames_total', 'Найдено новых юзернеймов', ['tld'])
+
+# WHOIS
+WHOIS_QUERIES = METRICS.counter('uz_whois_queries_total', 'WHOIS-запросы по результату', ['server', 'outcome'])
+WHOIS_QUERY_SECONDS = METRICS.histogram('uz_whois_query_seconds', 'Длительность WHOIS-запроса', ['server'])
+WHOIS_BYTES = METRICS.counter('uz_whois_bytes_total', 'Получено байт ответов WHOIS', ['server'])
+WHOIS_BREAKER_OPENS = METRICS.counter(
+    'uz_whois_breaker_opens_total', 'Паузы запросов к серверу после серии ошибок', ['server']
+)
+WHOIS_CACHE = METRICS.counter('uz_whois_cache_total', 'Обращения к кэшу WHOIS', ['result'])
+
+# DNS-проверка делегирования
+DNS_LOOKUPS = METRICS.counter('uz_dns_lookups_total', 'NS-запросы по результату', ['outcome'])
+DNS_LOOKUP_SECONDS = METRICS.histogram('uz_dns_lookup_seconds', 'Длительность NS-запроса с повторами')
+
+# Сервис проверки доменов
+SERVICE_LOOKUPS = METRICS.counter(
+    'uz_service_lookups_total', 'Запросы доменов к сервису: cache, coalesced или query', ['result']
+)
+
+# Ожидание в ограничителях частоты
+RATE_LIMIT_WAIT_SECONDS = METRICS.counter(
+    'uz_rate_limit_wait_seconds_total', 'Время ожидания в ограничителях частоты', ['limiter']
+)
+
+# Экспорт и этапы конвейера
+EXPORT_ROWS = METRICS.counter('uz_export_rows_total', 'Записано строк отчета', ['format'])
+STAGE_SECONDS = METRICS.histogram('uz_stage_seconds', 'Время обработки одного элемента этапом конвейера', ['stage'])
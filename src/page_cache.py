@@ -0,0 +1,206 @@
+"""Модуль дискового кэша страниц поисковой выдачи"""
+
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, Optional, Tuple
+import config
+from src.metrics import PAGE_CACHE
+
+
+class PageCache:
+    """Кэш HTML страниц выдачи в SQLite: сжатые тела, TTL и вытеснение по LRU
+    
+    Хранится исходный HTML, а не извлеченные ссылки: после изменения
+    разбора страницы повторный запуск разбирает их заново без запросов.
+    """
+    
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = None,
+                 max_bytes: Optional[int] = None):
+        """
+        Args:
+            path: Путь к файлу кэша (по умолчанию из config)
+            ttl: Время жизни страницы (секунды)
+            max_bytes: Максимальный суммарный размер сжатых страниц
+        """
+        self.path = path or config.PAGE_CACHE_FILE
+        self.ttl = ttl or config.PAGE_CACHE_TTL
+        self.max_bytes = max_bytes or config.PAGE_CACHE_MAX_BYTES
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+        self._pending = 0
+        self._committed = time.monotonic()
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS pages ('
+            ' url TEXT NOT NULL,'
+            ' query TEXT NOT NULL,'
+            ' start INTEGER NOT NULL,'
+            ' body BLOB NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' fetched_at REAL NOT NULL,'
+            ' accessed_at REAL NOT NULL,'
+            ' PRIMARY KEY (url, query, start))'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)')
+        self.conn.commit()
+        
+        self.size = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+    
+    def get(self, query: str, start: int) -> Optional[str]:
+        """
+        HTML страницы из кэша
+        
+        Args:
+            query: Поисковый запрос
+            start: Смещение первого результата
+        
+        Returns:
+            HTML или None, если страницы нет или она устарела
+        """
+        key = (config.SEARCH_URL, query, start)
+        now = time.time()
+        
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT body, fetched_at FROM pages WHERE url = ? AND query = ? AND start = ?', key
+            ).fetchone()
+            
+            if row is None or row[1] + self.ttl <= now:
+                if row is None:
+                    self.misses += 1
+                    PAGE_CACHE.inc(result='miss')
+                else:
+                    self.expired += 1
+                    PAGE_CACHE.inc(result='expired')
+                return None
+            
+            self.conn.execute(
+                'UPDATE pages SET accessed_at = ? WHERE url = ? AND query = ? AND start = ?', (now,) + key
+            )
+            self.hits += 1
+            
+            # Время обращения нужно только для вытеснения: фиксируется пачками,
+            # а не commit (fsync) на каждое попадание
+            self._pending += 1
+            if (self._pending >= config.PAGE_CACHE_COMMIT_EVERY
+                    or time.monotonic() - self._committed >= config.PAGE_CACHE_COMMIT_INTERVAL):
+                self._flush()
+        
+        PAGE_CACHE.inc(result='hit')
+        return zlib.decompress(row[0]).decode('utf-8')
+    
+    def set(self, query: str, start: int, html: str):
+        """
+        Сохранение страницы
+        
+        Args:
+            query: Поисковый запрос
+            start: Смещение первого результата
+            html: HTML страницы
+        """
+        body = zlib.compress(html.encode('utf-8'), config.PAGE_CACHE_COMPRESS_LEVEL)
+        key = (config.SEARCH_URL, query, start)
+        now = time.time()
+        
+        with self._lock:
+            old = self.conn.execute(
+                'SELECT size FROM pages WHERE url = ? AND query = ? AND start = ?', key
+            ).fetchone()
+            self.conn.execute(
+                'INSERT OR REPLACE INTO pages (url, query, start, body, size, fetched_at, accessed_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                key + (body, len(body), now, now)
+            )
+            self.size += len(body) - (old[0] if old else 0)
+            self._evict()
+            self._flush()
+    
+    def _flush(self):
+        self.conn.commit()
+        self._pending = 0
+        self._committed = time.monotonic()
+    
+    def _evict(self):
+        """Удаление давно не использованных страниц сверх max_bytes (под блокировкой)"""
+        while self.size > self.max_bytes:
+            rows = self.conn.execute(
+                'SELECT url, query, start, size FROM pages ORDER BY accessed_at LIMIT 100'
+            ).fetchall()
+            if not rows:
+                self.size = 0
+                return
+            for url, query, start, size in rows:
+                if self.size <= self.max_bytes:
+                    break
+                self.conn.execute(
+                    'DELETE FROM pages WHERE url = ? AND query = ? AND start = ?', (url, query, start)
+                )
+                self.size -= size
+                self.evicted += 1
+    
+    def iter_pages(self) -> Iterator[Tuple[str, int, str]]:
+        """
+        Все сохраненные страницы текущего адреса поиска (для повторного разбора)
+        
+        Yields:
+            Кортежи (запрос, смещение, HTML)
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT query, start FROM pages WHERE url = ? ORDER BY query, start', (config.SEARCH_URL,)
+            ).fetchall()
+        
+        for query, start in rows:
+            with self._lock:
+                row = self.conn.execute(
+                    'SELECT body FROM pages WHERE url = ? AND query = ? AND start = ?',
+                    (config.SEARCH_URL, query, start)
+                ).fetchone()
+            if row is not None:
+                yield query, start, zlib.decompress(row[0]).decode('utf-8')
+    
+    def compact(self) -> int:
+        """
+        Удаление устаревших страниц и сжатие файла базы
+        
+        Returns:
+            Количество удаленных страниц
+        """
+        with self._lock:
+            cursor = self.conn.execute('DELETE FROM pages WHERE fetched_at <= ?', (time.time() - self.ttl,))
+            self._flush()
+            self.conn.execute('VACUUM')
+            self.size = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+            return cursor.rowcount
+    
+    def stats(self) -> Dict[str, float]:
+        """Статистика использования кэша"""
+        with self._lock:
+            entries = self.conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+        lookups = self.hits + self.misses + self.expired
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'expired': self.expired,
+            'evicted': self.evicted,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'bytes': self.size,
+        }
+    
+    def close(self):
+        """Сохранение времени обращений и закрытие базы"""
+        with self._lock:
+            self._flush()
+            self.conn.close()
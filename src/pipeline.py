@@ -0,0 +1,341 @@
+"""Потоковый конвейер: поиск -> извлечение -> домены -> [DNS] -> WHOIS -> экспорт"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+import config
+from src.dns_triage import DELEGATED
+from src.domain_planner import DomainPlanner
+from src.metrics import EXTRACT_URLS, EXTRACT_USERNAMES, STAGE_SECONDS
+from src.records import UsernameRecord, WhoisRecord
+from src.whois_scheduler import WhoisScheduler
+
+# Маркер конца потока в очереди
+_DONE = object()
+
+
+class Pipeline:
+    """Конвейер этапов, связанных ограниченными очередями"""
+    
+    def __init__(self, searcher, extractor, checker, exporter,
+                 queue_size: Optional[int] = None, whois_workers: Optional[int] = None,
+                 journal=None, input_batch_size: int = 1, triage=None, planner=None):
+        """
+        Args:
+            searcher: Источник URL с методом iter_all_sources (GoogleSearcher или InputReader)
+            extractor: UsernameExtractor
+            checker: WhoisChecker
+            exporter: Экспортер с методами open/write/close
+            queue_size: Размер очередей между этапами
+            whois_workers: Одновременных проверок на один WHOIS-сервер
+                (по умолчанию лимит сервера из config)
+            journal: RunJournal для сохранения и пропуска завершенных проверок
+            input_batch_size: Сколько URL забирать из источника за раз
+                (1 для поиска, больше — для быстрого чтения файлов)
+            triage: DnsTriage для отсева делегированных доменов до WHOIS
+            planner: DomainPlanner для выбора доменов-кандидатов (по умолчанию новый)
+        """
+        self.searcher = searcher
+        self.extractor = extractor
+        self.checker = checker
+        self.exporter = exporter
+        self.journal = journal
+        self.input_batch_size = input_batch_size
+        self.queue_size = queue_size or config.PIPELINE_QUEUE_SIZE
+        self.whois_workers = whois_workers
+        self.triage = triage
+        self.planner = planner if planner is not None else DomainPlanner()
+        
+        self.stats = {
+            'urls': 0,
+            'usernames': 0,
+            'domains': 0,
+            'checked': 0,
+            'available': 0,
+            'registered': 0,
+            'errors': 0,
+            'retried': 0,
+            'dns_delegated': 0,
+            'exported': 0,
+        }
+        self.output_file: Optional[str] = None
+        self.first_result_time: Optional[float] = None
+        
+        # Домен -> WhoisRecord (один запрос на домен среди последних
+        # PIPELINE_DOMAIN_CACHE_SIZE доменов: память не растет с объемом входа)
+        self._domains: 'OrderedDict[str, asyncio.Future]' = OrderedDict()
+        # Проверки с ошибкой, отложенные до повтора в конце запуска
+        self._failed: List[tuple] = []
+        self._retry_round = 0
+        self._started = 0.0
+    
+    async def _search_stage(self, url_queue: asyncio.Queue):
+        """Этап 1: поиск URL (блокирующий генератор выполняется в потоке)"""
+        iterator = self.searcher.iter_all_sources()
+        
+        def next_batch() -> list:
+            return list(islice(iterator, self.input_batch_size))
+        
+        while True:
+            with STAGE_SECONDS.time(stage='search'):
+                batch = await asyncio.to_thread(next_batch)
+            if not batch:
+                break
+            self.stats['urls'] += len(batch)
+            await url_queue.put(batch)
+        
+        await url_queue.put(_DONE)
+    
+    async def _extract_stage(self, url_queue: asyncio.Queue, user_queue: asyncio.Queue):
+        """Этап 2: извлечение и дедупликация юзернеймов, выбор доменов-кандидатов"""
+        while True:
+            batch = await url_queue.get()
+            if batch is _DONE:
+                break
+            
+            EXTRACT_URLS.inc(len(batch))
+            with STAGE_SECONDS.time(stage='extract'):
+                if len(batch) > 1:
+                    records = self.extractor.process_batch(batch)
+                else:
+                    records = [self.extractor.process_url(url, source) for source, url in batch]
+            
+            for record in records:
+                if record is not None:
+                    self.stats['usernames'] += 1
+                    EXTRACT_USERNAMES.inc(tld=record.tld)
+                    # Строка на каждый домен-кандидат; повторы домена из других
+                    # источников объединяются в _check одним запросом
+                    for candidate in self.planner.plan(record):
+                        self.stats['domains'] += 1
+                        await user_queue.put(candidate)
+        
+        await user_queue.put(_DONE)
+    
+    async def _triage_stage(self, user_queue: asyncio.Queue, triage_queue: asyncio.Queue):
+        """Этап 2.5: параллельная проверка делегирования через DNS"""
+        pending = set()
+        semaphore = asyncio.Semaphore(self.triage.concurrency)
+        # Домен -> результат NS-запроса (последние DNS_CACHE_SIZE доменов):
+        # строки одного домена из разных источников ждут один запрос
+        lookups: 'OrderedDict[str, asyncio.Future]' = OrderedDict()
+        
+        async def resolve(domain: str) -> Tuple[str, List[str]]:
+            future = lookups.get(domain)
+            if future is not None:
+                lookups.move_to_end(domain)
+                return await future
+            
+            future = asyncio.get_running_loop().create_future()
+            lookups[domain] = future
+            while len(lookups) > config.DNS_CACHE_SIZE:
+                lookups.popitem(last=False)
+            try:
+                with STAGE_SECONDS.time(stage='dns'):
+                    future.set_result(await self.triage.lookup(domain))
+            except BaseException:
+                lookups.pop(domain, None)
+                future.cancel()
+                raise
+            return future.result()
+        
+        async def lookup(record: UsernameRecord):
+            try:
+                await triage_queue.put((record, await resolve(record.domain)))
+            finally:
+                semaphore.release()
+        
+        await self.triage.start()
+        try:
+            while True:
+                record = await user_queue.get()
+                if record is _DONE:
+                    break
+                await semaphore.acquire()
+                task = asyncio.create_task(lookup(record))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            
+            await asyncio.gather(*pending)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+        
+        await triage_queue.put(_DONE)
+    
+    async def _check(self, username: str, tld: str = 'uz',
+                     dns: Optional[Tuple[str, List[str]]] = None) -> WhoisRecord:
+        """Проверка домена с объединением повторных запросов"""
+        domain = f"{username}.{tld}"
+        future = self._domains.get(domain)
+        
+        if future is not None:
+            self._domains.move_to_end(domain)
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._domains[domain] = future
+            while len(self._domains) > config.PIPELINE_DOMAIN_CACHE_SIZE:
+                self._domains.popitem(last=False)
+            
+            result = self.journal.get_whois(domain) if self.journal is not None else None
+            if result is not None and result['status'] == 'Error':
+                # Ошибки прошлого запуска проверяются заново
+                result = None
+            if result is None and self._skip_whois(dns):
+                # Делегированный домен занят: WHOIS не нужен
+                result = self.triage.registered_result(domain)
+                self.stats['dns_delegated'] += 1
+            elif result is None:
+                try:
+                    with STAGE_SECONDS.time(stage='whois'):
+                        result = await self.checker.check_domain_async(username, tld)
+                except Exception as e:
+                    future.set_exception(e)
+                    raise
+                if self.journal is not None:
+                    self.journal.add_whois(domain, result)
+            future.set_result(WhoisRecord.from_dict(result))
+            
+            self.stats['checked'] += 1
+            if result['status'] == 'Available':
+                self.stats['available'] += 1
+            elif result['status'] == 'Registered':
+                self.stats['registered'] += 1
+            elif result['status'] == 'Error':
+                self.stats['errors'] += 1
+            print(f"  [{self.stats['checked']}] {domain}: {result['status']}")
+        
+        return await future
+    
+    def _forget(self, domain: str):
+        """Сброс результата с ошибкой перед повторной проверкой"""
+        # Результат мог быть уже вытеснен из памяти, но в статистике учтен
+        self._domains.pop(domain, None)
+        self.stats['checked'] -= 1
+        self.stats['errors'] -= 1
+    
+    def _skip_whois(self, dns: Optional[Tuple[str, List[str]]]) -> bool:
+        """Домен делегирован, и режим проверки не требует WHOIS для таких доменов"""
+        return dns is not None and dns[0] == DELEGATED and self.triage.mode == 'skip'
+    
+    def _priority(self, dns: Optional[Tuple[str, List[str]]]) -> int:
+        """Приоритет в очереди WHOIS: без запроса — сразу, делегированные в режиме enrich — последними"""
+        if dns is None or dns[0] != DELEGATED:
+            return 0
+        return -1 if self._skip_whois(dns) else 1
+    
+    async def _whois_stage(self, user_queue: asyncio.Queue, result_queue: asyncio.Queue):
+        """Этап 3: WHOIS-проверка в отдельных очередях для каждого сервера"""
+        async def check_record(item: tuple, tld: str):
+            record, dns = item
+            result = await self._check(record.name, tld, dns)
+            if result.status == 'Error' and self._retry_round < config.WHOIS_RETRY_ROUNDS:
+                # Повтор в конце запуска, когда сервер, возможно, восстановится
+                self._failed.append((item, tld))
+                return
+            await result_queue.put((record, result))
+        
+        scheduler = WhoisScheduler(self.checker, check_record, concurrency=self.whois_workers)
+        
+        try:
+            while True:
+                item = await user_queue.get()
+                if item is _DONE:
+                    break
+                # После DNS-этапа в очереди пары (запись, результат NS-запроса)
+                record, dns = item if self.triage is not None else (item, None)
+                await scheduler.submit((record, dns), record.tld, self._priority(dns))
+            
+            await scheduler.join()
+            
+            while self._failed and self._retry_round < config.WHOIS_RETRY_ROUNDS:
+                self._retry_round += 1
+                failed, self._failed = self._failed, []
+                print(f"\n🔁 Повторная проверка после ошибок: {len(failed)} "
+                      f"(попытка {self._retry_round} из {config.WHOIS_RETRY_ROUNDS})")
+                await asyncio.sleep(config.WHOIS_RETRY_DELAY)
+                
+                for domain in {record.domain for (record, _), _ in failed}:
+                    self._forget(domain)
+                self.stats['retried'] += len(failed)
+                
+                scheduler = WhoisScheduler(self.checker, check_record, concurrency=self.whois_workers)
+                for item, tld in failed:
+                    await scheduler.submit(item, tld)
+                await scheduler.join()
+        except BaseException:
+            scheduler.cancel()
+            if scheduler.error is not None:
+                raise scheduler.error from None
+            raise
+        
+        await result_queue.put(_DONE)
+    
+    async def _export_stage(self, result_queue: asyncio.Queue):
+        """Этап 4: передача готовых результатов экспортеру
+        
+        Файл отчета создается при первом результате и закрывается
+        и при ошибке конвейера (в нем остаются уже записанные строки).
+        """
+        try:
+            while True:
+                item = await result_queue.get()
+                if item is _DONE:
+                    break
+                
+                if self.first_result_time is None:
+                    self.first_result_time = time.monotonic() - self._started
+                    print(f"\n⏱  Первый результат через {self.first_result_time:.1f} с")
+                    self.exporter.open()
+                
+                record, result = item
+                with STAGE_SECONDS.time(stage='export'):
+                    self.exporter.write(record, result)
+                self.stats['exported'] += 1
+        finally:
+            if self.first_result_time is not None:
+                self.output_file = self.exporter.close()
+    
+    async def run(self) -> Dict[str, int]:
+        """
+        Запуск конвейера
+        
+        Returns:
+            Статистика по этапам
+        """
+        self._started = time.monotonic()
+        
+        url_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        user_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        result_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        
+        tasks = [
+            asyncio.create_task(self._search_stage(url_queue)),
+            asyncio.create_task(self._extract_stage(url_queue, user_queue)),
+        ]
+        
+        if self.triage is not None:
+            triage_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+            tasks.append(asyncio.create_task(self._triage_stage(user_queue, triage_queue)))
+            user_queue = triage_queue
+        
+        tasks += [
+            asyncio.create_task(self._whois_stage(user_queue, result_queue)),
+            asyncio.create_task(self._export_stage(result_queue)),
+        ]
+        
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        finally:
+            # UDP-сокет привязан к циклу событий этого запуска
+            if self.triage is not None:
+                self.triage.close()
+        
+        return self.stats
@@ -0,0 +1,173 @@
+"""Модуль разбиения поисковых запросов на шарды"""
+
+from typing import Dict, Iterable, List, Optional, Set
+import config
+from src.metrics import SEARCH_SHARD_URLS
+
+
+class QueryShard:
+    """Один поисковый запрос источника и его отдача"""
+    
+    def __init__(self, source: str, query: str, kind: str = 'base', term: str = ''):
+        """
+        Args:
+            source: Источник (telegram, instagram)
+            query: Поисковый запрос
+            kind: Способ получения шарда (base или ключ из SEARCH_SHARD_TERMS)
+            term: Добавленное к базовому запросу слово
+        """
+        self.source = source
+        self.query = query
+        self.kind = kind
+        self.term = term
+        self.next_page = 0
+        self.in_flight = 0
+        self.pages = 0
+        self.urls = 0
+        self.new_urls = 0
+        # Новых URL на последней загруженной странице (None — страниц еще не было)
+        self.last_yield: Optional[int] = None
+        # exhausted — страницы перестали приносить новые URL (загружаемые еще учитываются),
+        # done — достигнут лимит URL (результаты больше не принимаются)
+        self.exhausted = False
+        self.done = False
+    
+    @property
+    def label(self) -> str:
+        return f"{self.source}/{self.kind}:{self.term}" if self.term else f"{self.source}/{self.kind}"
+    
+    @property
+    def yield_per_page(self) -> float:
+        """Средняя отдача: новых URL на страницу"""
+        return self.new_urls / self.pages if self.pages else 0.0
+
+
+class QueryPlanner:
+    """Расширение базовых запросов на шарды и учет их отдачи
+    
+    Поисковик отдает по одному запросу лишь несколько сотен результатов,
+    поэтому базовый запрос дополняется словами (SEARCH_SHARD_TERMS).
+    URL объединяются по источнику: новыми считаются только те, что не
+    встречались ни в одном шарде. Шард перестает листаться, как только
+    страница не приносит новых URL, а следующей загружается страница
+    шарда с наибольшей отдачей.
+    """
+    
+    def __init__(self, queries: Dict[str, str], max_results: int = 50,
+                 results_per_page: int = 10, shard: bool = False,
+                 terms: Optional[Dict[str, Iterable[str]]] = None):
+        """
+        Args:
+            queries: Словарь {источник: базовый поисковый запрос}
+            max_results: Максимум новых URL от одного шарда
+            results_per_page: Результатов на странице выдачи
+            shard: Добавлять шарды к базовым запросам
+            terms: Слова для шардов {вид: [слова]} (по умолчанию SEARCH_SHARD_TERMS)
+        """
+        self.max_results = max_results
+        self.results_per_page = results_per_page
+        self.num_pages = (max_results // results_per_page) + 1
+        self.seen: Dict[str, Set[str]] = {source: set() for source in queries}
+        
+        self.shards: List[QueryShard] = [QueryShard(source, query) for source, query in queries.items()]
+        if shard:
+            terms = terms if terms is not None else config.SEARCH_SHARD_TERMS
+            for source, query in queries.items():
+                for kind, words in terms.items():
+                    template = config.SEARCH_SHARD_TEMPLATES[kind]
+                    for term in words:
+                        self.shards.append(
+                            QueryShard(source, template.format(query=query, term=term), kind, term)
+                        )
+    
+    def _active(self, shard: QueryShard) -> bool:
+        return not (shard.done or shard.exhausted or shard.next_page >= self.num_pages)
+    
+    def next_shard(self, pages_ahead: int) -> Optional[QueryShard]:
+        """
+        Шард, чью следующую страницу стоит загрузить
+        
+        Сначала по одной странице получают все шарды (в порядке: базовые
+        запросы, затем остальные), дальше — шарды с наибольшим числом
+        новых URL на последней странице.
+        
+        Args:
+            pages_ahead: Максимум одновременно загружаемых страниц шарда
+        
+        Returns:
+            Шард или None, если загружать нечего
+        """
+        best = None
+        best_score = None
+        for shard in self.shards:
+            if not self._active(shard) or shard.in_flight >= pages_ahead:
+                continue
+            score = float('inf') if shard.last_yield is None else shard.last_yield
+            if best is None or score > best_score:
+                best, best_score = shard, score
+        return best
+    
+    def take_page(self, shard: QueryShard) -> int:
+        """
+        Резервирование следующей страницы шарда
+        
+        Returns:
+            Смещение первого результата страницы
+        """
+        page = shard.next_page
+        shard.next_page += 1
+        shard.in_flight += 1
+        return page * self.results_per_page
+    
+    def record(self, shard: QueryShard, urls: Optional[List[str]]) -> List[str]:
+        """
+        Учет загруженной страницы шарда
+        
+        Args:
+            shard: Шард
+            urls: URL со страницы (None — загрузить не удалось)
+        
+        Returns:
+            URL, не встречавшиеся раньше ни в одном шарде источника
+        """
+        shard.in_flight -= 1
+        if urls is None or shard.done:
+            return []
+        
+        seen = self.seen[shard.source]
+        new_urls = []
+        for url in urls:
+            if url not in seen:
+                seen.add(url)
+                new_urls.append(url)
+                if shard.new_urls + len(new_urls) >= self.max_results:
+                    shard.done = True
+                    break
+        
+        shard.pages += 1
+        shard.urls += len(urls)
+        shard.new_urls += len(new_urls)
+        shard.last_yield = len(new_urls)
+        SEARCH_SHARD_URLS.inc(len(new_urls), kind=shard.kind)
+        
+        # Страница без новых URL — дальше листать бессмысленно,
+        # но уже загружаемые предыдущие страницы еще учитываются
+        if not new_urls:
+            shard.exhausted = True
+        
+        return new_urls
+    
+    def report(self, top: int = 5) -> str:
+        """Итог по шардам: отдача и остановленные по отсутствию новых URL"""
+        started = [shard for shard in self.shards if shard.pages]
+        exhausted = sum(1 for shard in started if shard.exhausted)
+        lines = [
+            f"📐 Шардов: {len(self.shards)}, загружено страниц: {sum(s.pages for s in started)}, "
+            f"остановлено без новых URL: {exhausted}"
+        ]
+        for shard in sorted(started, key=lambda s: s.new_urls, reverse=True)[:top]:
+            lines.append(
+                f"   {shard.label}: новых URL {shard.new_urls} за {shard.pages} стр. "
+                f"({shard.yield_per_page:.1f}/стр.)"
+            )
+        return '\n'.join(lines)
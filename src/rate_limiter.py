@@ -0,0 +1,246 @@
+"""Модуль ограничения частоты запросов"""
+
+import asyncio
+import threading
+import time
+
+
+class TokenBucket:
+    """Ограничитель частоты запросов по алгоритму token bucket"""
+    
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Args:
+            rate: Количество запросов в секунду
+            burst: Максимальное количество запросов подряд без ожидания
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def _reserve(self) -> float:
+        """
+        Резервирование одного токена
+        
+        Returns:
+            Сколько секунд нужно подождать до использования токена
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            
+            # Токен берется "в долг": следующий вызов увидит отрицательный баланс
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+    
+    def acquire(self) -> float:
+        """
+        Блокирующее получение токена (для потоков)
+        
+        Returns:
+            Время ожидания в секундах
+        """
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+    
+    async def acquire_async(self) -> float:
+        """
+        Асинхронное получение токена
+        
+        Returns:
+            Время ожидания в секундах
+        """
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """Token bucket с подстройкой частоты по схеме AIMD
+    
+    Каждый успешный запрос немного повышает частоту (примерно на increase
+    запросов в секунду за секунду успешной работы), ошибка или таймаут
+    уменьшают ее в decrease раз. Частота сходится к наибольшей, которую
+    выдерживает сервер.
+    """
+    
+    def __init__(self, rate: float, burst: int = 1, min_rate: float = 0.1, max_rate: float = 20.0,
+                 increase: float = 0.1, decrease: float = 0.5, cooldown: float = 2.0):
+        """
+        Args:
+            rate: Начальная частота (запросов в секунду)
+            burst: Максимальное количество запросов подряд без ожидания
+            min_rate: Нижняя граница частоты
+            max_rate: Верхняя граница частоты
+            increase: Прибавка частоты за секунду успешных запросов
+            decrease: Множитель частоты при ошибке
+            cooldown: Ошибки в течение этого времени после снижения не снижают частоту повторно
+                (они вызваны запросами, отправленными еще на старой частоте)
+        """
+        super().__init__(rate, burst)
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.cooldown = cooldown
+        self._decreased = 0.0
+    
+    def record_success(self):
+        """Учет успешного запроса: аддитивное увеличение частоты"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase / self.rate)
+    
+    def record_failure(self):
+        """Учет ошибки или таймаута: мультипликативное снижение частоты"""
+        with self._lock:
+            now = time.monotonic()
+            if now - self._decreased < self.cooldown:
+                return
+            self._decreased = now
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+
+
+class CircuitBreaker:
+    """Пауза запросов к серверу после серии ошибок подряд
+    
+    После failure_threshold ошибок подряд запросы приостанавливаются на
+    reset_timeout, затем проходит один пробный запрос. Если он успешен,
+    работа продолжается, иначе пауза удваивается (до max_reset_timeout).
+    Если результат пробного запроса не учтен за probe_timeout (запрос
+    отменен или прерван исключением), пауза возобновляется.
+    """
+    
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+    
+    # Как часто ждущие запросы проверяют результат пробного запроса (секунды)
+    PROBE_POLL = 0.5
+    
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 10.0,
+                 max_reset_timeout: float = 300.0, probe_timeout: float = 60.0):
+        """
+        Args:
+            name: Имя (адрес сервера) для сообщений
+            failure_threshold: Ошибок подряд до паузы
+            reset_timeout: Начальная длительность паузы (секунды)
+            max_reset_timeout: Максимальная длительность паузы (секунды)
+            probe_timeout: Срок учета результата пробного запроса (секунды)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.base_timeout = reset_timeout
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.probe_timeout = probe_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opens = 0
+        self.opened_until = 0.0
+        self._probing = False
+        self._probe_deadline = 0.0
+        self._lock = threading.Lock()
+    
+    def _delay(self) -> float:
+        """
+        Разрешение на запрос
+        
+        Returns:
+            0, если запрос можно отправлять, иначе сколько подождать до новой попытки
+        """
+        with self._lock:
+            if self.state == self.CLOSED:
+                return 0.0
+            
+            now = time.monotonic()
+            if self.state == self.OPEN:
+                if now < self.opened_until:
+                    return self.opened_until - now
+                # Пауза прошла: этот запрос — пробный
+                self.state = self.HALF_OPEN
+                self._probing = False
+            
+            if not self._probing:
+                self._probing = True
+                self._probe_deadline = now + self.probe_timeout
+                return 0.0
+            if now < self._probe_deadline:
+                return self.PROBE_POLL
+            
+            # Результат пробного запроса так и не учтен: пауза возобновляется,
+            # следующий пробный запрос — после нее
+            self.state = self.OPEN
+            self.opened_until = now + self.reset_timeout
+            self._probing = False
+            timeout = self.reset_timeout
+        
+        print(f"⛔ {self.name}: пробный запрос не завершился, пауза {timeout:g} с")
+        return timeout
+    
+    def wait(self) -> float:
+        """
+        Блокирующее ожидание разрешения на запрос
+        
+        Returns:
+            Время ожидания в секундах
+        """
+        waited = 0.0
+        delay = self._delay()
+        while delay > 0:
+            time.sleep(delay)
+            waited += delay
+            delay = self._delay()
+        return waited
+    
+    async def wait_async(self) -> float:
+        """
+        Асинхронное ожидание разрешения на запрос
+        
+        Returns:
+            Время ожидания в секундах
+        """
+        waited = 0.0
+        delay = self._delay()
+        while delay > 0:
+            await asyncio.sleep(delay)
+            waited += delay
+            delay = self._delay()
+        return waited
+    
+    def record_success(self):
+        """Учет успешного запроса"""
+        with self._lock:
+            recovered = self.state != self.CLOSED
+            self.state = self.CLOSED
+            self.failures = 0
+            self.reset_timeout = self.base_timeout
+            self._probing = False
+        
+        if recovered:
+            print(f"✅ {self.name}: сервер снова отвечает")
+    
+    def record_failure(self):
+        """Учет ошибки или таймаута"""
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN:
+                # Пробный запрос не прошел: пауза длиннее
+                self.reset_timeout = min(self.max_reset_timeout, self.reset_timeout * 2)
+            elif self.state == self.OPEN or self.failures < self.failure_threshold:
+                return
+            
+            self.state = self.OPEN
+            self.opens += 1
+            self.opened_until = time.monotonic() + self.reset_timeout
+            self._probing = False
+            timeout = self.reset_timeout
+        
+        print(f"⛔ {self.name}: {self.failures} ошибок подряд, пауза {timeout:g} с")
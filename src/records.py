@@ -0,0 +1,112 @@
+"""Модуль компактных записей конвейера: юзернеймы и результаты WHOIS"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Union
+
+
+@dataclass(slots=True)
+class UsernameRecord:
+    """Найденный юзернейм
+    
+    Поля хранятся в слотах, а не в словаре записи: на миллионах юзернеймов
+    это в несколько раз меньше памяти. Домен вычисляется по требованию.
+    """
+    
+    source: str
+    username: str
+    url: str
+    tld: str = 'uz'
+    # Метка домена, выбранная DomainPlanner (пусто — юзернейм целиком)
+    label: str = ''
+    
+    @property
+    def name(self) -> str:
+        """Метка домена без зоны"""
+        return self.label or self.username.lower()
+    
+    @property
+    def domain(self) -> str:
+        """Домен юзернейма в его зоне"""
+        return f"{self.name}.{self.tld}"
+    
+    def as_dict(self) -> Dict[str, str]:
+        """Словарь полей (для промежуточных файлов этапов)"""
+        return {'source': self.source, 'username': self.username, 'url': self.url,
+                'tld': self.tld, 'label': self.label}
+
+
+@dataclass(slots=True)
+class WhoisRecord:
+    """Результат WHOIS-проверки домена (полный ответ сервера — в WhoisArchive)"""
+    
+    domain: str
+    status: str
+    expiry_date: Optional[str] = None
+    created_date: Optional[str] = None
+    registrar: Optional[str] = None
+    error: Optional[str] = None
+    
+    @classmethod
+    def from_dict(cls, result: Dict[str, Optional[str]]) -> 'WhoisRecord':
+        """
+        Запись из словаря WhoisParser (лишние ключи отбрасываются)
+        
+        Args:
+            result: Результат WHOIS-проверки
+        
+        Returns:
+            WhoisRecord
+        """
+        return cls(
+            result['domain'].lower(),
+            result['status'],
+            result.get('expiry_date'),
+            result.get('created_date'),
+            result.get('registrar'),
+            result.get('error'),
+        )
+    
+    def as_dict(self) -> Dict[str, Optional[str]]:
+        """Словарь в формате WhoisParser (для JSON, кэша и журнала)"""
+        result = {
+            'domain': self.domain,
+            'status': self.status,
+            'expiry_date': self.expiry_date,
+            'registrar': self.registrar,
+            'created_date': self.created_date,
+        }
+        if self.error is not None:
+            result['error'] = self.error
+        return result
+    
+    # Чтение как из словаря: код, работающий с результатами WhoisParser,
+    # принимает и записи без преобразования
+    def __getitem__(self, key: str) -> Optional[str]:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+    
+    def get(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        return getattr(self, key, default)
+
+
+def index_by_domain(results: Iterable[Union[WhoisRecord, Dict[str, Optional[str]]]]) -> Dict[str, WhoisRecord]:
+    """
+    Индекс результатов WHOIS по домену для соединения с юзернеймами
+    
+    Соединение — один проход по юзернеймам с поиском в словаре, без
+    построения и слияния таблиц.
+    
+    Args:
+        results: Записи WhoisRecord или словари WhoisParser
+    
+    Returns:
+        Словарь {домен: WhoisRecord} (при повторах — последний результат)
+    """
+    index = {}
+    for result in results:
+        if not isinstance(result, WhoisRecord):
+            result = WhoisRecord.from_dict(result)
+        index[result.domain] = result
+    return index
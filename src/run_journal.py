@@ -0,0 +1,94 @@
+"""Модуль журнала выполнения для продолжения прерванного запуска"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+import config
+
+
+class RunJournal:
+    """Журнал завершенной работы: страницы поиска и результаты WHOIS"""
+    
+    def __init__(self, path: Optional[str] = None, resume: bool = False):
+        """
+        Args:
+            path: Путь к файлу журнала (по умолчанию из config)
+            resume: Загрузить журнал прошлого запуска вместо начала с нуля
+        """
+        self.path = path or config.JOURNAL_FILE
+        # Только записи прошлого запуска (resume): новые записи идут в файл,
+        # иначе память росла бы со всем объемом запуска
+        self.pages: Dict[str, List[str]] = {}
+        self.whois: Dict[str, dict] = {}
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        if resume:
+            self._load()
+        
+        self._lock = threading.Lock()
+        # Построчная буферизация: каждая запись сразу попадает в файл
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8', buffering=1)
+    
+    @staticmethod
+    def _page_key(query: str, start: int) -> str:
+        return f"{start}:{query}"
+    
+    def _load(self):
+        """Чтение журнала прошлого запуска"""
+        if not os.path.exists(self.path):
+            return
+        
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # Последняя строка могла оборваться при аварийном завершении
+                    continue
+                
+                if entry['type'] == 'page':
+                    self.pages[self._page_key(entry['query'], entry['start'])] = entry['urls']
+                elif entry['type'] == 'whois':
+                    self.whois[entry['domain']] = entry['result']
+        
+        print(f"♻️  Продолжение: страниц поиска {len(self.pages)}, проверенных доменов {len(self.whois)}")
+    
+    def _append(self, entry: dict):
+        with self._lock:
+            self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    
+    def get_page(self, query: str, start: int) -> Optional[List[str]]:
+        """
+        URL со страницы выдачи, загруженной в прошлом запуске
+        
+        Args:
+            query: Поисковый запрос
+            start: Смещение первого результата
+        
+        Returns:
+            Список URL или None, если страница еще не загружалась
+        """
+        return self.pages.get(self._page_key(query, start))
+    
+    def add_page(self, query: str, start: int, urls: List[str]):
+        """Запись загруженной страницы выдачи"""
+        self._append({'type': 'page', 'query': query, 'start': start, 'urls': urls})
+    
+    def get_whois(self, domain: str) -> Optional[dict]:
+        """Результат WHOIS из прошлого запуска"""
+        return self.whois.get(domain)
+    
+    def add_whois(self, domain: str, result: dict):
+        """Запись результата WHOIS (ошибки не записываются, чтобы их перепроверить)"""
+        if result['status'] == 'Error':
+            return
+        self._append({'type': 'whois', 'domain': domain, 'result': result})
+    
+    def close(self):
+        """Закрытие файла журнала"""
+        with self._lock:
+            self._file.close()
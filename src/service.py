@@ -0,0 +1,381 @@
+"""Модуль HTTP/JSON-сервиса проверки доменов"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+import config
+from src.domain_planner import DomainPlanner
+from src.metrics import METRICS, SERVICE_LOOKUPS
+from src.whois_cache import WhoisCache
+from src.whois_scheduler import WhoisScheduler
+
+HTTP_REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    413: 'Payload Too Large',
+    500: 'Internal Server Error',
+    502: 'Bad Gateway',
+}
+
+
+class HttpError(Exception):
+    """Ошибка запроса с HTTP-статусом"""
+    
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class DomainService:
+    """Локальный сервис проверки доменов поверх WhoisChecker
+    
+    Все клиенты используют один WhoisChecker, поэтому лимиты частоты
+    серверов общие. Одновременные запросы одного домена ждут один
+    WHOIS-запрос, готовые результаты отдаются из LRU-кэша в памяти.
+    Новые домены собираются в короткие пачки и передаются в очереди
+    серверов WhoisScheduler.
+    
+        GET  /check?domain=example.uz
+        POST /check  {"domains": ["example.uz", "example.kz"]}
+        GET  /health
+        GET  /metrics
+    """
+    
+    def __init__(self, checker, cache_size: Optional[int] = None,
+                 batch_window: Optional[float] = None, batch_size: Optional[int] = None):
+        """
+        Args:
+            checker: WhoisChecker (общий для всех клиентов)
+            cache_size: Результатов в LRU-кэше
+            batch_window: Сколько ждать пополнения пачки (секунды)
+            batch_size: Максимум доменов в пачке
+        """
+        self.checker = checker
+        self.cache_size = cache_size or config.SERVICE_CACHE_SIZE
+        self.batch_window = batch_window if batch_window is not None else config.SERVICE_BATCH_WINDOW
+        self.batch_size = batch_size or config.SERVICE_BATCH_SIZE
+        
+        self.stats = {
+            'requests': 0,
+            'lookups': 0,
+            'cache_hits': 0,
+            'coalesced': 0,
+            'queries': 0,
+            'batches': 0,
+            'errors': 0,
+        }
+        
+        # Домен -> (время устаревания, результат), порядок — от давно использованных
+        self._cache: 'OrderedDict[str, Tuple[float, dict]]' = OrderedDict()
+        # Домен -> результат выполняющейся проверки
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._scheduler: Optional[WhoisScheduler] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+    
+    def parse_domain(self, domain: str) -> Tuple[str, str, str]:
+        """
+        Проверка домена из запроса
+        
+        Args:
+            domain: Доменное имя
+        
+        Returns:
+            Домен в нижнем регистре, имя и зона
+        
+        Raises:
+            ValueError: Некорректное имя или зона без WHOIS-сервера
+        """
+        domain = str(domain).strip().lower().rstrip('.')
+        username, _, tld = domain.partition('.')
+        # Имя уходит в WHOIS-запрос как есть: CR/LF и пробелы недопустимы
+        if not tld or not DomainPlanner.is_valid_label(username):
+            raise ValueError(f"Некорректный домен: {domain!r}")
+        self.checker.server_for(tld)
+        return domain, username, tld
+    
+    def _cache_get(self, domain: str) -> Optional[dict]:
+        entry = self._cache.get(domain)
+        if entry is None:
+            return None
+        if entry[0] <= time.time():
+            del self._cache[domain]
+            return None
+        self._cache.move_to_end(domain)
+        return entry[1]
+    
+    def _cache_set(self, domain: str, result: dict):
+        ttl = WhoisCache.ttl_for(result)
+        if ttl is None:
+            return
+        self._cache[domain] = (time.time() + ttl, result)
+        self._cache.move_to_end(domain)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+    
+    async def lookup(self, domain: str) -> dict:
+        """
+        Результат проверки домена
+        
+        Args:
+            domain: Доменное имя
+        
+        Returns:
+            Результат WHOIS с признаком cached
+        """
+        domain, username, tld = self.parse_domain(domain)
+        self.stats['lookups'] += 1
+        
+        result = self._cache_get(domain)
+        if result is not None:
+            self.stats['cache_hits'] += 1
+            SERVICE_LOOKUPS.inc(result='cache')
+            return dict(result, cached=True)
+        
+        future = self._in_flight.get(domain)
+        if future is not None:
+            self.stats['coalesced'] += 1
+            SERVICE_LOOKUPS.inc(result='coalesced')
+        else:
+            SERVICE_LOOKUPS.inc(result='query')
+            future = asyncio.get_running_loop().create_future()
+            # Исключение считается полученным, даже если клиенты отключились
+            future.add_done_callback(lambda f: f.cancelled() or f.exception())
+            self._in_flight[domain] = future
+            try:
+                await self._queue.put((domain, username, tld))
+            except asyncio.CancelledError:
+                # Клиент отключился до постановки в очередь: проверки не будет
+                del self._in_flight[domain]
+                future.cancel()
+                raise
+        
+        # shield: отключение одного клиента не отменяет запрос для остальных
+        return dict(await asyncio.shield(future), cached=False)
+    
+    async def lookup_many(self, domains: List[str]) -> List[dict]:
+        """
+        Проверка нескольких доменов (ошибки — в результатах отдельных доменов)
+        
+        Args:
+            domains: Доменные имена
+        
+        Returns:
+            Результаты в порядке запроса
+        """
+        async def safe_lookup(domain: str) -> dict:
+            try:
+                return await self.lookup(domain)
+            except ValueError as e:
+                return {'domain': domain, 'status': 'Invalid', 'error': str(e)}
+            except Exception as e:
+                return {'domain': domain, 'status': 'Error', 'error': str(e)}
+        
+        return list(await asyncio.gather(*(safe_lookup(domain) for domain in domains)))
+    
+    async def _resolve(self, item: Tuple[str, str], tld: str):
+        """Обработчик очереди сервера: WHOIS-запрос для ожидающих клиентов
+        
+        Исключение не выходит из обработчика: WhoisScheduler отменил бы задачу
+        сервиса целиком. Ошибку получают только клиенты этого домена.
+        """
+        domain, username = item
+        future = self._in_flight[domain]
+        self.stats['queries'] += 1
+        
+        try:
+            try:
+                result = await self.checker.check_domain_async(username, tld)
+            except Exception as e:
+                raise HttpError(502, f"Ошибка WHOIS: {e}") from e
+            self._cache_set(domain, result)
+        except Exception as e:
+            self.stats['errors'] += 1
+            if not isinstance(e, HttpError):
+                e = HttpError(500, f"Внутренняя ошибка: {e}")
+            future.set_exception(e)
+        else:
+            future.set_result(result)
+        finally:
+            del self._in_flight[domain]
+    
+    async def _dispatch(self):
+        """Сбор новых доменов в пачки и передача в очереди серверов"""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.batch_window
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            self.stats['batches'] += 1
+            # Пачка упорядочена по зонам: очереди серверов заполняются подряд
+            for domain, username, tld in sorted(batch, key=lambda entry: entry[2]):
+                await self._scheduler.submit((domain, username), tld)
+    
+    async def _read_request(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, dict, bytes]]:
+        """Чтение HTTP-запроса: метод, путь, заголовки, тело (None — соединение закрыто)"""
+        request_line = await reader.readline()
+        if not request_line.strip():
+            return None
+        
+        try:
+            method, target, _ = request_line.decode('latin-1').split(' ', 2)
+        except ValueError:
+            raise HttpError(400, 'Некорректная строка запроса')
+        
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        
+        length = headers.get('content-length') or '0'
+        if not (length.isascii() and length.isdigit()):
+            raise HttpError(400, 'Некорректный Content-Length')
+        length = int(length)
+        if length > config.SERVICE_MAX_BODY:
+            raise HttpError(413, 'Слишком большой запрос')
+        body = await reader.readexactly(length) if length else b''
+        return method.upper(), target, headers, body
+    
+    async def _route(self, method: str, target: str, body: bytes) -> dict:
+        """Обработка запроса; ответ — JSON-объект"""
+        url = urlsplit(target)
+        
+        if url.path == '/check':
+            if method == 'GET':
+                domain = parse_qs(url.query).get('domain', [''])[0]
+                try:
+                    return await self.lookup(domain)
+                except ValueError as e:
+                    raise HttpError(400, str(e))
+            
+            if method == 'POST':
+                try:
+                    domains = json.loads(body or b'{}')['domains']
+                except (ValueError, KeyError, TypeError):
+                    raise HttpError(400, 'Ожидается {"domains": [...]}')
+                if not isinstance(domains, list):
+                    raise HttpError(400, 'Ожидается {"domains": [...]}')
+                if len(domains) > config.SERVICE_MAX_BATCH:
+                    raise HttpError(413, f"Не больше {config.SERVICE_MAX_BATCH} доменов за запрос")
+                return {'results': await self.lookup_many(domains)}
+            
+            raise HttpError(405, 'Поддерживаются GET и POST')
+        
+        if url.path == '/health' and method == 'GET':
+            return dict(self.stats, cache_entries=len(self._cache), in_flight=len(self._in_flight),
+                        lanes=self._scheduler.stats())
+        
+        raise HttpError(404, 'Неизвестный путь')
+    
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, body: bytes,
+                       content_type: str = 'application/json; charset=utf-8', keep_alive: bool = True):
+        writer.write(
+            f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + body
+        )
+        await writer.drain()
+    
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Соединение клиента (HTTP/1.1 keep-alive)"""
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except HttpError as e:
+                    payload = json.dumps({'error': str(e)}, ensure_ascii=False).encode('utf-8')
+                    await self._respond(writer, e.status, payload, keep_alive=False)
+                    break
+                if request is None:
+                    break
+                
+                method, target, headers, body = request
+                self.stats['requests'] += 1
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                
+                if target.startswith('/metrics'):
+                    await self._respond(writer, 200, METRICS.render_prometheus().encode('utf-8'),
+                                        'text/plain; version=0.0.4; charset=utf-8', keep_alive)
+                else:
+                    try:
+                        status, payload = 200, await self._route(method, target, body)
+                    except HttpError as e:
+                        status, payload = e.status, {'error': str(e)}
+                    except Exception as e:
+                        # Ошибка одного запроса не закрывает соединение и сервис
+                        self.stats['errors'] += 1
+                        status, payload = 500, {'error': f"Внутренняя ошибка: {e}"}
+                    await self._respond(writer, status,
+                                        json.dumps(payload, ensure_ascii=False).encode('utf-8'),
+                                        keep_alive=keep_alive)
+                
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def start(self, host: Optional[str] = None, port: Optional[int] = None):
+        """
+        Запуск сервиса в текущем цикле событий
+        
+        Args:
+            host: Адрес для прослушивания
+            port: Порт (0 — любой свободный)
+        """
+        self._queue = asyncio.Queue(config.SERVICE_QUEUE_SIZE)
+        self._scheduler = WhoisScheduler(self.checker, self._resolve)
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        self._server = await asyncio.start_server(
+            self._handle_client,
+            host or config.SERVICE_HOST,
+            config.SERVICE_PORT if port is None else port
+        )
+    
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Адрес и порт сервиса"""
+        return self._server.sockets[0].getsockname()[:2]
+    
+    async def serve_forever(self, host: Optional[str] = None, port: Optional[int] = None):
+        """Запуск и работа до отмены"""
+        await self.start(host, port)
+        host, port = self.address
+        print(f"🛰  Сервис проверки доменов: http://{host}:{port}/check?domain=example.uz")
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+    
+    async def close(self):
+        """Остановка сервиса"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            self._dispatcher = None
+        if self._scheduler is not None:
+            self._scheduler.cancel()
@@ -1,12 +1,44 @@
 """Модуль для извлечения юзернеймов из URL"""
 
 import re
-from typing import List, Dict, Set
+from typing import Iterable, List, Dict, Optional, Tuple, Union
 from urllib.parse import urlparse
+import config
+from src.dedup import ExactDedup
+from src.records import UsernameRecord
 
 
 class UsernameExtractor:
-    """Извлечение и фильтрация юзернеймов, заканчивающихся на 'uz'"""
+    """Извлечение и фильтрация юзернеймов, заканчивающихся на доменную зону ('uz' и др.)"""
+    
+    # Юзернейм из URL: схема и netloc по правилам urlsplit, затем первый
+    # сегмент пути (для Telegram — все после s/, если путь начинается с s/).
+    # URL с ;params, квадратными скобками и управляющими символами urlparse
+    # разбирает по особым правилам — они попадают в последнюю группу
+    # и обрабатываются построчно.
+    URL_PREFIX = r'(?=[^;\[\]\t\r\n]*$)(?![\x00- ])(?:[A-Za-z][A-Za-z0-9+\-.]*:)?(?://[^/?#\n]*)?/*'
+    BATCH_PATTERNS = {
+        'telegram': re.compile(
+            r'^(?:' + URL_PREFIX + r'(?:s/([^?#\n]*[^/?#\n])|([^/?#\n]*))[^\n]*|([^\n]*))$', re.M
+        ),
+        'instagram': re.compile(
+            r'^(?:' + URL_PREFIX + r'()([^/?#\n]*)[^\n]*|([^\n]*))$', re.M
+        ),
+    }
+    
+    def __init__(self, dedup: Optional[ExactDedup] = None, tlds: Optional[Iterable[str]] = None):
+        """
+        Args:
+            dedup: Хранилище уже найденных юзернеймов (по умолчанию точное множество)
+            tlds: Доменные зоны для поиска (по умолчанию TARGET_TLDS из config)
+        """
+        # Уже найденные юзернеймы в формате "source:username"
+        self.dedup = dedup if dedup is not None else ExactDedup()
+        
+        # Более длинные зоны проверяются первыми
+        self.tlds: Tuple[str, ...] = tuple(sorted(
+            {tld.lower() for tld in (tlds or config.TARGET_TLDS)}, key=len, reverse=True
+        ))
     
     @staticmethod
     def extract_from_url(url: str, source: str) -> str:
@@ -16,7 +48,7 @@ class UsernameExtractor:
         Args:
             url: URL профиля
             source: Источник (telegram или instagram)
-            
+        
         Returns:
             Юзернейм или пустая строка
         """
@@ -30,7 +62,7 @@ class UsernameExtractor:
                     username = path.split('/', 1)[1] if '/' in path else ''
                 else:
                     username = path.split('/')[0]
-                    
+            
             elif source == 'instagram':
                 # instagram.com/username или instagram.com/username/
                 username = path.split('/')[0]
@@ -41,7 +73,7 @@ class UsernameExtractor:
             username = username.split('?')[0].strip()
             
             return username
-            
+        
         except Exception as e:
             print(f"  Ошибка при извлечении из {url}: {e}")
             return ''
@@ -53,7 +85,7 @@ class UsernameExtractor:
         
         Args:
             username: Юзернейм для проверки
-            
+        
         Returns:
             True если заканчивается на 'uz'
         """
@@ -69,6 +101,22 @@ class UsernameExtractor:
         
         return bool(re.search(pattern, username_lower))
     
+    def match_tld(self, username: str) -> Optional[str]:
+        """
+        Доменная зона, на которую заканчивается юзернейм
+        
+        Args:
+            username: Юзернейм для проверки
+        
+        Returns:
+            Зона из self.tlds или None
+        """
+        username_lower = username.lower()
+        for tld in self.tlds:
+            if username_lower.endswith(tld):
+                return tld
+        return None
+    
     @staticmethod
     def clean_username(username: str) -> str:
         """
@@ -76,7 +124,7 @@ class UsernameExtractor:
         
         Args:
             username: Исходный юзернейм
-            
+        
         Returns:
             Очищенный юзернейм
         """
@@ -85,39 +133,171 @@ class UsernameExtractor:
         cleaned = re.sub(r'[^a-zA-Z0-9_-]', '', username)
         return cleaned.lower()
     
-    def process_urls(self, urls_dict: Dict[str, List[str]]) -> List[Dict[str, str]]:
+    def process_url(self, url: str, source: str) -> Optional[UsernameRecord]:
+        """
+        Обработка одного URL (для потоковой обработки)
+        
+        Args:
+            url: URL профиля
+            source: Источник (telegram или instagram)
+        
+        Returns:
+            UsernameRecord или None,
+            если юзернейм не подходит или уже встречался
+        """
+        username = self.extract_from_url(url, source)
+        
+        tld = self.match_tld(username) if username else None
+        if tld is None:
+            return None
+        
+        # Проверяем дубликаты
+        username_key = f"{source}:{username.lower()}"
+        
+        if not self.dedup.add(username_key):
+            return None
+        
+        return UsernameRecord(source.capitalize(), username, url, tld)
+    
+    def process_urls(self, urls_dict: Dict[str, List[str]]) -> List[UsernameRecord]:
         """
         Обработка всех URL и извлечение юзернеймов
         
         Args:
             urls_dict: Словарь с URL по источникам
-            
+        
         Returns:
-            Список словарей с данными: {source, username, original_username, url}
+            Список UsernameRecord
         """
         results = []
-        seen_usernames: Set[str] = set()
         
         for source, urls in urls_dict.items():
             print(f"\n📋 Обработка {source}...")
+            found = 0
             
             for url in urls:
-                username = self.extract_from_url(url, source)
-                
-                if username and self.filter_uz_usernames(username):
-                    # Проверяем дубликаты
-                    username_key = f"{source}:{username.lower()}"
-                    
-                    if username_key not in seen_usernames:
-                        seen_usernames.add(username_key)
-                        
-                        results.append({
-                            'source': source.capitalize(),
-                            'username': username,
-                            'original_username': username,
-                            'url': url
-                        })
+                record = self.process_url(url, source)
+                if record is not None:
+                    results.append(record)
+                    found += 1
+            
+            print(f"  Найдено уникальных юзернеймов: {found}")
+        
+        return results
+    
+    def _batch_usernames(self, urls: List[str], source: str) -> List[str]:
+        """
+        Юзернеймы для пачки URL одного источника за один проход регулярного
+        выражения по склеенному буферу
+        
+        Args:
+            urls: URL профилей
+            source: Источник (telegram или instagram)
+        
+        Returns:
+            Юзернеймы (или пустые строки) в порядке входных URL
+        """
+        pattern = self.BATCH_PATTERNS.get(source)
+        if pattern is None:
+            return [''] * len(urls)
+        
+        # URL с переводом строки нарушили бы выравнивание строк буфера
+        lines = [url if '\n' not in url else '\t' for url in urls]
+        matches = pattern.findall('\n'.join(lines))
+        
+        usernames = []
+        for url, (channel, name, fallback) in zip(urls, matches):
+            if fallback:
+                usernames.append(self.extract_from_url(url, source))
+            else:
+                usernames.append((channel or name).strip())
+        
+        return usernames
+    
+    def extract_batch(self, urls: Iterable[str],
+                      sources: Union[str, Iterable[str]]) -> List[UsernameRecord]:
+        """
+        Пакетная обработка URL
+        
+        Результат совпадает с последовательными вызовами process_url:
+        те же записи в том же порядке, с учетом уже найденных юзернеймов.
+        
+        Args:
+            urls: Колонка (например, pandas.Series) или массив URL
+            sources: Источник для всех URL или массив источников той же длины
+        
+        Returns:
+            Список UsernameRecord
+        """
+        urls = list(urls)
+        
+        if isinstance(sources, str):
+            usernames = self._batch_usernames(urls, sources)
+            sources = [sources] * len(urls)
+        else:
+            sources = list(sources)
+            
+            # Разбор по источникам с возвратом результатов на исходные позиции
+            positions: Dict[str, List[int]] = {}
+            for i, source in enumerate(sources):
+                positions.setdefault(source, []).append(i)
+            
+            usernames = [''] * len(urls)
+            for source, indexes in positions.items():
+                extracted = self._batch_usernames([urls[i] for i in indexes], source)
+                for i, username in zip(indexes, extracted):
+                    usernames[i] = username
+        
+        results = []
+        add = self.dedup.add
+        tlds = self.tlds
+        
+        for source, username, url in zip(sources, usernames, urls):
+            lowered = username.lower()
+            if not lowered.endswith(tlds):
+                continue
+            tld = tlds[0] if len(tlds) == 1 else self.match_tld(lowered)
+            
+            # Проверяем дубликаты
+            if not add(f"{source}:{lowered}"):
+                continue
+            
+            results.append(UsernameRecord(source.capitalize(), username, url, tld))
+        
+        return results
+    
+    def process_batch(self, items: List[Tuple[str, str]]) -> List[UsernameRecord]:
+        """
+        Пакетная обработка пар (источник, URL)
+        
+        Args:
+            items: Пары (источник, URL)
+        
+        Returns:
+            Список UsernameRecord
+        """
+        sources = [source for source, _ in items]
+        urls = [url for _, url in items]
+        return self.extract_batch(urls, sources)
+    
+    def process_urls_batch(self, urls_dict: Dict[str, List[str]]) -> List[UsernameRecord]:
+        """
+        Пакетный аналог process_urls
+        
+        Args:
+            urls_dict: Словарь с URL по источникам
+        
+        Returns:
+            Список UsernameRecord
+        """
+        results = []
+        
+        for source, urls in urls_dict.items():
+            print(f"\n📋 Обработка {source}...")
+            
+            records = self.extract_batch(urls, source)
+            results.extend(records)
             
-            print(f"  Найдено уникальных uz-юзернеймов: {len([r for r in results if r['source'] == source.capitalize()])}")
+            print(f"  Найдено уникальных юзернеймов: {len(records)}")
         
         return results
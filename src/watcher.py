@@ -0,0 +1,305 @@
+"""Модуль наблюдения за доменами с перепроверкой по дате истечения"""
+
+import asyncio
+import heapq
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import config
+
+DAY = 24 * 3600
+
+
+class DomainWatcher:
+    """Постоянная перепроверка доменов в порядке срока следующей проверки
+    
+    Занятый домен с известной датой истечения не запрашивается до подхода
+    к этой дате; около нее и в период удержания после истечения (grace,
+    redemption, pending delete) проверки учащаются. Свободные домены
+    перепроверяются редко и с отдельным ограничением частоты, чтобы не
+    вытеснять домены у даты освобождения.
+    """
+    
+    def __init__(self, checker, path: Optional[str] = None, concurrency: Optional[int] = None,
+                 events_file: Optional[str] = None):
+        """
+        Args:
+            checker: WhoisChecker (без кэша: каждая проверка — запрос к серверу)
+            path: Файл состояния наблюдения (по умолчанию из config)
+            concurrency: Одновременных проверок
+            events_file: JSONL-файл изменений статуса (по умолчанию из config)
+        """
+        self.checker = checker
+        self.path = path or config.WATCH_STATE_FILE
+        self.concurrency = concurrency or config.WATCH_CONCURRENCY
+        self.events_file = events_file or config.WATCH_EVENTS_FILE
+        
+        self.stats = {'checked': 0, 'changed': 0, 'errors': 0}
+        
+        # Очереди (время проверки, домен): занятые и ошибки — основная,
+        # свободные — фоновая с отдельным лимитом частоты
+        self._urgent: List[Tuple[float, str]] = []
+        self._background: List[Tuple[float, str]] = []
+        # Домен -> (время проверки, статус): записи очередей с другим временем устарели
+        self._scheduled: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._background_next = 0.0
+        
+        for path in (self.path, self.events_file):
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS watch ('
+            ' domain TEXT PRIMARY KEY,'
+            ' status TEXT,'
+            ' result TEXT,'
+            ' checked_at REAL,'
+            ' next_check REAL NOT NULL)'
+        )
+        self.conn.commit()
+        
+        for domain, status, next_check in self.conn.execute('SELECT domain, status, next_check FROM watch'):
+            self._push(domain, status, next_check)
+    
+    def __len__(self) -> int:
+        return len(self._scheduled)
+    
+    @staticmethod
+    def _expiry_timestamp(result: Dict[str, Optional[str]]) -> Optional[float]:
+        """Дата истечения регистрации (timestamp) или None"""
+        expiry_date = result.get('expiry_date')
+        if not expiry_date:
+            return None
+        try:
+            return datetime.strptime(expiry_date, '%Y-%m-%d').timestamp()
+        except ValueError:
+            return None
+    
+    def next_check(self, result: Dict[str, Optional[str]], now: Optional[float] = None) -> float:
+        """
+        Время следующей проверки домена
+        
+        Args:
+            result: Результат WHOIS-проверки
+            now: Текущее время (timestamp)
+        
+        Returns:
+            Timestamp следующей проверки
+        """
+        now = now or time.time()
+        status = result.get('status')
+        
+        if status == 'Available':
+            return now + config.WATCH_AVAILABLE_INTERVAL
+        if status != 'Registered':
+            return now + config.WATCH_ERROR_INTERVAL
+        
+        expiry = self._expiry_timestamp(result)
+        if expiry is None:
+            return now + config.WATCH_REGISTERED_INTERVAL
+        
+        approach = expiry - config.WATCH_EXPIRY_MARGIN
+        if now < approach:
+            # До подхода к дате истечения домен не запрашивается
+            return approach
+        if now < expiry:
+            return now + config.WATCH_NEAR_EXPIRY_INTERVAL
+        if now < expiry + config.WATCH_DROP_WINDOW:
+            # Истек, но еще не освобожден: удержание и удаление регистратурой
+            return now + config.WATCH_DROP_INTERVAL
+        
+        # Дата в ответе не обновилась после продления — обычный интервал
+        return now + config.WATCH_REGISTERED_INTERVAL
+    
+    def _push(self, domain: str, status: Optional[str], next_check: float):
+        self._scheduled[domain] = (next_check, status)
+        queue = self._background if status == 'Available' else self._urgent
+        heapq.heappush(queue, (next_check, domain))
+    
+    def _save(self, domain: str, result: Optional[Dict[str, Optional[str]]], next_check: float,
+              checked_at: Optional[float]):
+        status = result.get('status') if result else None
+        self.conn.execute(
+            'INSERT OR REPLACE INTO watch (domain, status, result, checked_at, next_check)'
+            ' VALUES (?, ?, ?, ?, ?)',
+            (domain, status, json.dumps(result, ensure_ascii=False) if result else None,
+             checked_at, next_check)
+        )
+    
+    def add(self, domain: str, result: Optional[Dict[str, Optional[str]]] = None,
+            checked_at: Optional[float] = None):
+        """
+        Добавление домена под наблюдение
+        
+        Args:
+            domain: Доменное имя
+            result: Последний известный результат WHOIS (без него — проверка сразу)
+            checked_at: Время получения результата (timestamp)
+        """
+        domain = domain.lower()
+        if result:
+            next_check = self.next_check(result, checked_at)
+        else:
+            next_check = time.time()
+        
+        self._save(domain, result, next_check, checked_at)
+        self._push(domain, result.get('status') if result else None, next_check)
+    
+    def add_many(self, entries: Iterable[Tuple[str, Optional[dict], Optional[float]]],
+                 replace: bool = False) -> int:
+        """
+        Добавление доменов под наблюдение
+        
+        Args:
+            entries: Кортежи (домен, результат, время проверки)
+            replace: Заменять состояние уже наблюдаемых доменов
+        
+        Returns:
+            Количество добавленных доменов
+        """
+        added = 0
+        for domain, result, checked_at in entries:
+            if not replace and domain.lower() in self._scheduled:
+                continue
+            self.add(domain, result, checked_at)
+            added += 1
+        self.conn.commit()
+        return added
+    
+    def _pop_due(self, now: float) -> Optional[str]:
+        """Следующий домен, срок проверки которого наступил"""
+        for queue, background in ((self._urgent, False), (self._background, True)):
+            while queue:
+                next_check, domain = queue[0]
+                if self._scheduled.get(domain, (None,))[0] != next_check:
+                    heapq.heappop(queue)
+                    continue
+                if next_check > now or (background and now < self._background_next):
+                    break
+                heapq.heappop(queue)
+                if background:
+                    self._background_next = now + 1 / config.WATCH_BACKGROUND_RATE
+                return domain
+        return None
+    
+    def _seconds_until_due(self, now: float) -> float:
+        """Сколько ждать до следующей проверки"""
+        times = [queue[0][0] for queue in (self._urgent, self._background) if queue]
+        if self._background:
+            times[-1] = max(times[-1], self._background_next)
+        if not times:
+            return config.WATCH_POLL_INTERVAL
+        return min(max(0.0, min(times) - now), config.WATCH_POLL_INTERVAL)
+    
+    def _record_change(self, domain: str, old: Optional[str], result: Dict[str, Optional[str]]):
+        """Запись изменения статуса в журнал событий"""
+        self.stats['changed'] += 1
+        mark = '🎯' if result['status'] == 'Available' else '🔄'
+        print(f"{mark} {domain}: {old} -> {result['status']} (истекает: {result.get('expiry_date') or '-'})")
+        
+        with open(self.events_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({
+                'time': datetime.now().isoformat(timespec='seconds'),
+                'domain': domain,
+                'old_status': old,
+                'new_status': result['status'],
+                'expiry_date': result.get('expiry_date'),
+            }, ensure_ascii=False) + '\n')
+    
+    async def _check(self, domain: str):
+        """Проверка домена и планирование следующей"""
+        _, old_status = self._scheduled[domain]
+        username, tld = domain.split('.', 1)
+        
+        try:
+            result = await self.checker.check_domain_async(username, tld)
+        except Exception as e:
+            result = {'domain': domain, 'status': 'Error', 'error': str(e)}
+        
+        now = time.time()
+        self.stats['checked'] += 1
+        
+        if result['status'] == 'Error':
+            self.stats['errors'] += 1
+            # Ошибка не меняет известный статус домена
+            next_check = now + config.WATCH_ERROR_INTERVAL
+            self.conn.execute(
+                'UPDATE watch SET next_check = ? WHERE domain = ?', (next_check, domain)
+            )
+            self._push(domain, old_status, next_check)
+        else:
+            if old_status is not None and result['status'] != old_status:
+                self._record_change(domain, old_status, result)
+            next_check = self.next_check(result, now)
+            self._save(domain, result, next_check, now)
+            self._push(domain, result['status'], next_check)
+        
+        self.conn.commit()
+    
+    async def run(self, max_checks: Optional[int] = None):
+        """
+        Цикл наблюдения (до прерывания или max_checks проверок)
+        
+        Args:
+            max_checks: Остановиться после указанного количества проверок
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # Завершение проверки планирует домен заново: ожидание прерывается
+        wakeup = asyncio.Event()
+        pending = set()
+        started = 0
+        
+        async def check(domain: str):
+            try:
+                await self._check(domain)
+            finally:
+                semaphore.release()
+                wakeup.set()
+        
+        try:
+            while max_checks is None or started < max_checks:
+                await semaphore.acquire()
+                domain = self._pop_due(time.time())
+                if domain is None:
+                    semaphore.release()
+                    if not self._scheduled:
+                        break
+                    wakeup.clear()
+                    try:
+                        await asyncio.wait_for(wakeup.wait(), self._seconds_until_due(time.time()))
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                
+                # Пока проверка идет, домен не должен попасть в очередь повторно
+                self._scheduled[domain] = (None, self._scheduled[domain][1])
+                task = asyncio.create_task(check(domain))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                started += 1
+            
+            await asyncio.gather(*pending)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+    
+    def due_stats(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Количество доменов по статусам и проверок в ближайшие сутки"""
+        now = now or time.time()
+        stats = {'domains': len(self._scheduled), 'due_24h': 0}
+        for next_check, status in self._scheduled.values():
+            stats[status or 'new'] = stats.get(status or 'new', 0) + 1
+            if next_check is not None and next_check <= now + DAY:
+                stats['due_24h'] += 1
+        return stats
+    
+    def close(self):
+        """Закрытие базы состояния"""
+        self.conn.commit()
+        self.conn.close()
@@ -0,0 +1,350 @@
+"""Модуль архива полных ответов WHOIS для повторного разбора без сети"""
+
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+import config
+from src.whois_parser import WhoisParser, get_parser
+
+# Заголовок сегмента: сигнатура и версия формата (версия определяет словарь сжатия)
+SEGMENT_MAGIC = b'UZWA\x01'
+
+# Заголовок записи: время проверки, длина домена, длина адреса сервера, длина сжатого ответа
+FRAME_HEADER = struct.Struct('!dHHI')
+
+# Общий словарь zlib: короткие ответы сжимаются намного лучше с частыми
+# фрагментами WHOIS. Менять нельзя — только вместе с версией в SEGMENT_MAGIC
+ZDICT = (
+    b'% Domain not found\n No entries found\n not registered\n'
+    b'Domain Name: \nRegistrar: \nSponsoring Registrar: \nRegistrar URL: http://www.\n'
+    b'Creation Date: \nCreated: \nUpdated Date: \nExpiration Date: \nRegistry Expiry Date: \n'
+    b'Expires: \npaid-till: \nStatus: ACTIVE\nclientTransferProhibited\nName Server: ns1.\n'
+    b'Name Server: ns2.\nRegistrant Organization: \nAdministrative Contact\nTechnical Contact\n'
+    b'Email: \nPhone: +998\nAddress: \nTashkent\nUzbekistan\n.uz\n'
+)
+
+Record = Tuple[str, str, float, str]
+
+
+class WhoisArchive:
+    """Сегментированный архив сжатых ответов WHOIS с индексом домен -> смещение
+    
+    Записи только дописываются в текущий сегмент; при достижении размера
+    WHOIS_ARCHIVE_SEGMENT_SIZE начинается новый. Каждая запись сжата
+    отдельно, поэтому читается без распаковки соседних. Индекс (SQLite)
+    хранит все версии ответа домена со временем проверки и при потере
+    восстанавливается сканированием сегментов.
+    """
+    
+    def __init__(self, directory: Optional[str] = None, segment_size: Optional[int] = None):
+        """
+        Args:
+            directory: Каталог архива (по умолчанию из config)
+            segment_size: Размер сегмента в байтах
+        """
+        self.directory = directory or config.WHOIS_ARCHIVE_DIR
+        self.segment_size = segment_size or config.WHOIS_ARCHIVE_SEGMENT_SIZE
+        os.makedirs(self.directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._pending = 0
+        
+        self.conn = sqlite3.connect(os.path.join(self.directory, 'index.sqlite3'), check_same_thread=False)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS archive ('
+            ' domain TEXT NOT NULL,'
+            ' checked_at REAL NOT NULL,'
+            ' segment INTEGER NOT NULL,'
+            ' offset INTEGER NOT NULL,'
+            ' server TEXT)'
+        )
+        self.conn.execute('CREATE INDEX IF NOT EXISTS archive_domain ON archive (domain, checked_at)')
+        self.conn.commit()
+        
+        segments = self.segments()
+        self._segment = segments[-1] if segments else 1
+        self._file = self._open_segment(self._segment)
+        # Записи, не попавшие в индекс до аварийного завершения
+        self.recovered = self._recover_index()
+    
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"segment-{number:06d}.zlog")
+    
+    def segments(self) -> List[int]:
+        """Номера сегментов по возрастанию"""
+        numbers = []
+        for name in os.listdir(self.directory):
+            if name.startswith('segment-') and name.endswith('.zlog'):
+                numbers.append(int(name[8:-5]))
+        return sorted(numbers)
+    
+    def _open_segment(self, number: int):
+        """Открытие сегмента для дозаписи (оборванная последняя запись отбрасывается)"""
+        path = self._segment_path(number)
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            f = open(path, 'wb')
+            f.write(SEGMENT_MAGIC)
+            f.flush()
+            return f
+        
+        end = len(SEGMENT_MAGIC)
+        for offset, _, _, _, size in self._scan_headers(number):
+            end = offset + size
+        f = open(path, 'r+b')
+        f.truncate(end)
+        f.seek(end)
+        return f
+    
+    def _scan_headers(self, number: int, start: Optional[int] = None) -> Iterator[Tuple[int, str, str, float, int]]:
+        """
+        Заголовки записей сегмента без распаковки ответов
+        
+        Args:
+            number: Номер сегмента
+            start: Смещение записи, с которой начать (по умолчанию — с первой)
+        
+        Yields:
+            Кортежи (смещение, домен, сервер, время проверки, размер записи)
+        """
+        with open(self._segment_path(number), 'rb') as f:
+            if f.read(len(SEGMENT_MAGIC)) != SEGMENT_MAGIC:
+                raise ValueError(f"Неизвестный формат сегмента {self._segment_path(number)}")
+            offset = start or len(SEGMENT_MAGIC)
+            f.seek(offset)
+            while True:
+                header = f.read(FRAME_HEADER.size)
+                if len(header) < FRAME_HEADER.size:
+                    return
+                checked_at, domain_len, server_len, data_len = FRAME_HEADER.unpack(header)
+                names = f.read(domain_len + server_len)
+                f.seek(data_len, os.SEEK_CUR)
+                size = FRAME_HEADER.size + domain_len + server_len + data_len
+                if len(names) < domain_len + server_len or f.tell() > os.fstat(f.fileno()).st_size:
+                    # Запись оборвана при аварийном завершении
+                    return
+                yield (offset, names[:domain_len].decode('utf-8'),
+                       names[domain_len:].decode('utf-8'), checked_at, size)
+                offset += size
+    
+    @staticmethod
+    def _compress(response: str) -> bytes:
+        compressor = zlib.compressobj(zlib.Z_BEST_COMPRESSION, zdict=ZDICT)
+        return compressor.compress(response.encode('utf-8')) + compressor.flush()
+    
+    @staticmethod
+    def _decompress(data: bytes) -> str:
+        decompressor = zlib.decompressobj(zdict=ZDICT)
+        return (decompressor.decompress(data) + decompressor.flush()).decode('utf-8', errors='ignore')
+    
+    def append(self, domain: str, response: str, server: Optional[str] = None,
+               checked_at: Optional[float] = None):
+        """
+        Сохранение полного ответа WHOIS
+        
+        Args:
+            domain: Доменное имя
+            response: Ответ сервера
+            server: WHOIS-сервер (для выбора разборщика при повторном разборе)
+            checked_at: Время получения ответа (timestamp)
+        """
+        domain = domain.lower()
+        server = server or ''
+        checked_at = checked_at or time.time()
+        names = domain.encode('utf-8') + server.encode('utf-8')
+        data = self._compress(response)
+        frame = FRAME_HEADER.pack(checked_at, len(domain.encode('utf-8')), len(server.encode('utf-8')),
+                                  len(data)) + names + data
+        
+        with self._lock:
+            if self._file.tell() + len(frame) > self.segment_size and self._file.tell() > len(SEGMENT_MAGIC):
+                self._file.close()
+                self._segment += 1
+                self._file = self._open_segment(self._segment)
+            
+            offset = self._file.tell()
+            self._file.write(frame)
+            self.conn.execute(
+                'INSERT INTO archive (domain, checked_at, segment, offset, server) VALUES (?, ?, ?, ?, ?)',
+                (domain, checked_at, self._segment, offset, server)
+            )
+            
+            # Индекс и файл сбрасываются пачками: после сбоя индекс восстанавливается из сегментов
+            self._pending += 1
+            if self._pending >= config.WHOIS_ARCHIVE_COMMIT_EVERY:
+                self._flush()
+    
+    def _flush(self):
+        self._file.flush()
+        self.conn.commit()
+        self._pending = 0
+    
+    def _read(self, segment: int, offset: int) -> Record:
+        """Чтение записи по смещению"""
+        with self._lock:
+            if segment == self._segment:
+                self._file.flush()
+        
+        with open(self._segment_path(segment), 'rb') as f:
+            f.seek(offset)
+            checked_at, domain_len, server_len, data_len = FRAME_HEADER.unpack(f.read(FRAME_HEADER.size))
+            names = f.read(domain_len + server_len)
+            data = f.read(data_len)
+        return (names[:domain_len].decode('utf-8'), names[domain_len:].decode('utf-8'),
+                checked_at, self._decompress(data))
+    
+    def get(self, domain: str) -> Optional[Record]:
+        """
+        Последний сохраненный ответ домена
+        
+        Args:
+            domain: Доменное имя
+        
+        Returns:
+            Кортеж (домен, сервер, время проверки, ответ) или None
+        """
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT segment, offset FROM archive WHERE domain = ? ORDER BY checked_at DESC LIMIT 1',
+                (domain.lower(),)
+            ).fetchone()
+        return self._read(*row) if row else None
+    
+    def history(self, domain: str) -> List[Record]:
+        """Все сохраненные ответы домена от старых к новым"""
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT segment, offset FROM archive WHERE domain = ? ORDER BY checked_at',
+                (domain.lower(),)
+            ).fetchall()
+        return [self._read(segment, offset) for segment, offset in rows]
+    
+    def iter_records(self) -> Iterator[Record]:
+        """
+        Последовательное чтение всех записей архива (без индекса)
+        
+        Yields:
+            Кортежи (домен, сервер, время проверки, ответ) в порядке записи
+        """
+        with self._lock:
+            self._file.flush()
+        
+        for number in self.segments():
+            with open(self._segment_path(number), 'rb') as f:
+                data = f.read()
+            offset = len(SEGMENT_MAGIC)
+            while offset + FRAME_HEADER.size <= len(data):
+                checked_at, domain_len, server_len, data_len = FRAME_HEADER.unpack_from(data, offset)
+                start = offset + FRAME_HEADER.size
+                end = start + domain_len + server_len + data_len
+                if end > len(data):
+                    break
+                yield (data[start:start + domain_len].decode('utf-8'),
+                       data[start + domain_len:start + domain_len + server_len].decode('utf-8'),
+                       checked_at,
+                       self._decompress(data[start + domain_len + server_len:end]))
+                offset = end
+    
+    def reparse(self) -> Dict[str, Tuple[float, Dict[str, Optional[str]]]]:
+        """
+        Повторный разбор всех ответов текущими разборщиками (без сети)
+        
+        Returns:
+            Домен -> (время проверки, результат) по последнему ответу домена
+        """
+        parsers: Dict[str, WhoisParser] = {}
+        results = {}
+        for domain, server, checked_at, response in self.iter_records():
+            parser = parsers.get(server)
+            if parser is None:
+                parser = parsers[server] = get_parser(server)
+            previous = results.get(domain)
+            if previous is None or previous[0] <= checked_at:
+                results[domain] = (checked_at, parser.parse(response, domain))
+        return results
+    
+    def _recover_index(self) -> int:
+        """
+        Дозапись в индекс хвоста сегментов после аварийного завершения
+        
+        Индекс фиксируется пачками (WHOIS_ARCHIVE_COMMIT_EVERY), а записи уже
+        лежат в сегменте: без дозаписи get() и stats() их бы не видели.
+        Конец последней записи индекса сравнивается с размером сегмента,
+        сканируются только записи после нее.
+        
+        Returns:
+            Количество добавленных в индекс записей
+        """
+        # Записи добавляются в индекс в порядке сегментов и смещений
+        row = self.conn.execute('SELECT segment, offset FROM archive ORDER BY rowid DESC LIMIT 1').fetchone()
+        last_segment, last_offset = row if row is not None else (0, None)
+        
+        tail = []
+        for number in self.segments():
+            if number < last_segment:
+                continue
+            start = None
+            if number == last_segment:
+                # Запись из индекса пропускается: ее конец — начало хвоста
+                headers = self._scan_headers(number, last_offset)
+                end = next((offset + size for offset, _, _, _, size in headers), None)
+                headers.close()
+                if end is None or end >= os.path.getsize(self._segment_path(number)):
+                    continue
+                start = end
+            tail.extend(
+                (domain, checked_at, number, offset, server)
+                for offset, domain, server, checked_at, _ in self._scan_headers(number, start)
+            )
+        
+        if tail:
+            self.conn.executemany(
+                'INSERT INTO archive (domain, checked_at, segment, offset, server) VALUES (?, ?, ?, ?, ?)',
+                tail
+            )
+            self.conn.commit()
+        return len(tail)
+    
+    def rebuild_index(self) -> int:
+        """
+        Восстановление индекса сканированием сегментов
+        
+        Returns:
+            Количество записей в индексе
+        """
+        with self._lock:
+            self._flush()
+            self.conn.execute('DELETE FROM archive')
+            count = 0
+            for number in self.segments():
+                rows = [
+                    (domain, checked_at, number, offset, server)
+                    for offset, domain, server, checked_at, _ in self._scan_headers(number)
+                ]
+                self.conn.executemany(
+                    'INSERT INTO archive (domain, checked_at, segment, offset, server) VALUES (?, ?, ?, ?, ?)',
+                    rows
+                )
+                count += len(rows)
+            self.conn.commit()
+        return count
+    
+    def stats(self) -> Dict[str, int]:
+        """Статистика архива: записи, домены, сегменты, размер на диске"""
+        with self._lock:
+            self._flush()
+            records, domains = self.conn.execute(
+                'SELECT COUNT(*), COUNT(DISTINCT domain) FROM archive'
+            ).fetchone()
+        size = sum(os.path.getsize(self._segment_path(number)) for number in self.segments())
+        return {'records': records, 'domains': domains, 'segments': len(self.segments()), 'bytes': size}
+    
+    def close(self):
+        """Сброс буферов и закрытие архива"""
+        with self._lock:
+            self._flush()
+            self._file.close()
+            self.conn.close()
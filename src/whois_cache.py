@@ -0,0 +1,175 @@
+"""Модуль локального кэша результатов WHOIS"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Tuple
+import config
+
+
+class WhoisCache:
+    """Кэш результатов WHOIS в SQLite с TTL в зависимости от статуса"""
+    
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or config.WHOIS_CACHE_FILE
+        self.hits = 0
+        self.misses = 0
+        
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._committed = time.monotonic()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS whois_cache ('
+            ' domain TEXT PRIMARY KEY,'
+            ' status TEXT NOT NULL,'
+            ' result TEXT NOT NULL,'
+            ' checked_at REAL NOT NULL,'
+            ' expires_at REAL NOT NULL)'
+        )
+        self.conn.commit()
+    
+    @staticmethod
+    def ttl_for(result: Dict[str, Optional[str]], now: Optional[float] = None) -> Optional[float]:
+        """
+        Вычисление времени жизни записи
+        
+        Args:
+            result: Результат WHOIS-проверки
+            now: Текущее время (timestamp)
+        
+        Returns:
+            TTL в секундах или None, если результат не кэшируется
+        """
+        now = now or time.time()
+        status = result.get('status')
+        
+        if status == 'Available':
+            return config.WHOIS_CACHE_TTL_AVAILABLE
+        
+        if status == 'Registered':
+            expiry_date = result.get('expiry_date')
+            if expiry_date:
+                try:
+                    expiry = datetime.strptime(expiry_date, '%Y-%m-%d').timestamp()
+                except ValueError:
+                    expiry = None
+                
+                if expiry is not None:
+                    # Перепроверяем незадолго до истечения регистрации
+                    ttl = expiry - config.WHOIS_CACHE_EXPIRY_MARGIN - now
+                    if ttl <= 0:
+                        # Домен близок к освобождению — держим недолго
+                        return config.WHOIS_CACHE_TTL_AVAILABLE
+                    return ttl
+            
+            return config.WHOIS_CACHE_TTL_REGISTERED
+        
+        # Ошибки и неизвестные статусы не кэшируются
+        return None
+    
+    @staticmethod
+    def _decode(value: str) -> Dict[str, Optional[str]]:
+        result = json.loads(value)
+        # Записи старых версий хранили начало ответа сервера
+        result.pop('raw_response', None)
+        return result
+    
+    def get(self, domain: str) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Получение результата из кэша
+        
+        Args:
+            domain: Доменное имя
+        
+        Returns:
+            Результат WHOIS или None, если записи нет или она устарела
+        """
+        with self._lock:
+            row = self.conn.execute(
+                'SELECT result FROM whois_cache WHERE domain = ? AND expires_at > ?',
+                (domain.lower(), time.time())
+            ).fetchone()
+            
+            if row is None:
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            return self._decode(row[0])
+    
+    def set(self, domain: str, result: Dict[str, Optional[str]]):
+        """
+        Сохранение результата в кэш
+        
+        Args:
+            domain: Доменное имя
+            result: Результат WHOIS-проверки
+        """
+        now = time.time()
+        ttl = self.ttl_for(result, now)
+        if ttl is None:
+            return
+        
+        with self._lock:
+            self.conn.execute(
+                'INSERT OR REPLACE INTO whois_cache (domain, status, result, checked_at, expires_at)'
+                ' VALUES (?, ?, ?, ?, ?)',
+                (domain.lower(), result['status'], json.dumps(result, ensure_ascii=False), now, now + ttl)
+            )
+            
+            # Запись фиксируется пачками: commit (fsync) на каждый результат
+            # останавливал бы цикл событий асинхронных проверок
+            self._pending += 1
+            if (self._pending >= config.WHOIS_CACHE_COMMIT_EVERY
+                    or time.monotonic() - self._committed >= config.WHOIS_CACHE_COMMIT_INTERVAL):
+                self._flush()
+    
+    def _flush(self):
+        self.conn.commit()
+        self._pending = 0
+        self._committed = time.monotonic()
+    
+    def entries(self) -> Iterator[Tuple[str, Dict[str, Optional[str]], float]]:
+        """
+        Все записи кэша, включая устаревшие
+        
+        Yields:
+            Кортежи (домен, результат, время проверки)
+        """
+        with self._lock:
+            rows = self.conn.execute('SELECT domain, result, checked_at FROM whois_cache').fetchall()
+        for domain, result, checked_at in rows:
+            yield domain, self._decode(result), checked_at
+    
+    def compact(self) -> int:
+        """
+        Удаление устаревших записей и сжатие файла базы
+        
+        Returns:
+            Количество удаленных записей
+        """
+        with self._lock:
+            cursor = self.conn.execute('DELETE FROM whois_cache WHERE expires_at <= ?', (time.time(),))
+            self._flush()
+            self.conn.execute('VACUUM')
+            return cursor.rowcount
+    
+    def stats(self) -> Dict[str, int]:
+        """Статистика использования кэша"""
+        with self._lock:
+            size = self.conn.execute('SELECT COUNT(*) FROM whois_cache').fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'entries': size}
+    
+    def close(self):
+        """Сохранение несохраненных записей и закрытие базы"""
+        with self._lock:
+            self._flush()
+            self.conn.close()
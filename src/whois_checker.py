@@ -1,38 +1,165 @@
 """Модуль для проверки доменов через WHOIS"""
 
+import asyncio
 import socket
-import re
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 import time
 import config
+from src.metrics import (
+    RATE_LIMIT_WAIT_SECONDS, WHOIS_BREAKER_OPENS, WHOIS_BYTES, WHOIS_CACHE, WHOIS_QUERIES,
+    WHOIS_QUERY_SECONDS
+)
+from src.rate_limiter import AdaptiveRateLimiter, CircuitBreaker, TokenBucket
+from src.whois_archive import WhoisArchive
+from src.whois_cache import WhoisCache
+from src.whois_parser import WhoisParser, get_parser
 
 
 class WhoisChecker:
-    """Проверка доступности доменов .uz через WHOIS"""
+    """Проверка доступности доменов (.uz и других зон) через WHOIS"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[WhoisCache] = None, archive: Optional[WhoisArchive] = None):
+        """
+        Args:
+            cache: Кэш результатов
+            archive: Архив полных ответов для повторного разбора (python main.py --reparse)
+        """
+        self.cache = cache
+        self.archive = archive
+        self.parser = WhoisParser()
         self.server = config.WHOIS_SERVER
+        self.servers = dict(config.TLD_WHOIS_SERVERS)
         self.port = config.WHOIS_PORT
         self.timeout = config.WHOIS_TIMEOUT
+        self.concurrency = config.WHOIS_CONCURRENCY
+        self.rate_limit = config.WHOIS_RATE_LIMIT
+        self.burst = config.WHOIS_BURST
+        
+        # Отдельный лимит частоты, автомат паузы и разборщик для каждого WHOIS-сервера
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._parsers: Dict[str, WhoisParser] = {self.server: self.parser}
     
-    def query_whois(self, domain: str) -> str:
+    def server_for(self, tld: str) -> str:
         """
-        Прямой WHOIS-запрос к серверу whois.cctld.uz
+        WHOIS-сервер доменной зоны
+        
+        Args:
+            tld: Доменная зона без точки (uz, kz, ...)
+            
+        Returns:
+            Адрес WHOIS-сервера
+        """
+        server = self.servers.get(tld)
+        if server is None:
+            raise ValueError(f"Нет WHOIS-сервера для зоны .{tld} (см. TLD_WHOIS_SERVERS)")
+        return server
+    
+    def _address(self, server: Optional[str]) -> tuple:
+        """Хост и порт сервера (допускается запись host:port)"""
+        host, _, port = (server or self.server).partition(':')
+        return host, int(port) if port else self.port
+    
+    def limits_for(self, server: str) -> Dict[str, float]:
+        """Лимиты сервера: concurrency, rate_limit, burst, min_rate, max_rate"""
+        limits = {
+            'concurrency': self.concurrency,
+            'rate_limit': self.rate_limit,
+            'burst': self.burst,
+            'min_rate': config.WHOIS_MIN_RATE,
+            'max_rate': config.WHOIS_MAX_RATE,
+        }
+        limits.update(config.WHOIS_SERVER_LIMITS.get(server, {}))
+        return limits
+    
+    def _get_bucket(self, server: str) -> TokenBucket:
+        """Получение ограничителя частоты для сервера"""
+        bucket = self._buckets.get(server)
+        if bucket is None:
+            limits = self.limits_for(server)
+            if config.WHOIS_ADAPTIVE_RATE:
+                bucket = AdaptiveRateLimiter(
+                    limits['rate_limit'], limits['burst'],
+                    min_rate=limits['min_rate'], max_rate=limits['max_rate'],
+                    increase=config.WHOIS_AIMD_INCREASE, decrease=config.WHOIS_AIMD_DECREASE,
+                    cooldown=config.WHOIS_AIMD_COOLDOWN
+                )
+            else:
+                bucket = TokenBucket(limits['rate_limit'], limits['burst'])
+            self._buckets[server] = bucket
+        return bucket
+    
+    def _get_breaker(self, server: str) -> CircuitBreaker:
+        """Получение автомата паузы после серии ошибок для сервера"""
+        breaker = self._breakers.get(server)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                server,
+                failure_threshold=config.WHOIS_BREAKER_THRESHOLD,
+                reset_timeout=config.WHOIS_BREAKER_TIMEOUT,
+                max_reset_timeout=config.WHOIS_BREAKER_MAX_TIMEOUT,
+                probe_timeout=config.WHOIS_BREAKER_PROBE_TIMEOUT
+            )
+            self._breakers[server] = breaker
+        return breaker
+    
+    def _record(self, server: str, result: dict):
+        """Подстройка частоты и автомата паузы по результату запроса"""
+        bucket = self._get_bucket(server)
+        breaker = self._get_breaker(server)
+        
+        if result['status'] == 'Error':
+            opens = breaker.opens
+            breaker.record_failure()
+            if breaker.opens != opens:
+                WHOIS_BREAKER_OPENS.inc(server=server)
+            if isinstance(bucket, AdaptiveRateLimiter):
+                bucket.record_failure()
+        else:
+            breaker.record_success()
+            if isinstance(bucket, AdaptiveRateLimiter):
+                bucket.record_success()
+    
+    def rates(self) -> Dict[str, float]:
+        """Текущая частота запросов к каждому серверу (после подстройки)"""
+        return {server: bucket.rate for server, bucket in self._buckets.items()}
+    
+    def parser_for(self, server: str) -> WhoisParser:
+        """Разборщик ответов сервера (подключается через whois_parser.register_parser)"""
+        parser = self._parsers.get(server)
+        if parser is None:
+            parser = get_parser(server)
+            self._parsers[server] = parser
+        return parser
+    
+    @staticmethod
+    def _outcome(response: str, result: dict) -> str:
+        """Результат запроса для метрик (таймауты отдельно от прочих ошибок)"""
+        if response == "ERROR: Timeout":
+            return 'timeout'
+        return result['status'].lower()
+    
+    def query_whois(self, domain: str, server: Optional[str] = None) -> str:
+        """
+        Прямой WHOIS-запрос к серверу (по умолчанию whois.cctld.uz)
         
         Args:
             domain: Доменное имя для проверки
+            server: WHOIS-сервер зоны домена
             
         Returns:
             Ответ WHOIS-сервера
         """
+        server = server or self.server
+        started = time.perf_counter()
         try:
             # Создаем сокет
             sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             sock.settimeout(self.timeout)
             
             # Подключаемся к WHOIS-серверу
-            sock.connect((self.server, self.port))
+            sock.connect(self._address(server))
             
             # Отправляем запрос (домен + перевод строки)
             query = f"{domain}\r\n"
@@ -48,6 +175,9 @@ class WhoisChecker:
             
             sock.close()
             
+            WHOIS_QUERY_SECONDS.observe(time.perf_counter() - started, server=server)
+            WHOIS_BYTES.inc(len(response), server=server)
+            
             # Декодируем ответ
             return response.decode('utf-8', errors='ignore')
             
@@ -60,113 +190,106 @@ class WhoisChecker:
         except Exception as e:
             return f"ERROR: {str(e)}"
     
-    def parse_whois_response(self, response: str, domain: str) -> Dict[str, Optional[str]]:
+    async def query_whois_async(self, domain: str, server: Optional[str] = None) -> str:
+        """
+        Асинхронный WHOIS-запрос через asyncio streams
+        
+        Args:
+            domain: Доменное имя для проверки
+            server: WHOIS-сервер зоны домена
+            
+        Returns:
+            Ответ WHOIS-сервера (ошибки в том же формате, что и query_whois)
+        """
+        server = server or self.server
+        started = time.perf_counter()
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection(*self._address(server)),
+                timeout=self.timeout
+            )
+            
+            writer.write(f"{domain}\r\n".encode('utf-8'))
+            await writer.drain()
+            
+            # Сервер закрывает соединение после ответа
+            response = await asyncio.wait_for(reader.read(), timeout=self.timeout)
+            
+            WHOIS_QUERY_SECONDS.observe(time.perf_counter() - started, server=server)
+            WHOIS_BYTES.inc(len(response), server=server)
+            
+            return response.decode('utf-8', errors='ignore')
+            
+        except asyncio.TimeoutError:
+            return "ERROR: Timeout"
+        except socket.gaierror:
+            return "ERROR: Cannot resolve WHOIS server"
+        except ConnectionRefusedError:
+            return "ERROR: Connection refused"
+        except Exception as e:
+            return f"ERROR: {str(e)}"
+        finally:
+            if writer is not None:
+                writer.close()
+    
+    def parse_whois_response(self, response: str, domain: str,
+                             server: Optional[str] = None) -> Dict[str, Optional[str]]:
         """
         Парсинг ответа WHOIS-сервера
         
         Args:
             response: Ответ от WHOIS-сервера
             domain: Проверяемый домен
+            server: WHOIS-сервер, ответ которого разбирается
             
         Returns:
             Словарь с данными: {status, expiry_date, registrar, created_date}
         """
-        result = {
-            'domain': domain,
-            'status': 'Unknown',
-            'expiry_date': None,
-            'registrar': None,
-            'created_date': None,
-            'raw_response': response[:500]  # Первые 500 символов для отладки
-        }
-        
-        # Проверяем на ошибки
-        if response.startswith('ERROR:'):
-            result['status'] = 'Error'
-            return result
-        
-        response_lower = response.lower()
-        
-        # Проверка: домен не найден / свободен
-        not_found_patterns = [
-            'not found',
-            'no entries found',
-            'no match',
-            'nothing found',
-            'domain not found',
-            'not registered'
-        ]
-        
-        if any(pattern in response_lower for pattern in not_found_patterns):
-            result['status'] = 'Available'
-            return result
-        
-        # Домен зарегистрирован
-        result['status'] = 'Registered'
-        
-        # Извлекаем дату истечения
-        expiry_patterns = [
-            r'expir[ey]\s*date:?\s*(\d{4}-\d{2}-\d{2})',
-            r'expiration\s*date:?\s*(\d{4}-\d{2}-\d{2})',
-            r'expire[sd]?:?\s*(\d{4}-\d{2}-\d{2})',
-            r'registry expiry date:?\s*(\d{4}-\d{2}-\d{2})',
-        ]
-        
-        for pattern in expiry_patterns:
-            match = re.search(pattern, response_lower)
-            if match:
-                result['expiry_date'] = match.group(1)
-                break
-        
-        # Извлекаем дату создания
-        created_patterns = [
-            r'creation\s*date:?\s*(\d{4}-\d{2}-\d{2})',
-            r'created:?\s*(\d{4}-\d{2}-\d{2})',
-            r'registered:?\s*(\d{4}-\d{2}-\d{2})',
-        ]
-        
-        for pattern in created_patterns:
-            match = re.search(pattern, response_lower)
-            if match:
-                result['created_date'] = match.group(1)
-                break
-        
-        # Извлекаем регистратора
-        registrar_patterns = [
-            r'registrar:?\s*(.+)',
-            r'sponsoring registrar:?\s*(.+)',
-        ]
-        
-        for pattern in registrar_patterns:
-            match = re.search(pattern, response_lower)
-            if match:
-                result['registrar'] = match.group(1).strip()
-                break
-        
-        return result
+        return self.parser_for(server or self.server).parse(response, domain)
     
-    def check_domain(self, username: str) -> Dict[str, Optional[str]]:
+    def check_domain(self, username: str, tld: str = 'uz') -> Dict[str, Optional[str]]:
         """
-        Проверка домена username.uz
+        Проверка домена username.tld
         
         Args:
             username: Юзернейм для проверки
+            tld: Доменная зона
             
         Returns:
             Результат проверки WHOIS
         """
-        domain = f"{username}.uz"
+        domain = f"{username}.{tld}"
+        server = self.server_for(tld)
+        
+        # Проверяем локальный кэш
+        if self.cache is not None:
+            cached = self.cache.get(domain)
+            if cached is not None:
+                WHOIS_CACHE.inc(result='hit')
+                print(f"  Проверка: {domain} (из кэша)")
+                return cached
+            WHOIS_CACHE.inc(result='miss')
         
         print(f"  Проверка: {domain}")
         
+        # Пауза после серии ошибок и лимит частоты сервера
+        waited = self._get_breaker(server).wait() + self._get_bucket(server).acquire()
+        RATE_LIMIT_WAIT_SECONDS.inc(waited, limiter=server)
+        
         # Делаем WHOIS-запрос
-        response = self.query_whois(domain)
+        response = self.query_whois(domain, server)
         
         # Парсим ответ
-        result = self.parse_whois_response(response, domain)
+        result = self.parse_whois_response(response, domain, server)
+        WHOIS_QUERIES.inc(server=server, outcome=self._outcome(response, result))
+        self._record(server, result)
+        
+        if self.archive is not None and result['status'] != 'Error':
+            self.archive.append(domain, response, server)
         
-        # Небольшая задержка между запросами
-        time.sleep(0.5)
+        if self.cache is not None:
+            self.cache.set(domain, result)
         
         return result
     
@@ -191,3 +314,79 @@ class WhoisChecker:
             results.append(result)
         
         return results
+    
+    async def check_domain_async(self, username: str, tld: str = 'uz') -> Dict[str, Optional[str]]:
+        """
+        Асинхронная проверка домена username.tld
+        
+        Вместо фиксированной паузы используется token bucket сервера
+        (с подстройкой частоты по ошибкам) и пауза после серии ошибок.
+        
+        Args:
+            username: Юзернейм для проверки
+            tld: Доменная зона
+            
+        Returns:
+            Результат проверки WHOIS
+        """
+        domain = f"{username}.{tld}"
+        server = self.server_for(tld)
+        
+        if self.cache is not None:
+            cached = self.cache.get(domain)
+            if cached is not None:
+                WHOIS_CACHE.inc(result='hit')
+                return cached
+            WHOIS_CACHE.inc(result='miss')
+        
+        waited = await self._get_breaker(server).wait_async()
+        waited += await self._get_bucket(server).acquire_async()
+        RATE_LIMIT_WAIT_SECONDS.inc(waited, limiter=server)
+        
+        response = await self.query_whois_async(domain, server)
+        
+        result = self.parse_whois_response(response, domain, server)
+        WHOIS_QUERIES.inc(server=server, outcome=self._outcome(response, result))
+        self._record(server, result)
+        
+        if self.archive is not None and result['status'] != 'Error':
+            self.archive.append(domain, response, server)
+        
+        if self.cache is not None:
+            self.cache.set(domain, result)
+        
+        return result
+    
+    async def check_multiple_domains_async(self, usernames: list,
+                                           concurrency: Optional[int] = None,
+                                           tlds: Optional[list] = None) -> list:
+        """
+        Асинхронная проверка нескольких доменов
+        
+        Args:
+            usernames: Список юзернеймов
+            concurrency: Максимум одновременных запросов (по умолчанию из config)
+            tlds: Зоны доменов в порядке usernames (по умолчанию все в .uz)
+            
+        Returns:
+            Список результатов проверки в порядке входного списка
+        """
+        total = len(usernames)
+        semaphore = asyncio.Semaphore(concurrency or self.concurrency)
+        done = 0
+        
+        print(f"\n🔍 Проверка {total} доменов через WHOIS (асинхронно)...")
+        
+        async def check(username: str, tld: str) -> Dict[str, Optional[str]]:
+            nonlocal done
+            async with semaphore:
+                result = await self.check_domain_async(username, tld)
+            done += 1
+            print(f"  [{done}/{total}] {result['domain']}: {result['status']}")
+            return result
+        
+        results: List[Dict[str, Optional[str]]] = await asyncio.gather(
+            *(check(username, tld) for username, tld in zip(usernames, tlds or ['uz'] * total))
+        )
+        
+        return results
@@ -0,0 +1,177 @@
+"""Модуль разбора ответов WHOIS-серверов"""
+
+import re
+from typing import Dict, Optional
+
+
+class WhoisParser:
+    """Однопроходный разбор ответа WHOIS в пары ключ/значение"""
+    
+    # Признаки свободного домена
+    NOT_FOUND_PATTERN = re.compile(
+        r'not found|no entries found|no match|nothing found|not registered',
+        re.IGNORECASE
+    )
+    
+    # Ответы сервера, ограничивающего частоту запросов (не данные о домене)
+    THROTTLE_PATTERN = re.compile(
+        r'limit exceeded|too many (?:requests|queries|connections)|quota exceeded|try again later',
+        re.IGNORECASE
+    )
+    
+    DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+    
+    # Синонимы полей в порядке приоритета
+    FIELD_ALIASES = {
+        'expiry_date': (
+            'registry expiry date',
+            'expiry date',
+            'expire date',
+            'expiration date',
+            'registrar registration expiration date',
+            'expires on',
+            'expires',
+            'expired',
+            'expire',
+            'paid-till',
+        ),
+        'created_date': (
+            'creation date',
+            'created on',
+            'created',
+            'registration date',
+            'registered on',
+            'registered',
+        ),
+        'registrar': (
+            'sponsoring registrar',
+            'registrar name',
+            'registrar',
+        ),
+    }
+    
+    DATE_FIELDS = ('expiry_date', 'created_date')
+    
+    def __init__(self):
+        # Ключ ответа -> (поле результата, приоритет)
+        self.aliases: Dict[str, tuple] = {}
+        for field, keys in self.FIELD_ALIASES.items():
+            for rank, key in enumerate(keys):
+                self.aliases[key] = (field, rank)
+    
+    def normalize_key(self, key: str) -> str:
+        """Приведение ключа к виду из FIELD_ALIASES"""
+        return ' '.join(key.lower().split())
+    
+    def parse(self, response: str, domain: str) -> Dict[str, Optional[str]]:
+        """
+        Парсинг ответа WHOIS-сервера
+        
+        Args:
+            response: Ответ от WHOIS-сервера
+            domain: Проверяемый домен
+        
+        Returns:
+            Словарь с данными: {status, expiry_date, registrar, created_date}
+        """
+        result = {
+            'domain': domain,
+            'status': 'Unknown',
+            'expiry_date': None,
+            'registrar': None,
+            'created_date': None,
+        }
+        
+        # Проверяем на ошибки (пустой ответ — соединение закрыто без данных)
+        if response.startswith('ERROR:') or not response.strip():
+            result['status'] = 'Error'
+            result['error'] = response.strip()[:200] or 'Empty response'
+            return result
+        
+        # Отказ из-за лимита частоты — тоже ошибка, а не занятый домен
+        if len(response) < 1000 and self.THROTTLE_PATTERN.search(response):
+            result['status'] = 'Error'
+            result['error'] = response.strip()[:200]
+            return result
+        
+        # Домен не найден / свободен
+        if self.NOT_FOUND_PATTERN.search(response):
+            result['status'] = 'Available'
+            return result
+        
+        # Домен зарегистрирован
+        result['status'] = 'Registered'
+        
+        ranks: Dict[str, int] = {}
+        aliases = self.aliases
+        
+        for line in response.splitlines():
+            key, sep, value = line.partition(':')
+            if not sep:
+                continue
+            
+            alias = aliases.get(self.normalize_key(key))
+            if alias is None:
+                continue
+            
+            field, rank = alias
+            if field in ranks and ranks[field] <= rank:
+                continue
+            
+            value = value.strip()
+            if field in self.DATE_FIELDS:
+                match = self.DATE_PATTERN.search(value)
+                if not match:
+                    continue
+                value = match.group(0)
+            elif not value:
+                continue
+            
+            result[field] = value
+            ranks[field] = rank
+        
+        return result
+
+
+class KzWhoisParser(WhoisParser):
+    """Разбор ответов whois.nic.kz: ключи дополнены точками, свои названия полей"""
+    
+    FIELD_ALIASES = {
+        'expiry_date': WhoisParser.FIELD_ALIASES['expiry_date'],
+        'created_date': ('domain created',) + WhoisParser.FIELD_ALIASES['created_date'],
+        'registrar': ('current registar', 'current registrar') + WhoisParser.FIELD_ALIASES['registrar'],
+    }
+    
+    def normalize_key(self, key: str) -> str:
+        # "Domain Name............" -> "domain name"
+        return super().normalize_key(key).rstrip('. ')
+
+
+# Разборщики ответов для серверов с собственным форматом
+SERVER_PARSERS = {
+    'whois.nic.kz': KzWhoisParser,
+}
+
+
+def register_parser(server: str, parser_class: type):
+    """
+    Подключение собственного разборщика для WHOIS-сервера
+    
+    Args:
+        server: Адрес WHOIS-сервера
+        parser_class: Наследник WhoisParser
+    """
+    SERVER_PARSERS[server] = parser_class
+
+
+def get_parser(server: str) -> WhoisParser:
+    """
+    Разборщик ответов для сервера
+    
+    Args:
+        server: Адрес WHOIS-сервера
+    
+    Returns:
+        Экземпляр разборщика (WhoisParser, если для сервера нет собственного)
+    """
+    return SERVER_PARSERS.get(server, WhoisParser)()
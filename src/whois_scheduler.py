@@ -0,0 +1,162 @@
+"""Модуль распределения WHOIS-проверок по серверам регистратур"""
+
+import asyncio
+import heapq
+import itertools
+from typing import Awaitable, Callable, Dict, List, Optional
+import config
+
+# Маркер остановки обработчика очереди
+_DONE = object()
+
+# Приоритет маркера остановки: после всех проверок
+_DONE_PRIORITY = float('inf')
+
+
+class WhoisLane:
+    """Очередь и обработчики одного WHOIS-сервера"""
+    
+    def __init__(self, server: str, concurrency: int, queue_size: int):
+        """
+        Args:
+            server: Адрес WHOIS-сервера
+            concurrency: Количество одновременных проверок на сервере
+            queue_size: Максимум ожидающих проверок
+        """
+        self.server = server
+        self.concurrency = concurrency
+        # Элементы (приоритет, номер, данные): меньший приоритет — раньше,
+        # при равном приоритете — в порядке постановки
+        self.queue: asyncio.PriorityQueue = asyncio.PriorityQueue(queue_size)
+        # Проверки сверх размера очереди (куча в том же порядке); непуста
+        # только при заполненной очереди
+        self.backlog: list = []
+        self.workers: List[asyncio.Task] = []
+        self.processed = 0
+
+
+class WhoisScheduler:
+    """Отдельные очереди, обработчики и лимиты для каждого WHOIS-сервера
+    
+    Медленный или ограничивающий частоту сервер задерживает только свою
+    очередь: проверки доменов в других зонах продолжаются. Лимит частоты
+    сервера берется из token bucket в WhoisChecker.
+    
+    Постановка в очередь не ждет сервер: проверки сверх размера его
+    очереди копятся в отдельном буфере. Ждать submit начинает только
+    когда буферы всех серверов вместе превысят WHOIS_BACKLOG_SIZE.
+    """
+    
+    def __init__(self, checker, handler: Callable[..., Awaitable[None]],
+                 concurrency: Optional[int] = None, queue_size: Optional[int] = None,
+                 backlog_size: Optional[int] = None):
+        """
+        Args:
+            checker: WhoisChecker (серверы зон и их лимиты)
+            handler: Корутина handler(item, tld), выполняющая проверку
+            concurrency: Обработчиков на сервер вместо лимита из настроек
+            queue_size: Размер очереди сервера (по умолчанию из config)
+            backlog_size: Максимум проверок в буферах всех серверов
+        """
+        self.checker = checker
+        self.handler = handler
+        self.concurrency = concurrency
+        self.queue_size = queue_size or config.WHOIS_LANE_QUEUE_SIZE
+        self.backlog_size = backlog_size or config.WHOIS_BACKLOG_SIZE
+        self.lanes: Dict[str, WhoisLane] = {}
+        self.error: Optional[BaseException] = None
+        self._sequence = itertools.count()
+        # Устанавливается, когда обработчик забрал проверку из буфера
+        self._drained = asyncio.Event()
+        
+        # Задача, отправляющая проверки (отменяется при ошибке обработчика)
+        self._owner = asyncio.current_task()
+    
+    def _get_lane(self, server: str) -> WhoisLane:
+        """Очередь сервера (создается при первой проверке в его зоне)"""
+        lane = self.lanes.get(server)
+        if lane is None:
+            concurrency = self.concurrency or self.checker.limits_for(server)['concurrency']
+            lane = WhoisLane(server, int(concurrency), self.queue_size)
+            lane.workers = [
+                asyncio.create_task(self._worker(lane))
+                for _ in range(lane.concurrency)
+            ]
+            self.lanes[server] = lane
+        return lane
+    
+    async def _worker(self, lane: WhoisLane):
+        """Обработчик очереди одного сервера"""
+        while True:
+            _, _, item = await lane.queue.get()
+            # Освободившееся место занимает первая проверка из буфера
+            if lane.backlog:
+                lane.queue.put_nowait(heapq.heappop(lane.backlog))
+                self._drained.set()
+            if item is _DONE:
+                break
+            
+            try:
+                await self.handler(*item)
+            except Exception as e:
+                # Останавливаем отправку, ошибка будет проброшена из join
+                if self.error is None:
+                    self.error = e
+                    if self._owner is not None:
+                        self._owner.cancel()
+                raise
+            
+            lane.processed += 1
+    
+    @staticmethod
+    def _put(lane: WhoisLane, entry: tuple):
+        """Постановка в очередь сервера или, если она заполнена, в его буфер"""
+        try:
+            lane.queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            heapq.heappush(lane.backlog, entry)
+    
+    def backlog(self) -> int:
+        """Количество проверок в буферах всех серверов"""
+        return sum(len(lane.backlog) for lane in self.lanes.values())
+    
+    async def submit(self, item, tld: str, priority: int = 0):
+        """
+        Постановка проверки в очередь сервера зоны
+        
+        Заполненная очередь одного сервера не задерживает остальные:
+        проверка уходит в буфер сервера. Ожидание возможно только при
+        переполнении общего лимита буферов (WHOIS_BACKLOG_SIZE).
+        
+        Args:
+            item: Данные для обработчика
+            tld: Доменная зона
+            priority: Приоритет (меньше — раньше)
+        """
+        lane = self._get_lane(self.checker.server_for(tld))
+        while self.backlog() >= self.backlog_size:
+            self._drained.clear()
+            await self._drained.wait()
+        self._put(lane, (priority, next(self._sequence), (item, tld)))
+    
+    async def join(self):
+        """Ожидание завершения всех поставленных проверок"""
+        for lane in self.lanes.values():
+            for _ in lane.workers:
+                self._put(lane, (_DONE_PRIORITY, next(self._sequence), _DONE))
+        
+        await asyncio.gather(*(
+            worker
+            for lane in self.lanes.values()
+            for worker in lane.workers
+        ))
+    
+    def cancel(self):
+        """Остановка всех обработчиков"""
+        for lane in self.lanes.values():
+            for worker in lane.workers:
+                worker.cancel()
+    
+    def stats(self) -> Dict[str, int]:
+        """Количество обработанных проверок по серверам"""
+        return {server: lane.processed for server, lane in self.lanes.items()}